@@ -25,6 +25,7 @@ setup(
     package_dir={'': 'src'},
     test_suite='tests',
     install_requires=['pybresenham', 'colorama'],
+    extras_require={'numpy': ['numpy']},
     keywords="text canvas bresenham line circle drawing 2D geometry shapes vector bitmap rotate rotation vector2bitmap",
     classifiers=[
         'Development Status :: 4 - Beta',
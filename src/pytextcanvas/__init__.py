@@ -14,7 +14,7 @@ Add PyTextCanvasException class (maybe?)
 Add tkinter window
 Docstrings
 
-NOTE: PyTextCanvas is not thread safe.
+NOTE: Canvas objects are not thread safe, unless created with threadSafe=True.
 
 """
 
@@ -32,21 +32,27 @@ TODO docs:
 Road Map of Features:
 - colors
 - arbitrary data associated with the cells
-- export as html
 """
 
-# TODO - add a mode where drawing ooutside the canvas is a no-op instead of raising an exception.
-
 __version__ = '0.0.3'
 
+import collections
 import doctest
+import functools
+import html
+import io
 import math
+import numbers
+import operator
+import sys
 
 import colorama
 from colorama import Fore, Back
 import pybresenham
 
 import pytextcanvas.terminal
+import pytextcanvas.storage
+from pytextcanvas.storage import NONE_CHAR, packAttr, unpackAttr
 
 # Constants
 DEFAULT_CANVAS_WIDTH = 80
@@ -59,9 +65,50 @@ CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW = range(9)
 COLORAMA_FG_MAP = {CLEAR: Fore.RESET, BLACK: Fore.BLACK, WHITE: Fore.WHITE, RED: Fore.RED, GREEN: Fore.GREEN, BLUE: Fore.BLUE, CYAN: Fore.CYAN, MAGENTA: Fore.MAGENTA, YELLOW: Fore.YELLOW}
 COLORAMA_BG_MAP = {CLEAR: Back.RESET, BLACK: Back.BLACK, WHITE: Back.WHITE, RED: Back.RED, GREEN: Back.GREEN, BLUE: Back.BLUE, CYAN: Back.CYAN, MAGENTA: Back.MAGENTA, YELLOW: Back.YELLOW}
 
+# The colorama codes for the fg (low) and bg (high) halves of an attribute
+# byte, indexed by the half's value. A None color is displayed as CLEAR.
+_ATTR_FG_CODES = [Fore.RESET] + [COLORAMA_FG_MAP[color] for color in range(9)]
+_ATTR_BG_CODES = [Back.RESET] + [COLORAMA_BG_MAP[color] for color in range(9)]
+
+# str.translate() tables for remapping direction-sensitive characters when
+# the canvas is transposed or rotated clockwise.
+TRANSPOSE_GLYPHS = str.maketrans('|-<>^v─│┐└├┤┬┴', '-|^<v>│─└┐┬┴├┤')
+ROTATE90_GLYPHS = str.maketrans('/\\|-^>v<─│┌┐┘└├┬┤┴', '\\/-|>v<^│─┐┘└┌┬┤┴├')
+ROTATE180_GLYPHS = str.maketrans('^v<>┌┘┐└├┤┬┴', 'v^><┘┌└┐┤├┴┬')
+ROTATE270_GLYPHS = {value: key for key, value in ROTATE90_GLYPHS.items()}
+
+HTML_COLOR_MAP = {CLEAR: None, BLACK: '#000000', WHITE: '#ffffff', RED: '#ff0000', GREEN: '#00ff00', BLUE: '#0000ff', CYAN: '#00ffff', MAGENTA: '#ff00ff', YELLOW: '#ffff00'}
+
+def _makeHtmlStyle(attr):
+    fg, bg = unpackAttr(attr)
+    style = []
+    if HTML_COLOR_MAP.get(fg) is not None:
+        style.append('color: %s' % (HTML_COLOR_MAP[fg]))
+    if HTML_COLOR_MAP.get(bg) is not None:
+        style.append('background-color: %s' % (HTML_COLOR_MAP[bg]))
+    return '; '.join(style) or None
+
+# The CSS style for each attribute byte, or None for the default colors.
+_ATTR_HTML_STYLES = [_makeHtmlStyle(attr) for attr in range(256)]
+
+# The default number of rows in each band rendered by `Canvas.export()`.
+EXPORT_BAND_HEIGHT = 256
+
 # Terminal functions:
 getTerminalSize = pytextcanvas.terminal.getTerminalSize
 clearScreen = pytextcanvas.terminal.clearScreen
+hideCursor = pytextcanvas.terminal.hideCursor
+showCursor = pytextcanvas.terminal.showCursor
+TerminalSession = pytextcanvas.terminal.TerminalSession
+
+# Storage engines:
+Storage = pytextcanvas.storage.Storage
+ArrayStorage = pytextcanvas.storage.ArrayStorage
+TiledStorage = pytextcanvas.storage.TiledStorage
+MmapStorage = pytextcanvas.storage.MmapStorage
+SharedMemoryStorage = pytextcanvas.storage.SharedMemoryStorage
+LockedStorage = pytextcanvas.storage.LockedStorage
+NumpyStorage = pytextcanvas.storage.NumpyStorage
 
 
 # Initialize colorama module:
@@ -73,6 +120,441 @@ def _checkForIntOrFloat(arg):
         raise PyTextCanvasException('argument must be int or float, not %s' % (arg.__class__.__name__))
 
 
+def _appendColoredText(output, chars, attrs, fgCode, bgCode):
+    """Appends the string `chars` to the `output` list, along with the
+    colorama codes for the attribute bytes in `attrs`. The `fgCode` and
+    `bgCode` arguments are the codes currently in effect, and only changes
+    to these are appended. Returns a tuple of the fg and bg codes in effect
+    afterwards."""
+    if attrs.count(attrs[0]) == len(attrs):
+        # Fast path for the common case where the entire span is one color.
+        attrs = attrs[:1]
+
+    start = 0
+    for x, attr in enumerate(attrs):
+        newFgCode = _ATTR_FG_CODES[attr & 0x0F]
+        newBgCode = _ATTR_BG_CODES[attr >> 4]
+        if newFgCode != fgCode or newBgCode != bgCode:
+            output.append(chars[start:x])
+            start = x
+            if newFgCode != fgCode:
+                output.append(newFgCode)
+                fgCode = newFgCode
+            if newBgCode != bgCode:
+                output.append(newBgCode)
+                bgCode = newBgCode
+    output.append(chars[start:])
+    return fgCode, bgCode
+
+
+def _appendHtmlText(output, chars, attrs):
+    """Appends the string `chars` to the `output` list as HTML, with a
+    `<span>` around each run of cells whose attribute bytes in `attrs`
+    have colors."""
+    if attrs.count(attrs[0]) == len(attrs):
+        # Fast path for the common case where the entire span is one color.
+        runs = [(0, len(attrs))]
+    else:
+        runs = []
+        start = 0
+        for x in range(1, len(attrs)):
+            if attrs[x] != attrs[start]:
+                runs.append((start, x))
+                start = x
+        runs.append((start, len(attrs)))
+
+    for start, end in runs:
+        text = html.escape(chars[start:end], False)
+        style = _ATTR_HTML_STYLES[attrs[start]]
+        if style is None:
+            output.append(text)
+        else:
+            output.append('<span style="%s">%s</span>' % (style, text))
+
+
+def _renderBand(storage, format, startAttr=0):
+    """Returns every row of `storage` as a string in `format`, which is one
+    of 'text', 'ansi', or 'html'. Rows are separated by newlines, except
+    for 'ansi', where every row ends with a newline. For 'ansi', `startAttr`
+    is the attribute byte of the colors in effect before the first row.
+
+    This is a module-level function so that `Canvas.export()` can send
+    it to process pools."""
+    output = []
+    if format == 'ansi':
+        fgCode, bgCode = _ATTR_FG_CODES[startAttr & 0x0F], _ATTR_BG_CODES[startAttr >> 4]
+        for y in range(storage.height):
+            chars = storage.getRowChars(y).replace(NONE_CHAR, ' ')
+            fgCode, bgCode = _appendColoredText(output, chars, storage.getRowAttrs(y), fgCode, bgCode)
+            output.append('\n')
+        return ''.join(output)
+    elif format == 'html':
+        for y in range(storage.height):
+            if y != 0:
+                output.append('\n')
+            chars = storage.getRowChars(y).replace(NONE_CHAR, ' ')
+            _appendHtmlText(output, chars, storage.getRowAttrs(y))
+        return ''.join(output)
+    else:
+        return '\n'.join([storage.getRowChars(y).replace(NONE_CHAR, ' ') for y in range(storage.height)])
+
+
+def _checkSizeArg(name, value):
+    """Raises PyTextCanvasException if `value`, the `name` arg of a canvas's
+    size, isn't an int of 1 or greater."""
+    if not isinstance(value, int):
+        raise PyTextCanvasException('`%s` arg must be an int, not %r' % (name, value.__class__.__name__))
+    if value < 1:
+        raise PyTextCanvasException('`%s` arg must be 1 or greater, not %r' % (name, value))
+
+
+_VALID_COLORS = frozenset([None]) | frozenset(range(9))
+
+
+def _isValidColor(color):
+    """Returns True if `color` is None or one of the color constants. Ints
+    from NumPy count, but floats and bools don't, even though they compare
+    equal to ints in _VALID_COLORS.
+
+    >>> _isValidColor(None), _isValidColor(RED), _isValidColor(8)
+    (True, True, True)
+    >>> _isValidColor(9), _isValidColor(1.0), _isValidColor(True)
+    (False, False, False)
+    """
+    if color is None:
+        return True
+    return isinstance(color, numbers.Integral) and not isinstance(color, bool) and 0 <= color <= 8
+
+
+@functools.lru_cache(maxsize=256)
+def _nearestIndexes(oldLength, newLength):
+    """Returns a tuple of the index of the nearest of `oldLength` cells for
+    each of `newLength` cells, when stretching or shrinking a row or column."""
+    return tuple([min(oldLength - 1, int((i + 0.5) * oldLength / newLength)) for i in range(newLength)])
+
+
+@functools.lru_cache(maxsize=256)
+def _nearestItemGetter(oldLength, newLength):
+    """Returns a function that takes a row span of `oldLength` cells and
+    returns a tuple of its nearest cells for a row of `newLength` cells."""
+    indexes = _nearestIndexes(oldLength, newLength)
+    if len(indexes) == 1:
+        return lambda span: (span[indexes[0]],) # itemgetter() doesn't return a tuple for one item.
+    return operator.itemgetter(*indexes)
+
+
+@functools.lru_cache(maxsize=256)
+def _blockBounds(oldLength, newLength):
+    """Returns a tuple of (start, end) tuples, for the range of the
+    `oldLength` cells that become each of `newLength` cells. When growing,
+    each range is just the nearest cell."""
+    if newLength >= oldLength:
+        return tuple([(i, i + 1) for i in _nearestIndexes(oldLength, newLength)])
+    return tuple([(i * oldLength // newLength, (i + 1) * oldLength // newLength) for i in range(newLength)])
+
+
+def _pickBlockChar(blockChars, priority):
+    """Returns the raw character that represents the string of raw
+    characters `blockChars`: the first character in `priority` found in it,
+    or else the most common character that isn't blank or None."""
+    for char in priority:
+        if char in blockChars:
+            return char
+    counts = collections.Counter(blockChars)
+    counts.pop(' ', None)
+    counts.pop(NONE_CHAR, None)
+    if counts:
+        return counts.most_common(1)[0][0]
+    return ' ' if ' ' in blockChars else NONE_CHAR
+
+def _toList(seq):
+    """Returns the sequence `seq` as a list. NumPy arrays and `array.array`
+    objects are converted with their fast `tolist()` method."""
+    if hasattr(seq, 'tolist'):
+        return seq.tolist()
+    return list(seq)
+
+
+def _outlineSpans(points):
+    """Returns a list of (y, left, right) spans, one per row of the (x, y)
+    points in `points`, from the leftmost to the rightmost point in that
+    row. The `right` values are exclusive. This fills in convex outlines."""
+    rows = {}
+    for x, y in points:
+        if y in rows:
+            left, right = rows[y]
+            rows[y] = (min(left, x), max(right, x))
+        else:
+            rows[y] = (x, x)
+    return [(y, left, right + 1) for y, (left, right) in rows.items()]
+
+
+def _diamondSpans(left, top, radius, filled, canvasHeight):
+    """Returns a generator of the (y, left, right) spans of a diamond,
+    matching the cells of `pybresenham.diamond()`. Only the rows from 0 up to
+    but not including `canvasHeight` are generated."""
+    centerx = left + radius + 1
+    for row in range(max(-top, 0), min(radius * 2 + 1, canvasHeight - top)):
+        halfWidth = radius - abs(row - radius)
+        if filled:
+            yield (top + row, centerx - halfWidth, centerx + halfWidth + 1)
+        else:
+            yield (top + row, centerx - halfWidth, centerx - halfWidth + 1)
+            yield (top + row, centerx + halfWidth, centerx + halfWidth + 1)
+
+
+def _rectangleSpans(left, top, width, height, filled, canvasHeight):
+    """Returns a generator of the (y, left, right) spans of a rectangle,
+    matching the cells of `pybresenham.rectangle()`. Only the rows from 0 up
+    to but not including `canvasHeight` are generated."""
+    right, bottom = left + width, top + height
+    for y in range(max(top, 0), min(bottom, canvasHeight)):
+        if filled or y == top or y == bottom - 1:
+            yield (y, left, right)
+        else:
+            yield (y, left, left + 1)
+            yield (y, right - 1, right)
+
+
+def _gridSpans(gridLeft, gridTop, numBoxesWide, numBoxesHigh, boxWidth, boxHeight, thickness, canvasWidth, canvasHeight):
+    """Returns a generator of the (y, left, right) spans of a grid, matching
+    the cells of `pybresenham.grid()`. Only the rows and vertical lines that
+    are on a `canvasWidth` x `canvasHeight` canvas are generated."""
+    boxStepX, boxStepY = boxWidth + thickness, boxHeight + thickness
+    gridRight = gridLeft + numBoxesWide * boxStepX + thickness
+    gridBottom = gridTop + numBoxesHigh * boxStepY + thickness
+
+    # The x coordinates of the vertical lines that are on the canvas.
+    firstColumn = max((-gridLeft - thickness) // boxStepX + 1, 0)
+    lastColumn = min(-((gridLeft - canvasWidth) // boxStepX), numBoxesWide + 1)
+    columns = [gridLeft + column * boxStepX for column in range(firstColumn, lastColumn)]
+
+    for y in range(max(gridTop, 0), min(gridBottom, canvasHeight)):
+        if (y - gridTop) % boxStepY < thickness:
+            yield (y, gridLeft, gridRight) # A horizontal line.
+        else:
+            for x in columns:
+                yield (y, x, x + thickness)
+
+
+def _lineMinorSteps(step, deltaMajor, deltaMinor, startError, isForward):
+    """Returns how many times the minor axis coordinate has moved after
+    `step` steps along the major axis of `pybresenham.line()`. This lets a
+    line start at any step without running the steps before it."""
+    if isForward:
+        # pybresenham moves the minor coordinate when the error goes below 0.
+        return max(0, -((startError - step * deltaMinor) // deltaMajor))
+    if step == 0:
+        return 0
+    # pybresenham moves the minor coordinate when the error reaches 0 or below.
+    return min(step, max(0, (step * deltaMinor - startError) // deltaMajor + 1))
+
+
+def _firstStep(low, high, test):
+    """Returns the first step between `low` and `high` where `test(step)`
+    is True, or `high` if there isn't one. The test must be False for every
+    step before the first True step."""
+    while low < high:
+        middle = (low + high) // 2
+        if test(middle):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def _clipLine(x1, y1, x2, y2, canvasWidth, canvasHeight):
+    """Returns a list of the (x, y) points of `pybresenham.line(x1, y1, x2,
+    y2)` that are on a `canvasWidth` x `canvasHeight` canvas.
+
+    The line is clipped before it is rasterized: the range of steps that
+    are on the canvas is found first (the major axis directly, the minor axis
+    with a binary search), so the work done is proportional to the number of
+    points drawn rather than the length of the line."""
+    for arg in (x1, y1, x2, y2):
+        _checkForIntOrFloat(arg)
+    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+
+    # Like pybresenham, steep lines are stepped along the y axis instead.
+    isSteep = abs(y2 - y1) > abs(x2 - x1)
+    if isSteep:
+        x1, y1, x2, y2 = y1, x1, y2, x2
+        majorSize, minorSize = canvasHeight, canvasWidth
+    else:
+        majorSize, minorSize = canvasWidth, canvasHeight
+
+    # pybresenham steps from the point with the smaller major coordinate
+    # towards the other, or backwards from x1 if it is the larger one.
+    isForward = x1 <= x2
+    if isForward:
+        majorDir, minorDir = 1, (1 if y1 < y2 else -1)
+    else:
+        majorDir, minorDir = -1, (-1 if y2 < y1 else 1)
+    deltaMajor, deltaMinor = abs(x2 - x1), abs(y2 - y1)
+    startError = deltaMajor // 2
+
+    # Clip the steps on the major axis.
+    if isForward:
+        firstStep, lastStep = max(-x1, 0), min(majorSize - 1 - x1, deltaMajor)
+    else:
+        firstStep, lastStep = max(x1 - majorSize + 1, 0), min(x1, deltaMajor)
+    if firstStep > lastStep:
+        return []
+
+    # Clip the steps on the minor axis. The number of minor steps never
+    # decreases, so the range of steps on the canvas can be binary searched.
+    if minorDir == 1:
+        lowMinorSteps, highMinorSteps = -y1, minorSize - 1 - y1
+    else:
+        lowMinorSteps, highMinorSteps = y1 - minorSize + 1, y1
+    if deltaMajor == 0:
+        if not lowMinorSteps <= 0 <= highMinorSteps:
+            return []
+    else:
+        firstStep = _firstStep(firstStep, lastStep + 1, lambda step: _lineMinorSteps(step, deltaMajor, deltaMinor, startError, isForward) >= lowMinorSteps)
+        lastStep = _firstStep(firstStep, lastStep + 1, lambda step: _lineMinorSteps(step, deltaMajor, deltaMinor, startError, isForward) > highMinorSteps) - 1
+
+    points = []
+    for step in range(firstStep, lastStep + 1):
+        major = x1 + majorDir * step
+        minor = y1 + minorDir * (_lineMinorSteps(step, deltaMajor, deltaMinor, startError, isForward) if deltaMajor else 0)
+        if isSteep:
+            points.append((minor, major))
+        else:
+            points.append((major, minor))
+    return points
+
+
+def _clipLines(points, closed, canvasWidth, canvasHeight):
+    """Returns a list of the (x, y) points of `pybresenham.lines(points,
+    closed)` that are on a `canvasWidth` x `canvasHeight` canvas. Each
+    line segment is clipped before it is rasterized."""
+    try:
+        points = list(points)
+    except TypeError:
+        raise PyTextCanvasException('points must be an iterable')
+    for i, point in enumerate(points):
+        try:
+            _checkForIntOrFloat(point[0])
+            _checkForIntOrFloat(point[1])
+        except Exception:
+            raise PyTextCanvasException('point at index %s is not a tuple of two int/float values' % (i))
+    if closed:
+        if len(points) < 3:
+            raise PyTextCanvasException('points argument must have at least three points if closed==True')
+        points.append(points[0]) # The final point connects back to the starting point.
+    elif len(points) < 2:
+        raise PyTextCanvasException('points argument must have at least two points')
+
+    # Like pybresenham, each segment leaves out its starting point, which is
+    # usually (but not always) the last point of the previous segment.
+    clippedPoints = []
+    if not closed:
+        clippedPoints.extend(_clipLine(points[0][0], points[0][1], points[0][0], points[0][1], canvasWidth, canvasHeight))
+    for i in range(len(points) - 1):
+        start = (int(points[i][0]), int(points[i][1]))
+        clippedPoints.extend(point for point in _clipLine(points[i][0], points[i][1], points[i + 1][0], points[i + 1][1], canvasWidth, canvasHeight) if point != start)
+    return clippedPoints
+
+
+def _regularPolygonVertices(centerx, centery, radius, sides, rotationDegrees=0, stretchHorizontal=1.0, stretchVertical=1.0):
+    """Returns a list of the (x, y) int tuples of the vertices of a regular
+    polygon. This is the same math as `pybresenham.polygonVertices()`,
+    which can't be used because it raises a NameError in pybresenham 0.0.7.
+
+    Odd-sided polygons have a pointed corner at the top and flat horizontal
+    side at the bottom. The `rotationDegrees` argument will rotate the polygon
+    counterclockwise."""
+    for arg in (centerx, centery, radius, sides, rotationDegrees, stretchHorizontal, stretchVertical):
+        _checkForIntOrFloat(arg)
+    if sides < 3:
+        raise PyTextCanvasException('sides argument must be at least 3')
+
+    # Setting the start point like this guarantees a flat side will be on the "bottom" of the polygon.
+    if sides % 2 == 1:
+        angleOfStartPointDegrees = 90 + rotationDegrees
+    else:
+        angleOfStartPointDegrees = 90 + rotationDegrees - (180 / sides)
+
+    vertices = []
+    for sideNum in range(sides):
+        angleOfPointRadians = math.radians(angleOfStartPointDegrees + (360 / sides * sideNum))
+        vertices.append((int(math.cos(angleOfPointRadians) * radius * stretchHorizontal) + int(centerx),
+                         int(-(int(math.sin(angleOfPointRadians) * radius) * stretchVertical) + centery)))
+    return vertices
+
+
+def _scanlineSpans(vertices, rule, top, bottom):
+    """Returns a generator of the (y, left, right) spans that fill the
+    polygon with the corners in `vertices`, for the rows from `top` up to
+    but not including `bottom`. The `right` values are exclusive.
+
+    This is an active edge table scanline fill: the edges are sorted by
+    their first row, and each row only looks at the edges crossing it."""
+    try:
+        vertices = [tuple(vertex) for vertex in vertices]
+    except TypeError:
+        raise PyTextCanvasException('vertices must be an iterable of (x, y) pairs of numbers')
+    for vertex in vertices:
+        if len(vertex) != 2 or not all([isinstance(n, numbers.Real) and not isinstance(n, bool) for n in vertex]):
+            raise PyTextCanvasException('vertices must be an iterable of (x, y) pairs of numbers, not %r' % (vertex,))
+    if len(vertices) < 3:
+        raise PyTextCanvasException('a polygon needs at least 3 vertices')
+
+    # Build the edge table. Horizontal edges never cross a row's center, so
+    # they are left out. Each edge is (first row, last row + 1, x0, y0, slope, winding).
+    edges = []
+    for i, (x0, y0) in enumerate(vertices):
+        x1, y1 = vertices[i - 1]
+        if y0 == y1:
+            continue
+        winding = 1
+        if y0 > y1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+            winding = -1
+        # Edges are half-open, so a row through a vertex crosses one edge.
+        firstRow, endRow = max(int(math.ceil(y0)), top), min(int(math.ceil(y1)), bottom)
+        if firstRow < endRow:
+            edges.append((firstRow, endRow, x0, y0, (x1 - x0) / (y1 - y0), winding))
+    if not edges:
+        return
+    edges.sort(key=operator.itemgetter(0), reverse=True) # Popped from the end in row order.
+
+    active = []
+    y = edges[-1][0]
+    while edges or active:
+        if not active:
+            y = edges[-1][0] # Skip rows with no edges.
+        while edges and edges[-1][0] == y:
+            active.append(edges.pop())
+
+        crossings = sorted((x0 + (y - y0) * slope, winding) for firstRow, endRow, x0, y0, slope, winding in active)
+        if rule == 'evenodd':
+            for i in range(0, len(crossings) - 1, 2):
+                yield (y, int(math.ceil(crossings[i][0])), int(math.ceil(crossings[i + 1][0])))
+        else:
+            total = 0
+            for x, winding in crossings:
+                if total == 0:
+                    left = x
+                total += winding
+                if total == 0:
+                    yield (y, int(math.ceil(left)), int(math.ceil(x)))
+
+        y += 1
+        active = [edge for edge in active if edge[1] > y]
+
+
+def _writeToStream(stream, text):
+    """Writes `text` to `stream` with a single `write()` call and then flushes
+    the stream. If `stream` is a binary stream, `text` is written UTF-8 encoded."""
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(stream, 'mode', ''):
+        text = text.encode('utf-8')
+    stream.write(text)
+    if hasattr(stream, 'flush'):
+        stream.flush()
+
+
 def isInside(point_x, point_y, area_left, area_top, area_width, area_height):
     """
     Returns `True` if the point of `point_x`, `point_y` is inside the area
@@ -95,7 +577,7 @@ class PyTextCanvasException(Exception):
 
 
 class Canvas:
-    def __init__(self, width=None, height=None, loads=None, fg=None, bg=None):
+    def __init__(self, width=None, height=None, loads=None, fg=None, bg=None, storage=None, threadSafe=False):
         """
         Initialize a new Canvas, which represents a rectangular area of
         text characters. The coordinates start in the upper left corner at
@@ -111,6 +593,19 @@ class Canvas:
         The default size is 80 x 25 characters.
 
         Currently, color is not supported and the `fg` and `bg` arguments do nothing.
+
+        The cells are kept in a storage engine. The `storage` argument is
+        a `Storage` subclass (`ArrayStorage` by default) or an already created
+        `Storage` object of the same size as the canvas.
+
+        If `threadSafe` is True, the storage engine is wrapped in a
+        `LockedStorage`, so several threads can draw on the canvas (or on
+        views of it) at once. Threads drawing on different rows don't block
+        each other. Reading the whole canvas, such as with `str()`,
+        `render()`, or `copy()`, works from a snapshot that only blocks
+        writers while it is taken. The cursor is shared by every thread, so
+        threads should pass `x` and `y` to `write()` or draw on their own
+        views.
         """
         if width is None and height is None and loads is not None:
             # self.width and self.height are set based on the size of the loads string
@@ -122,19 +617,13 @@ class Canvas:
             if width is None:
                 self._width = DEFAULT_CANVAS_WIDTH
             else:
-                if not isinstance(width, int):
-                    raise PyTextCanvasException('`width` arg must be an int, not %r' % (width.__class__.__name__))
-                if width < 1:
-                    raise PyTextCanvasException('`width` arg must be 1 or greater, not %r' % (width))
+                _checkSizeArg('width', width)
                 self._width = width
 
             if height is None:
                 self._height = DEFAULT_CANVAS_HEIGHT
             else:
-                if not isinstance(height, int):
-                    raise PyTextCanvasException('`height` arg must be an int, not %r' % (height.__class__.__name__))
-                if height < 1:
-                    raise PyTextCanvasException('`height` arg must be 1 or greater, not %r' % (height))
+                _checkSizeArg('height', height)
                 self._height = height
 
         # The data structure for the characters in this canvas. The None value
@@ -142,13 +631,28 @@ class Canvas:
         # top of each other, as opposed to a space ' ' which will cover up
         # that cell with a blank space.
 
+        # The foreground & background of each cell in the canvas are also kept
+        # in the storage engine, packed together into one attribute byte per
+        # cell. Each color is one of the color constants, which are ints 0-8,
+        # or None, which represents the RESET'd color in colorama.
+        # Currently we're sticking to the 8 colors in the colorama module. More might be added later.
+
         # =====================================
         # ============= IMPORTANT =============
         # =====================================
-        # If you directly modify _chars, be sure to set _strDirty to True, otherwise
-        # the cached version of the string will be returned and any changes won't
-        # be reflected.
-        self._chars = [[None] * self._height for i in range(self._width)]
+        # If you directly modify _storage, be sure to call _markRowsDirty() for
+        # the changed rows, otherwise the cached version of those rows will be
+        # returned and any changes won't be reflected.
+        if storage is None:
+            storage = ArrayStorage
+        if isinstance(storage, Storage):
+            if storage.width != self._width or storage.height != self._height:
+                raise PyTextCanvasException('storage size (%s, %s) does not match the canvas size (%s, %s)' % (storage.width, storage.height, self._width, self._height))
+            self._storage = storage
+        else:
+            self._storage = storage(self._width, self._height)
+        if threadSafe:
+            self._storage = LockedStorage(self._storage)
 
 
         # NOTE: A None value for color is like a None value for character, while CLEAR would be similar to a space character.
@@ -158,23 +662,84 @@ class Canvas:
             raise PyTextCanvasException('bg arg must be None or one of the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.')
         self._fg = fg
         self._bg = bg
-
-        # The foreground & background of each cell in the canvas. These are
-        # stored as one of the six color constants, which are ints 0-7. The None
-        # value represents the RESET'd color in colorama.
-        # Currently we're sticking to the 8 colors in the colorama module. More might be added later.
-        self._fginfo = [[None] * self._height for i in range(self._width)]
-        self._bginfo = [[None] * self._height for i in range(self._width)]
         # TODO - the rest of the color implementation needs to be done.
 
         self._cursor = (0, 0) # The cursor is always set to integers.
 
+        self._renderer = None # The TerminalRenderer used by present().
+
+        self._rowCache = [None] * self._height # Cached string of each row, or None if the row is dirty.
+        self._strCache = None # Cached returned value from __str__(), or None if any row is dirty.
+
         if loads is not None:
             # Pre-populate with a string.
             self.loads(loads)
 
-        self._strCache = None # Cached returned value from __str__()
-        self._strDirty = True # If False, __str__() uses the cached value.
+
+    @classmethod
+    def openMmap(cls, path, width=None, height=None, readonly=False):
+        """
+        Returns a Canvas object whose cells are kept in a memory-mapped file
+        at `path`, instead of in memory. The OS loads the parts of the file
+        that are used as they are needed, so the canvas can be larger than
+        RAM and reopening a saved canvas doesn't read the whole file.
+
+        If the file doesn't exist, it is created for a `width` x `height`
+        canvas of `None` cells. If it does exist, `width` and `height` can be
+        left out, but must match the file if given. With `readonly=True`,
+        the file can't be changed through this canvas.
+
+        Call `canvas.storage.flush()` to write changes to disk, and
+        `canvas.storage.close()` when done with the canvas.
+        """
+        # Check the size before the file is created.
+        for name, value in (('width', width), ('height', height)):
+            if value is not None:
+                _checkSizeArg(name, value)
+        try:
+            storage = MmapStorage(path, width, height, readonly)
+        except (ValueError, OSError) as exc:
+            raise PyTextCanvasException('could not open %r as a canvas: %s' % (path, exc))
+        try:
+            return cls(storage.width, storage.height, storage=storage)
+        except Exception:
+            storage.close() # Don't leave the file mapped if the canvas can't be made.
+            raise
+
+
+    @property
+    def storage(self):
+        """The storage engine object that holds this canvas's cells.
+
+        This is a read-only attribute."""
+        return self._storage
+
+
+    def asarray(self, plane='chars'):
+        """
+        Returns a NumPy array of one plane of the canvas: 'chars' (the
+        Unicode code point of each cell's character, or 0 for None), 'fg', or
+        'bg' (each color constant plus one, or 0 for None). The array is
+        indexed by [y, x].
+
+        The canvas must use `NumpyStorage` (or be a view of a canvas that
+        does), and the array is a view of the canvas's cells rather than a
+        copy: changes to the array change the canvas, and the other way
+        around. Since the canvas can't see changes made through the array,
+        it stops caching its string once this method has been called.
+        """
+        if plane not in ('chars', 'fg', 'bg'):
+            raise PyTextCanvasException("plane must be 'chars', 'fg', or 'bg', not %r" % (plane))
+
+        storage = self._storage
+        left = top = 0
+        if isinstance(storage, pytextcanvas.storage.ViewStorage):
+            left, top, storage = storage.left, storage.top, storage.parent
+        if not isinstance(storage, NumpyStorage):
+            raise PyTextCanvasException('asarray() requires a canvas with NumpyStorage')
+
+        storage.volatile = True
+        return getattr(storage, plane)[top:top + self._height, left:left + self._width]
 
 
     @property
@@ -184,9 +749,9 @@ class Canvas:
 
     @fg.setter
     def fg(self, value):
-        if value is not None and value not in range(9):
+        if not _isValidColor(value):
             raise PyTextCanvasException('fg attribute must be None or one of the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.')
-        self._fg = value
+        self._fg = None if value is None else int(value)
 
     @property
     def bg(self):
@@ -195,9 +760,9 @@ class Canvas:
 
     @bg.setter
     def bg(self, value):
-        if value is not None and value not in range(9):
+        if not _isValidColor(value):
             raise PyTextCanvasException('bg attribute must be None or one of the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.')
-        self._bg = value
+        self._bg = None if value is None else int(value)
 
 
 
@@ -327,27 +892,69 @@ class Canvas:
         xxxxxxxxxx
         """
 
-        if not self._strDirty:
+        storage = self._storage
+        if storage.volatile:
+            # Something else can change the cells, so nothing is cached.
+            return _renderBand(storage.snapshot(), 'text')
+
+        if self._strCache is not None:
             return self._strCache
 
-        # TODO - make this thread safe
-        result = []
+        # Only the dirty rows are rebuilt, the rest come from the row cache.
+        rowCache = self._rowCache
+        for y in range(self._height):
+            if rowCache[y] is None:
+                rowCache[y] = storage.getRowChars(y).replace(NONE_CHAR, ' ')
 
-        for y in range(self.height):
-            row = []
-            for x in range(self.width):
-                c = self._chars[x][y]
-                if c is None:
-                    row.append(' ')
-                else:
-                    row.append(c)
-            result.append(''.join(row))
-
-        self._strDirty = False
-        self._strCache = '\n'.join(result)
+        self._strCache = '\n'.join(rowCache)
         return self._strCache
 
 
+    def _checkWritable(self):
+        """Raises PyTextCanvasException if the canvas's storage is read-only.
+        Methods that change the canvas call this before changing anything."""
+        if self._storage.readonly:
+            raise PyTextCanvasException('this canvas is read-only')
+
+
+    def _markRowDirty(self, y):
+        """Marks the cached string for row `y` as dirty, so that `__str__()`
+        rebuilds it."""
+        self._checkWritable()
+        self._rowCache[y] = None
+        self._strCache = None
+
+
+    def _markRowsDirty(self, top=0, bottom=None):
+        """Marks the cached strings for the rows from `top` up to (but not
+        including) `bottom` as dirty. If `bottom` is None, every row from
+        `top` to the bottom of the canvas is marked."""
+        self._checkWritable()
+        if bottom is None:
+            bottom = self._height
+        self._rowCache[top:bottom] = [None] * (bottom - top)
+        self._strCache = None
+
+
+    def batch(self):
+        """
+        Returns a `CanvasBatch` context manager for setting many cells
+        quickly. Inside the `with` block, the batch object sets cells
+        without checking the coordinates or characters, and the canvas's
+        cached strings are only updated once, when the block ends.
+
+        >>> canvas = Canvas(4, 2)
+        >>> with canvas.batch() as cells:
+        ...     for x in range(4):
+        ...         cells[x, 1] = '*'
+        >>> print(canvas)
+        <BLANKLINE>
+        ****
+        """
+        self._checkWritable()
+        return CanvasBatch(self)
+
+
     def __len__(self):
         """Returns the length of this Canvas object, which is the length of
         its string as returned by str(), not the width * height.
@@ -381,21 +988,25 @@ class Canvas:
 
         if isinstance(key, tuple):
             x, y = self._checkKey(key)
-            return self._chars[x][y]
+            return self._storage.getChar(x, y)
 
         elif isinstance(key, slice):
             x1, y1, x2, y2, xStep, yStep = self._normalizeKeySlice(key)
 
+            if xStep == 1 and yStep == 1:
+                return self.copy(x1, y1, x2 - x1, y2 - y1)
+
             # create the new Canvas object
-            subWidth = math.ceil((x2 - x1) / float(xStep))
-            subHeight = math.ceil((y2 - y1) / float(yStep))
+            subWidth = int(math.ceil((x2 - x1) / float(xStep)))
+            subHeight = int(math.ceil((y2 - y1) / float(yStep)))
 
             subcanvas = Canvas(width=subWidth, height=subHeight)
 
-            # copy the characters to the new Canvas object
-            for ix, xoffset in enumerate(range(0, subWidth, xStep)):
-                for iy, yoffset in enumerate(range(0, subHeight, yStep)):
-                    subcanvas[ix, iy] = self[x1 + xoffset, y1 + yoffset]
+            # copy every xStep-th cell of every yStep-th row to the new Canvas object
+            storage, subStorage = self._storage, subcanvas._storage
+            for iy, y in enumerate(range(y1, y2, yStep)):
+                subStorage.setRowChars(iy, 0, storage.getRowChars(y, x1, x2)[::xStep])
+                subStorage.setRowAttrs(iy, 0, storage.getRowAttrs(y, x1, x2)[::xStep])
             return subcanvas
 
         else:
@@ -414,9 +1025,8 @@ class Canvas:
 
             x, y = self._checkKey(key)
 
-            self._strDirty = True
-            self._strCache = None
-            self._chars[x][y] = value
+            self._markRowDirty(y)
+            self._storage.setChar(x, y, value)
 
         elif isinstance(key, slice):
             if value is None: # delete the cells
@@ -425,13 +1035,12 @@ class Canvas:
 
             x1, y1, x2, y2, xStep, yStep = self._normalizeKeySlice(key)
 
-            self._strDirty = True
-            self._strCache = None
+            value = str(value)
+            if len(value) != 1:
+                raise PyTextCanvasException('value must have a length of 1')
 
             # copy the value to every place in the slice
-            for ix in range(x1, x2, xStep):
-                for iy in range(y1, y2, yStep):
-                    self._chars[ix][iy] = value
+            self._setSliceChars(x1, y1, x2, y2, xStep, yStep, value)
             return
 
         else:
@@ -444,22 +1053,32 @@ class Canvas:
         if isinstance(key, tuple):
             x, y = self._checkKey(key)
 
-            self._strDirty = True
-            self._strCache = None
-            self._chars[x][y] = None
+            self._markRowDirty(y)
+            self._storage.setChar(x, y, None)
             return
 
         elif isinstance(key, slice):
-            self._strDirty = True
-            self._strCache = None
             x1, y1, x2, y2, xStep, yStep = self._normalizeKeySlice(key)
-            for ix in range(x1, x2, xStep):
-                for iy in range(y1, y2, yStep):
-                    self._chars[ix][iy] = None
+            self._setSliceChars(x1, y1, x2, y2, xStep, yStep, NONE_CHAR)
         else:
             raise PyTextCanvasException('key must be a tuple of two ints')
 
 
+    def _setSliceChars(self, x1, y1, x2, y2, xStep, yStep, rawChar):
+        """Sets the characters in the (already normalized) slice area to the
+        raw character `rawChar`."""
+        self._markRowsDirty(y1, y2)
+        if xStep == 1 and yStep == 1:
+            self._storage.fillChars(x1, y1, x2, y2, rawChar)
+        else:
+            # Set every xStep-th cell in the row span, then write the span back at once.
+            numCells = len(range(x1, x2, xStep))
+            for iy in range(y1, y2, yStep):
+                chars = list(self._storage.getRowChars(iy, x1, x2))
+                chars[::xStep] = rawChar * numCells
+                self._storage.setRowChars(iy, x1, ''.join(chars))
+
+
     def _checkForSlicesInKey(self, key):
         """Check that the user didn't incorrectly specify the slice by forgetting
         the parentheses."""
@@ -549,6 +1168,10 @@ class Canvas:
             kstep = (key.step, key.step)
         else:
             kstep = key.step
+        # The area is always stepped through from its top-left corner, so
+        # negative steps (as in reversing a list) aren't supported.
+        if not isinstance(kstep, (tuple, list)) or len(kstep) != 2 or not all([isinstance(step, int) and step >= 1 for step in kstep]):
+            raise PyTextCanvasException('slice step must be a positive int or a tuple of two positive ints, not %r' % (key.step,))
 
         # x1 & y1 should be top-left, x2 & y2 should be bottom-right
         # So swap these values if need be.
@@ -604,47 +1227,116 @@ class Canvas:
         if other._width != self._width or other._height != self._height:
             return False
 
-        for x in range(self._width):
-            for y in range(self._height):
-                if self._chars[x][y] != other._chars[x][y]:
-                    return False
-        return True
+        return self._storage.charsEqual(other._storage)
 
 
-    def print(self):
-        """Prints the canvas to the screen. The difference between calling
-        this method and passing the Canvas object to the print() function
-        is that this method will displays colors using Colorama."""
-        currentFgColor = CLEAR
-        currentBgColor = CLEAR
-        print(Fore.RESET + Back.RESET, end='')
+    def print(self, file=None, executor=None):
+        """Prints the canvas to the screen (or to `file`, if given). The
+        difference between calling this method and passing the Canvas object
+        to the print() function is that this method will displays colors
+        using Colorama.
 
-        for y in range(self._height):
-            for x in range(self._width):
-                # Set colorama fg color if the fg color has changed.
-                fg = self._fginfo[x][y]
-                if fg is None:
-                    fg = CLEAR
-                if fg != currentFgColor:
-                    print(COLORAMA_FG_MAP[fg], end='')
-                    currentFgColor = fg
-
-                # Set colorama bg color if the bg color has changed.
-                bg = self._bginfo[x][y]
-                if bg is None:
-                    bg = CLEAR
-                if bg != currentBgColor:
-                    print(COLORAMA_BG_MAP[bg], end='')
-                    currentBgColor = bg
-
-                # Display the character.
-                c = self._chars[x][y]
-                if c is None:
-                    c = ' '
-                print(c, end='') # TODO - see if there's ways to optimize this.
-            print()
-        print(Fore.RESET + Back.RESET, end='')
+        The entire frame is written with one `write()` call. If `executor` is
+        given, the canvas is rendered in parallel bands. See `render()`."""
+        self.render(sys.stdout if file is None else file, executor)
+
+
+    def render(self, stream=None, executor=None):
+        """Returns the canvas as a string that includes the Colorama color
+        codes, with every row (including the last) ending with a newline.
+        The colors are reset at the start and end of the string.
 
+        If `stream` is given, the string is written to it with a single
+        `write()` call and the stream is flushed, instead of being returned.
+        `stream` can be a text or binary stream.
+
+        If `executor` is given, the canvas is rendered in parallel bands.
+        See `export()`.
+
+        >>> canvas = Canvas(3, 2, loads='abc\\ndef')
+        >>> canvas.render() == Fore.RESET + Back.RESET + 'abc\\ndef\\n' + Fore.RESET + Back.RESET
+        True
+        """
+        text = self.export('ansi', executor)
+        if stream is None:
+            return text
+        _writeToStream(stream, text)
+
+
+    def toHtml(self, executor=None):
+        """Returns the canvas as a string of HTML: a `<pre>` element with
+        `<span>` elements for the colored cells.
+
+        If `executor` is given, the canvas is rendered in parallel bands.
+        See `export()`.
+
+        >>> canvas = Canvas(3, 2, loads='a<c\\ndef')
+        >>> canvas.paint(0, 1, fg=RED)
+        >>> print(canvas.toHtml())
+        <pre style="color: #000000; background-color: #ffffff">a&lt;c
+        <span style="color: #ff0000">d</span>ef</pre>
+        """
+        return self.export('html', executor)
+
+
+    def export(self, format='text', executor=None, bandHeight=None):
+        """Returns the canvas as a string in `format`, which is one of:
+
+        * 'text' - the same string as `str(canvas)`.
+        * 'ansi' - the string with Colorama color codes from `render()`.
+        * 'html' - the HTML string from `toHtml()`.
+
+        By default, the canvas is rendered in this thread. To render a
+        large canvas in parallel, pass a `concurrent.futures` executor
+        (such as a `ThreadPoolExecutor` or `ProcessPoolExecutor`) for
+        `executor`. The canvas is then split into horizontal bands of
+        `bandHeight` rows (`EXPORT_BAND_HEIGHT` by default), which are
+        rendered by the executor and joined in order. The result is the same
+        as rendering in this thread.
+
+        Each band is a snapshot taken from the canvas before it is handed to
+        the executor. With the default `ArrayStorage` engine these are
+        copy-on-write, so nothing is copied unless sent to another process.
+        """
+        if format not in ('text', 'ansi', 'html'):
+            raise PyTextCanvasException("format must be 'text', 'ansi', or 'html', not %r" % (format))
+        if bandHeight is None:
+            bandHeight = EXPORT_BAND_HEIGHT
+        if not isinstance(bandHeight, int) or bandHeight < 1:
+            raise PyTextCanvasException('bandHeight must be an int of 1 or greater, not %r' % (bandHeight))
+
+        storage = self._storage.snapshot()
+        if executor is None or self._height <= bandHeight:
+            bands = [_renderBand(storage, format)]
+        else:
+            futures = []
+            for top in range(0, self._height, bandHeight):
+                band = storage.copyRegion(0, top, self._width, min(bandHeight, self._height - top))
+                # In 'ansi', a band starts with the colors the previous band ended with.
+                startAttr = 0 if top == 0 else storage.getAttr(self._width - 1, top - 1)
+                futures.append(executor.submit(_renderBand, band, format, startAttr))
+            bands = [future.result() for future in futures]
+
+        if format == 'ansi':
+            return Fore.RESET + Back.RESET + ''.join(bands) + Fore.RESET + Back.RESET
+        elif format == 'html':
+            return '<pre style="color: %s; background-color: %s">%s</pre>' % (DEFAULT_FG, DEFAULT_BG, '\n'.join(bands))
+        else:
+            return '\n'.join(bands)
+
+
+
+    def present(self, stream=None):
+        """Draws the canvas to the terminal, like `print()`, except that only
+        the cells that changed since the last call to `present()` are sent
+        to the terminal. The canvas is drawn at the top left corner of the
+        terminal.
+
+        See `TerminalRenderer` for drawing the canvas at other positions or
+        drawing several canvases to one terminal."""
+        if self._renderer is None or self._renderer.stream is not stream:
+            self._renderer = TerminalRenderer(stream)
+        return self._renderer.present(self)
 
 
     def write(self, text, x=None, y=None):
@@ -673,6 +1365,7 @@ class Canvas:
         ABCorld!Hello world!
         Hello world!Hello wo
         """
+        self._checkWritable()
 
         # TODO - change this so that the cursor moves.
         if x is None:
@@ -680,24 +1373,30 @@ class Canvas:
         if y is None:
             y = self.cursory
 
-        self._strDirty = True
+        storage = self._storage
+        attr = packAttr(self._fg, self._bg)
         startIndex = self._convertTupleIndexsToSingleIndex(x, y)
-        for i in range(startIndex, startIndex + len(text)):
-            cx, cy = self._convertSingleIndexToTupleIndexes(i % self.area)
-            if not self.isOnCanvas(cx, cy):
-                break
 
-            self._chars[cx][cy] = text[i - startIndex]
-            self._fginfo[cx][cy] = self._fg
-            self._bginfo[cx][cy] = self._bg
+        # Write the text one row-span at a time, wrapping around the right
+        # and bottom edges of the canvas.
+        i = 0
+        while i < len(text):
+            cx, cy = self._convertSingleIndexToTupleIndexes((startIndex + i) % self.area)
+            span = text[i:i + self._width - cx]
+            storage.setRowChars(cy, cx, span)
+            storage.setRowAttrs(cy, cx, bytes((attr,)) * len(span))
+            self._markRowDirty(cy)
+            i += len(span)
 
         self.cursor = self._convertSingleIndexToTupleIndexes((startIndex + len(text)) % self.area)
 
 
-    def shift(self, xOffset, yOffset):
+    def shift(self, xOffset, yOffset, char=None, fg=None, bg=None):
         """Shifts the characters on the canvas horizontally and vertically.
         Characters will not wrap around the edges of the canvas, but are
-        lost instead. These cells are set to `None`.
+        lost instead. The exposed cells are set to `char` (`None` by
+        default) with the `fg` and `bg` colors. The colors of the cells are
+        shifted along with the characters.
 
         >>> canvas = Canvas(5, 5)
         >>> canvas.fill('x')
@@ -709,47 +1408,67 @@ class Canvas:
           xxx
           xxx
         """
-        if xOffset >= self.width or xOffset <= -self.width or \
-           yOffset >= self.height or yOffset <= -self.height:
-           # If either offset is greater than the width/height, just clear the
-           # entire canvas.
-           self.clear()
-           return
+        self.scroll(xOffset, yOffset, False, char, fg, bg)
 
-        # Get the appropriate range objects.
-        if xOffset > 0:
-            xRangeObj = range(self.width - 1 - xOffset, -1, -1)
-        else:
-            xRangeObj = range(self.width - xOffset)
 
-        if yOffset > 0:
-            yRangeObj = range(self.height - 1 - yOffset, -1, -1)
+    def scroll(self, xOffset, yOffset, wrap=True, char=None, fg=None, bg=None):
+        """Scrolls the characters (and their colors) on the canvas
+        horizontally and vertically. If `wrap` is True, characters scrolled
+        off one edge of the canvas come back on the opposite edge. Otherwise,
+        this is the same as `shift()`, with the exposed cells set to `char`
+        with the `fg` and `bg` colors.
+
+        >>> canvas = Canvas(5, 2, loads='abcde\\nfghij')
+        >>> canvas.scroll(-2, 1)
+        >>> print(canvas)
+        hijfg
+        cdeab
+        """
+        self._checkWritable()
+        for name, offset in (('xOffset', xOffset), ('yOffset', yOffset)):
+            if not isinstance(offset, int):
+                raise PyTextCanvasException('%s must be an int, not %r' % (name, offset.__class__.__name__))
+        if char is not None:
+            char = str(char)
+            if len(char) != 1:
+                raise PyTextCanvasException('char must be a single character or None')
         else:
-            yRangeObj = range(self.height - yOffset)
-
-        for x in xRangeObj:
-            for y in yRangeObj:
-                self[x + xOffset, y + yOffset] = self[x, y]
-
-        # Clear the old, original cells.
-        # TODO - this can be made more efficient by not clearing the overlapping regions twice.
-        if xOffset >= 0:
-            for x in range(xOffset):
-                for y in range(self.height):
-                    del self[x, y]
+            char = NONE_CHAR
+        if not _isValidColor(fg) or not _isValidColor(bg):
+            raise PyTextCanvasException('fg and bg must be None or one of the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.')
+        attr = packAttr(fg, bg)
+
+        if wrap:
+            xOffset %= self._width
+            yOffset %= self._height
+        elif abs(xOffset) >= self._width or abs(yOffset) >= self._height:
+            # Everything is shifted off of the canvas.
+            self._storage.fillChars(0, 0, self._width, self._height, char)
+            self._storage.fillAttrs(0, 0, self._width, self._height, attr)
+            self._markRowsDirty()
+            return
+        if xOffset == 0 and yOffset == 0:
+            return
+
+        self._storage.shiftCells(xOffset, yOffset, wrap, char, attr)
+        if xOffset == 0:
+            # The cached rows are still valid, just in different places.
+            self._moveRowCache(yOffset, wrap)
         else:
-            for x in range(self.width - 1 - xOffset, self.width):
-                for y in range(self.height):
-                    del self[x, y]
-
-        if yOffset >= 0:
-            for x in range(self.width):
-                for y in range(yOffset):
-                    del self[x, y]
+            self._markRowsDirty()
+
+
+    def _moveRowCache(self, yOffset, wrap):
+        """Moves the cached row strings `yOffset` rows down, after the rows
+        themselves were moved by `scroll()`."""
+        rowCache = self._rowCache
+        if wrap:
+            rowCache[:] = rowCache[-yOffset:] + rowCache[:-yOffset]
+        elif yOffset > 0:
+            rowCache[:] = [None] * yOffset + rowCache[:-yOffset]
         else:
-            for x in range(self.width):
-                for y in range(self.height - 1 - yOffset):
-                    del self[x, y]
+            rowCache[:] = rowCache[-yOffset:] + [None] * -yOffset
+        self._strCache = None
 
 
     def clear(self):
@@ -763,28 +1482,70 @@ class Canvas:
         Returns a new Canvas object created from a subregion of this Canvas object.
 
         This returned Canvas can be "pasted" to other Canvas objects using `paste()`.
-        """
-        if width is None:
-            width = self.width # By default, use the entire width of the canvas.
-        if height is None:
-            height = self.height # By default, use the entire height of the canvas.
 
-        # Create the new Canvas object for the copied data.
-        canvasCopy = Canvas(width=width, height=height)
+        With the default `ArrayStorage` engine, copies of the full width of
+        the canvas (including `copy()`, `copy.copy()`, and `canvas[:]`) don't
+        duplicate any cells until either canvas writes to a row, so taking
+        many read-only snapshots only costs memory for the rows that change.
+        """
+        # By default, copy to the right and bottom edges of the canvas.
+        width, height = self._checkSubregion(left, top, width, height, 'copied area')
 
-        # Copy the character, fg color, and bg color data.
-        for x in range(width):
-            for y in range(height):
-                canvasCopy._chars[x][y] = self._chars[x + left][y + top]
-                canvasCopy._fginfo[x][y] = self._fginfo[x + left][y + top]
-                canvasCopy._bginfo[x][y] = self._bginfo[x + left][y + top]
+        # Copy the character, fg color, and bg color data. The storage engine
+        # can make this a copy-on-write copy, so this is cheap for snapshots
+        # that are mostly read.
+        canvasCopy = Canvas(width=width, height=height, storage=self._storage.copyRegion(left, top, width, height))
 
         # Copy the various properties.
         canvasCopy._cursor = self._cursor
+        if left == 0 and width == self._width and not isinstance(self, CanvasView) and not self._storage.volatile:
+            # The cached strings of full-width rows are still valid for the copy.
+            canvasCopy._rowCache = self._rowCache[top:top + height]
 
         return canvasCopy
 
 
+    def view(self, left=0, top=0, width=None, height=None):
+        """
+        Returns a `CanvasView` object for a subregion of this Canvas object.
+        Unlike `copy()`, the view shares the cells of this canvas instead of
+        copying them: drawing on the view draws on this canvas (and the
+        other way around), with the view's 0, 0 at `left`, `top` on this
+        canvas.
+
+        >>> canvas = Canvas(6, 3)
+        >>> canvas.fill(',')
+        >>> panel = canvas.view(1, 1, 4, 2)
+        >>> panel.fill('#')
+        >>> panel[0, 0] = 'A'
+        >>> print(canvas)
+        ,,,,,,
+        ,A###,
+        ,####,
+        """
+        return CanvasView(self, left, top, width, height)
+
+
+    def _checkSubregion(self, left, top, width, height, name):
+        """Checks the arguments for a rectangular area that must be entirely
+        inside the canvas, such as for `copy()` and `view()`, and returns its
+        (width, height). If `width` or `height` is None, the area extends to
+        the right or bottom edge of the canvas. `name` is used in the
+        exception message."""
+        if width is None:
+            width = self._width - left
+        if height is None:
+            height = self._height - top
+        for argName, value in (('left', left), ('top', top), ('width', width), ('height', height)):
+            if not isinstance(value, int):
+                raise PyTextCanvasException('`%s` arg must be an int, not %r' % (argName, value.__class__.__name__))
+        if width < 1 or height < 1:
+            raise PyTextCanvasException('`width` and `height` args must be 1 or greater')
+        if left < 0 or top < 0 or left + width > self._width or top + height > self._height:
+            raise PyTextCanvasException('the %s must be inside of the canvas, which has width=%s height=%s' % (name, self._width, self._height))
+        return width, height
+
+
     def __copy__(self):
         return self.copy(0, 0, self.width, self.height)
 
@@ -794,14 +1555,21 @@ class Canvas:
         Paste the character, foreground color, and background color data from
         `canvasToPaste` to this `Canvas` object.
         """
-        # Paste the characters on this Canvas.
-        for x in range(canvasToPaste.width):
-            for y in range(canvasToPaste.height):
-                if self.isOnCanvas(x + left, y + top):
-                    self._chars[x + left][y + top] = canvasToPaste._chars[x][y]
-                    self._fginfo[x + left][y + top] = canvasToPaste._fginfo[x][y]
-                    self._bginfo[x + left][y + top] = canvasToPaste._bginfo[x][y]
-        self._strDirty = True
+        self._checkWritable()
+        # Clip the pasted area to the edges of this Canvas.
+        srcLeft = max(0, -left)
+        srcTop = max(0, -top)
+        srcRight = min(canvasToPaste.width, self._width - left)
+        srcBottom = min(canvasToPaste.height, self._height - top)
+        if srcLeft >= srcRight or srcTop >= srcBottom:
+            return # Nothing to paste.
+
+        # Paste the characters on this Canvas one row-span at a time.
+        src = canvasToPaste._storage
+        for y in range(srcTop, srcBottom):
+            self._storage.setRowChars(y + top, srcLeft + left, src.getRowChars(y, srcLeft, srcRight))
+            self._storage.setRowAttrs(y + top, srcLeft + left, src.getRowAttrs(y, srcLeft, srcRight))
+        self._markRowsDirty(srcTop + top, srcBottom + top)
 
 
     def loads(self, content):
@@ -821,15 +1589,14 @@ class Canvas:
         Helloo
         world!
         """
+        self._checkWritable()
         # TODO - how to handle \r?
 
         y = 0
         for line in str(content).splitlines():
-            for x, v in enumerate(line):
-                if x >= self.width:
-                    # Excess text that goes beyond the right edge will be truncated.
-                    break
-                self[x, y] = v
+            # Excess text that goes beyond the right edge will be truncated.
+            self._storage.setRowChars(y, 0, line[:self._width])
+            self._markRowDirty(y)
             y += 1
             if y >= self.height:
                 # Excess text that goes beyond the bottom edge will be truncated.
@@ -869,16 +1636,172 @@ class Canvas:
         self._cursor = (x, y)
 
 
-    '''
-    # TODO - implement, probably using pybresenham
-    def rotate(self):
-        # TODO - need to decide if this should return a new, larger canvas to handle non-modulo-90 rotations
-        pass
+    def transpose(self, remapGlyphs=False):
+        """
+        Returns a new Canvas object with the rows and columns of this canvas
+        swapped, so that the cell at x, y is moved to y, x. If `remapGlyphs`
+        is True, direction-sensitive characters such as '|' and '-' are
+        changed to match.
+
+        >>> canvas = Canvas(3, 2, loads='abc\\n|-d')
+        >>> print(canvas.transpose(remapGlyphs=True))
+        a-
+        b|
+        cd
+        """
+        rows = self._getRows()
+        return self._newFromRows(zip(*rows[0]), zip(*rows[1]), TRANSPOSE_GLYPHS if remapGlyphs else None)
 
-    def scale(self):
-        # TODO - need to decide if this should return a new canvas. (I think it should, why would you want the text scaled but not the canvas size?)
-        pass
-    '''
+
+    def rotate90(self, remapGlyphs=False):
+        """
+        Returns a new Canvas object with the contents of this canvas rotated
+        90 degrees clockwise. If `remapGlyphs` is True, direction-sensitive
+        characters such as '/', '|', and '>' are changed to match.
+
+        >>> canvas = Canvas(3, 2, loads='abc\\n->/')
+        >>> print(canvas.rotate90(remapGlyphs=True))
+        |a
+        vb
+        \\c
+        """
+        charRows, attrRows = self._getRows()
+        return self._newFromRows(zip(*charRows[::-1]), zip(*attrRows[::-1]), ROTATE90_GLYPHS if remapGlyphs else None)
+
+
+    def rotate180(self, remapGlyphs=False):
+        """
+        Returns a new Canvas object with the contents of this canvas rotated
+        180 degrees. If `remapGlyphs` is True, direction-sensitive
+        characters such as '>' and '^' are changed to match.
+
+        >>> canvas = Canvas(3, 2, loads='abc\\n-> ')
+        >>> print(canvas.rotate180(remapGlyphs=True))
+         <-
+        cba
+        """
+        charRows, attrRows = self._getRows()
+        return self._newFromRows([row[::-1] for row in charRows[::-1]], [row[::-1] for row in attrRows[::-1]],
+                                 ROTATE180_GLYPHS if remapGlyphs else None)
+
+
+    def rotate270(self, remapGlyphs=False):
+        """
+        Returns a new Canvas object with the contents of this canvas rotated
+        90 degrees counterclockwise (that is, 270 degrees clockwise). If
+        `remapGlyphs` is True, direction-sensitive characters such as '/',
+        '|', and '>' are changed to match.
+
+        >>> canvas = Canvas(3, 2, loads='abc\\n->/')
+        >>> print(canvas.rotate270(remapGlyphs=True))
+        c\\
+        b^
+        a|
+        """
+        charRows, attrRows = self._getRows()
+        return self._newFromRows(list(zip(*charRows))[::-1], list(zip(*attrRows))[::-1], ROTATE270_GLYPHS if remapGlyphs else None)
+
+
+    def _getRows(self):
+        """Returns a tuple of a list of every row's raw characters and a list
+        of every row's attribute bytes, from a consistent snapshot."""
+        storage = self._storage.snapshot()
+        return ([storage.getRowChars(y) for y in range(self._height)],
+                [storage.getRowAttrs(y) for y in range(self._height)])
+
+
+    def _newFromRows(self, charRows, attrRows, glyphTable=None):
+        """Returns a new Canvas object made from the lists of rows in
+        `charRows` (each a string or a sequence of raw characters) and
+        `attrRows` (each a sequence of attribute bytes). The characters are
+        mapped through the `str.translate()` table `glyphTable`, if given."""
+        charRows = [''.join(row) for row in charRows]
+        attrRows = [bytes(row) for row in attrRows]
+        newCanvas = Canvas(len(charRows[0]), len(charRows))
+        storage = newCanvas._storage
+        for y, (chars, attrs) in enumerate(zip(charRows, attrRows)):
+            if glyphTable is not None:
+                chars = chars.translate(glyphTable)
+            storage.setRowChars(y, 0, chars)
+            storage.setRowAttrs(y, 0, attrs)
+        return newCanvas
+
+
+    def scale(self, factorX, factorY=None, method='nearest', priority=None):
+        """
+        Returns a new Canvas object with the contents of this canvas scaled
+        by `factorX` horizontally and `factorY` vertically (which is the same
+        as `factorX` by default). See `resize()` for the `method` and
+        `priority` arguments.
+
+        >>> canvas = Canvas(2, 2, loads='ab\\ncd')
+        >>> print(canvas.scale(2))
+        aabb
+        aabb
+        ccdd
+        ccdd
+        """
+        if factorY is None:
+            factorY = factorX
+        for name, factor in (('factorX', factorX), ('factorY', factorY)):
+            _checkForIntOrFloat(factor)
+            if factor <= 0:
+                raise PyTextCanvasException('%s must be greater than 0, not %r' % (name, factor))
+        return self.resize(max(1, int(round(self._width * factorX))), max(1, int(round(self._height * factorY))), method, priority)
+
+
+    def resize(self, width, height, method='nearest', priority=None):
+        """
+        Returns a new Canvas object of size `width` x `height` with the
+        contents of this canvas stretched or shrunk to fit.
+
+        With the default 'nearest' `method`, each new cell is a copy of the
+        nearest cell in this canvas. This is fast, but shrinking can drop
+        thin lines. With the 'density' method, shrinking picks the most
+        common non-blank character in each block of cells that becomes one
+        new cell. With the 'priority' method, it picks the first character
+        in the `priority` string that appears in the block (falling back to
+        'density'). Growing always uses the nearest cell. Colors come along
+        with the picked characters.
+
+        The index tables that map new cells to old cells are cached for each
+        size, so resizing to the same size repeatedly is cheap.
+
+        >>> canvas = Canvas(6, 2, loads='-x----\\n------')
+        >>> print(canvas.resize(3, 1))
+        ---
+        >>> print(canvas.resize(3, 1, 'priority', priority='x'))
+        x--
+        """
+        for name, value in (('width', width), ('height', height)):
+            if not isinstance(value, int):
+                raise PyTextCanvasException('`%s` arg must be an int, not %r' % (name, value.__class__.__name__))
+            if value < 1:
+                raise PyTextCanvasException('`%s` arg must be 1 or greater, not %r' % (name, value))
+        if method not in ('nearest', 'density', 'priority'):
+            raise PyTextCanvasException("method must be 'nearest', 'density', or 'priority', not %r" % (method))
+        if method == 'priority' and not isinstance(priority, str):
+            raise PyTextCanvasException("the 'priority' method needs a priority string")
+
+        charRows, attrRows = self._getRows()
+        if method == 'nearest' or (width >= self._width and height >= self._height):
+            getCols = _nearestItemGetter(self._width, width)
+            rows = [(getCols(charRows[y]), getCols(attrRows[y])) for y in _nearestIndexes(self._height, height)]
+            return self._newFromRows([row[0] for row in rows], [row[1] for row in rows])
+
+        newChars, newAttrs = [], []
+        colBlocks = _blockBounds(self._width, width)
+        for top, bottom in _blockBounds(self._height, height):
+            chars, attrs = [], []
+            for left, right in colBlocks:
+                blockChars = ''.join([row[left:right] for row in charRows[top:bottom]])
+                blockAttrs = b''.join([row[left:right] for row in attrRows[top:bottom]])
+                char = _pickBlockChar(blockChars, priority if method == 'priority' else '')
+                chars.append(char)
+                attrs.append(blockAttrs[blockChars.index(char)])
+            newChars.append(chars)
+            newAttrs.append(attrs)
+        return self._newFromRows(newChars, newAttrs)
 
 
     def vflip(self):
@@ -903,12 +1826,10 @@ class Canvas:
         ,B,,
         A,,,
         """
-        for y in range(0, self.height // 2):
-            for x in range(0, self.width):
-                self._chars[x][y], self._chars[x][self.height - 1 - y] = self._chars[x][self.height - 1 - y], self._chars[x][y]
-                self._fginfo[x][y], self._fginfo[x][self.height - 1 - y] = self._fginfo[x][self.height - 1 - y], self._fginfo[x][y]
-                self._bginfo[x][y], self._bginfo[x][self.height - 1 - y] = self._bginfo[x][self.height - 1 - y], self._bginfo[x][y]
-        self._strDirty = True
+        self._checkWritable()
+        self._storage.reverseRows()
+        self._rowCache.reverse() # The cached rows are still valid, just in reverse order.
+        self._strCache = None
 
 
     def hflip(self):
@@ -933,17 +1854,19 @@ class Canvas:
         ,C,,
         D,,,
         """
-        for x in range(0, self.width // 2):
-            for y in range(0, self.height):
-                self._chars[x][y], self._chars[self.width - 1 - x][y] = self._chars[self.width - 1 - x][y], self._chars[x][y]
-                self._fginfo[x][y], self._fginfo[self.width - 1 - x][y] = self._fginfo[self.width - 1 - x][y], self._fginfo[x][y]
-                self._bginfo[x][y], self._bginfo[self.width - 1 - x][y] = self._bginfo[self.width - 1 - x][y], self._bginfo[x][y]
-        self._strDirty = True
+        self._checkWritable()
+        self._storage.reverseCols()
+        self._markRowsDirty()
 
 
-    def fill(self, char=' '):
+    def fill(self, char=' ', left=0, top=0, width=None, height=None):
         """Clears the entire canvas by setting every cell to `char`, which
-        is ' ' by default.
+        is ' ' by default. The cells' colors are set to the canvas's `fg`
+        and `bg`.
+
+        To fill only a rectangular area, pass its `left`, `top`, `width`,
+        and `height`. The `width` and `height` default to the rest of the
+        canvas. Any part of the area that is off the canvas is ignored.
 
         >>> canvas = Canvas(4, 4)
         >>> canvas.fill('x')
@@ -958,24 +1881,54 @@ class Canvas:
         QQQQ
         QQQQ
         QQQQ
+        >>> canvas.fill('-', 1, 1, 2, 2)
+        >>> print(canvas)
+        QQQQ
+        Q--Q
+        Q--Q
+        QQQQ
         """
+        self._checkWritable()
         if char is not None:
             char = str(char)
             if len(char) != 1:
                 raise PyTextCanvasException('char must be a single character or None')
+        else:
+            char = NONE_CHAR
 
-        for x in range(self.width):
-            for y in range(self.height):
-                self._chars[x][y] = char
-                self._fginfo[x][y] = self._fg
-                self._bginfo[x][y] = self._bg
-        self._strDirty = True
+        left, top, right, bottom = self._clipRegion(left, top, width, height)
+        if left >= right or top >= bottom:
+            return # The area is entirely off the canvas.
+        self._storage.fillChars(left, top, right, bottom, char)
+        self._storage.fillAttrs(left, top, right, bottom, packAttr(self._fg, self._bg))
+        self._markRowsDirty(top, bottom)
+
+
+    def _clipRegion(self, left, top, width, height):
+        """Checks the arguments for a rectangular area and returns a tuple of
+        its (left, top, right, bottom) edges, clipped to the canvas. The
+        right and bottom edges are exclusive. If `width` or `height` is None,
+        the area extends to the right or bottom edge of the canvas."""
+        if width is None:
+            width = self._width - left
+        if height is None:
+            height = self._height - top
+        for name, value in (('left', left), ('top', top), ('width', width), ('height', height)):
+            if not isinstance(value, int):
+                raise PyTextCanvasException('`%s` arg must be an int, not %r' % (name, value.__class__.__name__))
+        if width < 0 or height < 0:
+            raise PyTextCanvasException('`width` and `height` args must be 0 or greater')
+        return max(left, 0), max(top, 0), min(left + width, self._width), min(top + height, self._height)
 
 
-    def replace(self, oldChar, newChar):
+    def replace(self, oldChar, newChar, left=0, top=0, width=None, height=None):
         r"""
         Replaces every instance of the `oldChar` single-character string with
-        the `newChar` single-character string on the canvas.
+        the `newChar` single-character string on the canvas. The replaced
+        cells' colors are set to the canvas's `fg` and `bg`.
+
+        To replace only in a rectangular area, pass its `left`, `top`,
+        `width`, and `height`, like with `fill()`.
 
         >>> canvas = Canvas(4, 4, loads='__He\nllo_\nworl\nd___')
         >>> print(canvas)
@@ -989,7 +1942,14 @@ class Canvas:
         llox
         worl
         dxxx
+        >>> canvas.replace('x', '-', 0, 1, 2, 3)
+        >>> print(canvas)
+        xxHe
+        llox
+        worl
+        d-xx
         """
+        self._checkWritable()
         if oldChar is not None:
             oldChar = str(oldChar)
             if len(oldChar) != 1:
@@ -1000,13 +1960,74 @@ class Canvas:
             if len(newChar) != 1:
                 raise PyTextCanvasException('newChar must be a single character or None')
 
-        for x in range(self.width):
-            for y in range(self.height):
-                if self._chars[x][y] == oldChar:
-                    self._chars[x][y] = newChar
-                    self._fginfo[x][y] = self.fg
-                    self._bginfo[x][y] = self.bg
-                    self._strDirty = True
+        left, top, right, bottom = self._clipRegion(left, top, width, height)
+        if left >= right or top >= bottom:
+            return # The area is entirely off the canvas.
+        rawOld = NONE_CHAR if oldChar is None else oldChar
+        rawNew = NONE_CHAR if newChar is None else newChar
+        for y in self._storage.replaceChars(rawOld, rawNew, packAttr(self._fg, self._bg), left, top, right, bottom):
+            self._markRowDirty(y)
+
+
+    def translate(self, table, colorTable=None, left=0, top=0, width=None, height=None):
+        r"""
+        Replaces many characters on the canvas in one pass. `table` is a
+        mapping like the ones `str.maketrans()` returns: the keys are
+        characters (or their ordinals) and the values are the characters
+        (or ordinals) to replace them with. Unlike `str.translate()`, a key or
+        value of None means a None cell. Characters not in `table` are left
+        alone.
+
+        If `colorTable` is given, it is a mapping of color constants (or
+        None) to the color constants (or None) to change them to, which is
+        applied to both the foreground and background colors of every cell.
+        Unlike `replace()`, the colors aren't set to the canvas's `fg` and `bg`.
+
+        To translate only a rectangular area, pass its `left`, `top`,
+        `width`, and `height`, like with `fill()`.
+
+        >>> canvas = Canvas(5, 3, loads='+---+\n|   |\n+---+')
+        >>> canvas.translate(str.maketrans('+-|', '┌─│'))
+        >>> canvas.translate({'┌': '#'}, left=4, top=2)
+        >>> print(canvas)
+        ┌───┌
+        │   │
+        ┌───#
+        """
+        self._checkWritable()
+        charTable = {}
+        try:
+            for key, value in table.items():
+                if key is None:
+                    key = NONE_CHAR
+                if isinstance(key, str):
+                    key = ord(key)
+                if value is None:
+                    value = NONE_CHAR
+                elif isinstance(value, int):
+                    value = chr(value)
+                if not isinstance(key, int) or not isinstance(value, str) or len(value) != 1:
+                    raise TypeError
+                charTable[key] = value
+        except (TypeError, ValueError, AttributeError):
+            raise PyTextCanvasException('table must map single characters or ordinals to single characters, ordinals, or None')
+
+        attrTable = None
+        if colorTable is not None:
+            if not all([_isValidColor(color) for color in (set(colorTable.keys()) | set(colorTable.values()))]):
+                raise PyTextCanvasException('colorTable must map None or the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants to each other')
+            # Build the table for bytes.translate() from every possible half
+            # of an attribute byte to its new value.
+            halves = list(range(16))
+            for oldColor, newColor in colorTable.items():
+                halves[packAttr(oldColor, None)] = packAttr(newColor, None)
+            attrTable = bytes([(halves[attr >> 4] << 4) | halves[attr & 0x0F] for attr in range(256)])
+
+        left, top, right, bottom = self._clipRegion(left, top, width, height)
+        if left >= right or top >= bottom:
+            return # The area is entirely off the canvas.
+        for y in self._storage.translateChars(charTable, attrTable, left, top, right, bottom):
+            self._markRowDirty(y)
 
     '''
     # TODO - implement these
@@ -1020,30 +2041,239 @@ class Canvas:
 
         `fg` and `bg` are one of the color constants CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW
         """
+        self._checkWritable()
+        if not _isValidColor(fg) or not _isValidColor(bg):
+            raise PyTextCanvasException('fg and bg must be None or one of the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.')
         if self.isOnCanvas(x, y):
-            if fg is not None:
-                self._fginfo[x][y] = fg
-            if bg is not None:
-                self._bginfo[x][y] = bg
+            # Only change the half of the attribute byte for the colors given.
+            self._storage.paintAttr(x, y, fg, bg)
 
 
     def points(self, char, pointsIterable):
         """
         Draws the `char` character at all the (x, y) tuple coordinates in `pointsIterable`.
         """
-        self._strDirty = True
+        self._checkWritable()
+        if char is not None and not (isinstance(char, str) and len(char) == 1):
+            raise PyTextCanvasException('char must be a single character or None')
+        setCell = self._storage.setCell
+        attr = packAttr(self._fg, self._bg)
+        top, bottom = self._height, -1 # The range of rows that were drawn on.
 
         try:
             for x, y in pointsIterable:
                 if self.isOnCanvas(x, y):
-                    self._chars[x][y] = char
-                    self._fginfo[x][y] = self.fg
-                    self._bginfo[x][y] = self.bg
-                    self._strDirty = True
+                    setCell(x, y, char, attr)
+                    if y < top:
+                        top = y
+                    if y > bottom:
+                        bottom = y
         except PyTextCanvasException:
             raise # Reraise the exception to keep its exception message.
         except Exception:
             raise PyTextCanvasException('pointsIterable argument must be an iterable of (x, y) integer tuples')
+        finally:
+            if top <= bottom:
+                self._markRowsDirty(top, bottom + 1)
+
+
+    def _fillSpans(self, char, spans):
+        """
+        Draws the `char` character in every cell of the horizontal spans in
+        `spans`, an iterable of (y, left, right) tuples where `right` is
+        exclusive. Spans are clipped to the canvas, and each one is written
+        as a single row-span fill of the characters and colors, instead of
+        one cell at a time.
+        """
+        self._checkWritable()
+        if char is None:
+            rawChar = NONE_CHAR
+        elif isinstance(char, str) and len(char) == 1:
+            rawChar = char
+        else:
+            raise PyTextCanvasException('char must be a single character or None')
+
+        storage = self._storage
+        attr = packAttr(self._fg, self._bg)
+        width, height = self._width, self._height
+        top, bottom = height, -1 # The range of rows that were drawn on.
+        try:
+            for y, left, right in spans:
+                if not 0 <= y < height:
+                    continue
+                if left < 0:
+                    left = 0
+                if right > width:
+                    right = width
+                if left >= right:
+                    continue
+                storage.fillChars(left, y, right, y + 1, rawChar)
+                storage.fillAttrs(left, y, right, y + 1, attr)
+                if y < top:
+                    top = y
+                if y > bottom:
+                    bottom = y
+        finally:
+            if top <= bottom:
+                self._markRowsDirty(top, bottom + 1)
+
+
+    def setCells(self, xs, ys, chars, fg=None, bg=None):
+        """
+        Sets many cells at once. `xs` and `ys` are sequences (such as lists,
+        `array.array` objects, or NumPy arrays) of the same length, giving
+        the x and y coordinate of each cell. Coordinates that aren't on the
+        canvas are skipped.
+
+        `chars` is either one character (or None) to set every cell to, or
+        a sequence (including a string) with a character or None for each
+        cell. `fg` and `bg` are either None, to leave the cells' colors
+        unchanged, one color constant for every cell, or a sequence with a
+        color constant (or None, for unchanged) for each cell.
+
+        Everything is checked once before any cell is set.
+
+        >>> canvas = Canvas(4, 2)
+        >>> canvas.fill('-')
+        >>> canvas.setCells([0, 1, 2, 3, 9], [0, 1, 0, 1, 9], 'abcde')
+        >>> print(canvas)
+        a-c-
+        -b-d
+        """
+        self._checkWritable()
+        if isinstance(self._storage, pytextcanvas.storage.NumpyStorage):
+            self._setCellsNumpy(xs, ys, chars, fg, bg)
+            return
+
+        xs, ys = _toList(xs), _toList(ys)
+        numCells = len(xs)
+        if len(ys) != numCells:
+            raise PyTextCanvasException('xs and ys must be the same length')
+        for coords in (xs, ys):
+            if not all([isinstance(coord, numbers.Integral) for coord in coords]):
+                raise PyTextCanvasException('xs and ys must only contain ints')
+
+        if chars is None or (isinstance(chars, str) and len(chars) == 1 and numCells != 1):
+            chars = [chars] * numCells # One char for every cell.
+        else:
+            chars = _toList(chars)
+            if len(chars) != numCells:
+                raise PyTextCanvasException('chars must be one character or have the same length as xs and ys')
+            if not all([char is None or (isinstance(char, str) and len(char) == 1) for char in chars]):
+                raise PyTextCanvasException('chars must only contain single characters or None')
+
+        colorSeqs = []
+        for name, colors in (('fg', fg), ('bg', bg)):
+            if colors is None or isinstance(colors, numbers.Number):
+                colors = [colors] * numCells # One color for every cell.
+            else:
+                colors = _toList(colors)
+                if len(colors) != numCells:
+                    raise PyTextCanvasException('%s must be one color or have the same length as xs and ys' % (name))
+            if not all([_isValidColor(color) for color in colors]):
+                raise PyTextCanvasException('%s must only contain None or the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.' % (name))
+            # NumPy integer scalars become ints.
+            colors = [None if color is None else int(color) for color in colors]
+            colorSeqs.append(colors)
+        fgs, bgs = colorSeqs
+
+        # Clip the cells to the canvas.
+        width, height = self._width, self._height
+        keep = [i for i in range(numCells) if 0 <= xs[i] < width and 0 <= ys[i] < height]
+        if len(keep) != numCells:
+            xs, ys, chars, fgs, bgs = [[seq[i] for i in keep] for seq in (xs, ys, chars, fgs, bgs)]
+        if not keep:
+            return
+
+        storage = self._storage
+        if fg is None and bg is None:
+            setChar = storage.setChar
+            for x, y, char in zip(xs, ys, chars):
+                setChar(x, y, char)
+        else:
+            setChar, paintAttr = storage.setChar, storage.paintAttr
+            for x, y, char, cellFg, cellBg in zip(xs, ys, chars, fgs, bgs):
+                setChar(x, y, char)
+                paintAttr(x, y, cellFg, cellBg)
+        self._markRowsDirty(min(ys), max(ys) + 1)
+
+
+    def _setCellsNumpy(self, xs, ys, chars, fg, bg):
+        """The version of `setCells()` for canvases with `NumpyStorage`, which
+        checks and sets the cells with array operations instead of a loop."""
+        numpy = pytextcanvas.storage.numpy
+        storage = self._storage
+        xs, ys = numpy.asarray(xs), numpy.asarray(ys)
+        numCells = len(xs)
+        if len(ys) != numCells:
+            raise PyTextCanvasException('xs and ys must be the same length')
+        for coords in (xs, ys):
+            if coords.ndim != 1 or (coords.size and coords.dtype.kind not in 'iu'):
+                raise PyTextCanvasException('xs and ys must only contain ints')
+
+        # The code points of the characters, 0 for None.
+        if chars is None or (isinstance(chars, str) and len(chars) == 1 and numCells != 1):
+            codes = 0 if chars is None else ord(chars) # One char for every cell.
+        elif isinstance(chars, str):
+            if len(chars) != numCells:
+                raise PyTextCanvasException('chars must be one character or have the same length as xs and ys')
+            codes = numpy.frombuffer(chars.encode('utf-32-le'), dtype='<u4')
+        else:
+            chars = _toList(chars)
+            if len(chars) != numCells:
+                raise PyTextCanvasException('chars must be one character or have the same length as xs and ys')
+            if not all([char is None or (isinstance(char, str) and len(char) == 1) for char in chars]):
+                raise PyTextCanvasException('chars must only contain single characters or None')
+            codes = numpy.array([0 if char is None else ord(char) for char in chars], dtype='<u4')
+
+        # Each color plane is None (unchanged) or a (values, mask) tuple of
+        # the encoded colors and which cells to set (None for every cell).
+        colorPlanes = []
+        for name, colors in (('fg', fg), ('bg', bg)):
+            if colors is None:
+                colorPlanes.append(None)
+                continue
+            if isinstance(colors, numbers.Number):
+                if not _isValidColor(colors):
+                    raise PyTextCanvasException('%s must only contain None or the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.' % (name))
+                colorPlanes.append((int(colors) + 1, None))
+                continue
+            colors = numpy.asarray(colors)
+            if colors.ndim != 1 or len(colors) != numCells:
+                raise PyTextCanvasException('%s must be one color or have the same length as xs and ys' % (name))
+            if colors.dtype.kind in 'iu':
+                if not set(numpy.unique(colors).tolist()) <= _VALID_COLORS:
+                    raise PyTextCanvasException('%s must only contain None or the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.' % (name))
+                colorPlanes.append((colors + 1, None))
+            else:
+                # Sequences with None in them, for cells whose color is left unchanged.
+                colors = colors.tolist()
+                if not all([_isValidColor(color) for color in colors]):
+                    raise PyTextCanvasException('%s must only contain None or the CLEAR, BLACK, WHITE, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW constants.' % (name))
+                values = numpy.array([0 if color is None else color + 1 for color in colors], dtype=numpy.uint8)
+                colorPlanes.append((values, values != 0))
+
+        # Clip the cells to the canvas.
+        keep = (xs >= 0) & (xs < self._width) & (ys >= 0) & (ys < self._height)
+        if not keep.all():
+            xs, ys = xs[keep], ys[keep]
+            if not isinstance(codes, int):
+                codes = codes[keep]
+            colorPlanes = [plane if plane is None or isinstance(plane[0], int) else
+                           (plane[0][keep], None if plane[1] is None else plane[1][keep]) for plane in colorPlanes]
+        if not len(xs):
+            return
+
+        storage.chars[ys, xs] = codes
+        for colorArray, plane in zip((storage.fg, storage.bg), colorPlanes):
+            if plane is None:
+                continue
+            values, mask = plane
+            if mask is None:
+                colorArray[ys, xs] = values
+            else:
+                colorArray[ys[mask], xs[mask]] = values[mask]
+        self._markRowsDirty(int(ys.min()), int(ys.max()) + 1)
 
 
     def square(self, char, left, top, length, filled=False, thickness=1):
@@ -1065,8 +2295,7 @@ class Canvas:
         x o   o
         xxooooo
         """
-        pointsIterable = pybresenham.rectangle(left, top, length, length, filled, thickness)
-        self.points(char, pointsIterable)
+        self.rectangle(char, left, top, length, length, filled, thickness)
 
     def rectangle(self, char, left, top, width, height, filled=False, thickness=1):
         """
@@ -1090,39 +2319,90 @@ class Canvas:
         if thickness != 1:
             raise NotImplementedError('The pytextcanvas module is under development and the filled, thickness, and endcap parameters are not implemented. You can contribute at https://github.com/asweigart/pytextcanvas')
 
-        pointsIterable = pybresenham.rectangle(left, top, width, height, filled, thickness)
-        self.points(char, pointsIterable)
+        for arg in (left, top, width, height):
+            _checkForIntOrFloat(arg)
+        left, top, width, height = int(left), int(top), int(width), int(height)
+        if width < 1 or height < 1:
+            raise PyTextCanvasException('width and height must be positive integers')
+
+        self._fillSpans(char, _rectangleSpans(left, top, width, height, filled, self._height))
 
     def diamond(self, char, left, top, radius, filled=False, thickness=1):
-        pointsIterable = pybresenham.diamond(left, top, radius, filled, thickness)
-        self.points(char, pointsIterable)
+        if thickness != 1:
+            raise NotImplementedError('The pytextcanvas module is under development and the filled, thickness, and endcap parameters are not implemented. You can contribute at https://github.com/asweigart/pytextcanvas')
+        for arg in (left, top, radius):
+            _checkForIntOrFloat(arg)
+        self._fillSpans(char, _diamondSpans(int(left), int(top), int(radius), filled, self._height))
 
 
     def line(self, char, x1, y1, x2, y2, thickness=1, endcap=None):
-        pointsIterable = pybresenham.line(x1, y1, x2, y2, thickness, endcap)
-        self.points(char, pointsIterable)
+        if thickness != 1 or endcap is not None:
+            raise NotImplementedError('The pytextcanvas module is under development and the filled, thickness, and endcap parameters are not implemented. You can contribute at https://github.com/asweigart/pytextcanvas')
+        self.points(char, _clipLine(x1, y1, x2, y2, self._width, self._height))
 
 
     def lines(self, char, points, closed=False, thickness=1, endcap=None):
-        pointsIterable = pybresenham.lines(points, closed, thickness, endcap)
-        self.points(char, pointsIterable)
+        if thickness != 1 or endcap is not None:
+            raise NotImplementedError('The pytextcanvas module is under development and the filled, thickness, and endcap parameters are not implemented. You can contribute at https://github.com/asweigart/pytextcanvas')
+        self.points(char, _clipLines(points, closed, self._width, self._height))
 
 
     def polygon(self, char, centerx, centery, radius, sides, rotationDegrees=0, stretchHorizontal=1.0, stretchVertical=1.0, filled=False, thickness=1):
-        pointsIterable = pybresenham.polygon(centerx, centery, radius, sides, rotationDegrees, stretchHorizontal, stretchVertical, filled, thickness)
-        self.points(char, pointsIterable)
+        if thickness != 1:
+            raise NotImplementedError('The pytextcanvas module is under development and the filled, thickness, and endcap parameters are not implemented. You can contribute at https://github.com/asweigart/pytextcanvas')
+        vertices = _regularPolygonVertices(centerx, centery, radius, sides, rotationDegrees, stretchHorizontal, stretchVertical)
+        if filled:
+            xs, ys = [x for x, y in vertices], [y for x, y in vertices]
+            # (pybresenham's lines can stray one cell past their endpoints.)
+            if max(xs) < -1 or min(xs) > self._width or max(ys) < -1 or min(ys) > self._height:
+                return # The polygon is entirely off the canvas.
+            # Regular polygons are convex, so each row is one span across the
+            # outline. The outline can't be clipped, or the spans would be cut short.
+            self._fillSpans(char, _outlineSpans(pybresenham.lines(vertices, closed=True)))
+        else:
+            self.points(char, _clipLines(vertices, True, self._width, self._height))
 
 
     def polygonVertices(self, char, centerx, centery, radius, sides, rotationDegrees=0, stretchHorizontal=1.0, stretchVertical=1.0):
-        pointsIterable = pybresenham.polygonVertices(centerx, centery, radius, sides, rotationDegrees, stretchHorizontal, stretchVertical)
+        pointsIterable = _regularPolygonVertices(centerx, centery, radius, sides, rotationDegrees, stretchHorizontal, stretchVertical)
         self.points(char, pointsIterable)
 
 
+    def fillPolygon(self, char, vertices, rule='evenodd'):
+        """
+        Fills in the polygon with the (x, y) corners in `vertices` with the
+        `char` character. The polygon can be any shape (concave, or with
+        edges that cross each other) and is closed automatically. The `rule`
+        argument decides which parts of a self-intersecting polygon are
+        inside it: 'evenodd' or 'nonzero'.
+
+        A cell is filled if its center, at integer coordinates, is inside the
+        polygon. Cells exactly on the bottom or right edges are not filled,
+        so polygons that share an edge don't overlap.
+
+        The polygon is filled with a scanline algorithm that writes whole
+        spans to the canvas, so it is fast even for thousands of vertices.
+
+        >>> canvas = Canvas(6, 4)
+        >>> canvas.fill('.')
+        >>> canvas.fillPolygon('#', [(0, 0), (5, 0), (0, 4)])
+        >>> print(canvas)
+        #####.
+        ####..
+        ###...
+        ##....
+        """
+        if rule not in ('evenodd', 'nonzero'):
+            raise PyTextCanvasException("rule must be 'evenodd' or 'nonzero'")
+
+        self._fillSpans(char, _scanlineSpans(vertices, rule, 0, self._height))
+
+
     def floodFill(self, char, x, y):
         points = set()
-        for cx in range(self.width):
-            for cy in range(self.height):
-                if self._chars[cx][cy] != char:
+        for cy, row in enumerate(self.rows()):
+            for cx, c in enumerate(row):
+                if c != char:
                     points.add((cx, cy))
 
         pointsIterable = pybresenham.floodFill(points, x, y)
@@ -1130,13 +2410,29 @@ class Canvas:
 
 
     def circle(self, char, centerx, centery, radius, filled=False, thickness=1):
+        for arg in (centerx, centery, radius):
+            _checkForIntOrFloat(arg)
+        if thickness == 1 and (centerx + radius < 0 or centerx - radius >= self._width or
+                               centery + radius < 0 or centery - radius >= self._height):
+            return # The circle is entirely off the canvas.
+        if filled and thickness == 1:
+            # Circles are convex, so each row is one span across the outline.
+            self._fillSpans(char, _outlineSpans(pybresenham.circle(centerx, centery, radius)))
+            return
         pointsIterable = pybresenham.circle(centerx, centery, radius, filled, thickness)
         self.points(char, pointsIterable)
 
 
     def grid(self, char, gridLeft, gridTop, numBoxesWide, numBoxesHigh, boxWidth, boxHeight, thickness=1):
-        pointsIterable = pybresenham.grid(gridLeft, gridTop, numBoxesWide, numBoxesHigh, boxWidth, boxHeight, thickness)
-        self.points(char, pointsIterable)
+        for arg in (gridLeft, gridTop, numBoxesWide, numBoxesHigh, boxWidth, boxHeight, thickness):
+            _checkForIntOrFloat(arg)
+        gridLeft, gridTop = int(gridLeft), int(gridTop)
+        numBoxesWide, numBoxesHigh, boxWidth, boxHeight, thickness = int(numBoxesWide), int(numBoxesHigh), int(boxWidth), int(boxHeight), int(thickness)
+        for name, value in (('numBoxesWide', numBoxesWide), ('numBoxesHigh', numBoxesHigh), ('boxWidth', boxWidth), ('boxHeight', boxHeight), ('thickness', thickness)):
+            if value < 1:
+                raise PyTextCanvasException('%s must be 1 or greater' % (name))
+
+        self._fillSpans(char, _gridSpans(gridLeft, gridTop, numBoxesWide, numBoxesHigh, boxWidth, boxHeight, thickness, self._width, self._height))
 
 
 # TODO - should I use camelcase? I want to match the original Turtle module, but it uses, well, just lowercase.
@@ -1172,15 +2468,356 @@ class Canvas:
 
 
     def rows(self):
+        blankRow = (None,) * self._width
         for y in range(self.height):
-            yield tuple([self._chars[x][y] for x in range(self.width)])
+            chars = self._storage.getRowChars(y)
+            if chars.count(NONE_CHAR) == len(chars):
+                yield blankRow # Fast path for empty rows, which are common in sparse canvases.
+            else:
+                yield tuple([None if c == NONE_CHAR else c for c in chars])
 
 
     def cols(self):
         for x in range(self.width):
-            yield tuple([self._chars[x][y] for y in range(self.height)])
+            yield tuple([self._storage.getChar(x, y) for y in range(self.height)])
+
+
 
 
+class CanvasView(Canvas):
+    """
+    A rectangular subregion of a Canvas object that shares the canvas's
+    cells. A view supports the same reading, writing, and drawing methods
+    as a canvas, with coordinates relative to the view's top left corner.
+    Nothing is copied when the view is created; call `copy()` on the view to
+    get a separate Canvas object with the view's contents.
+
+    Views are created with `Canvas.view()`.
+    """
+    def __init__(self, canvas, left=0, top=0, width=None, height=None):
+        width, height = canvas._checkSubregion(left, top, width, height, 'view')
+
+        self._parent = canvas
+        self._left = left
+        self._top = top
+        storage = pytextcanvas.storage.ViewStorage(canvas._storage, left, top, width, height)
+        Canvas.__init__(self, width, height, fg=canvas.fg, bg=canvas.bg, storage=storage)
+
+
+    @property
+    def parent(self):
+        """The Canvas object that this view is a subregion of."""
+        return self._parent
+
+
+    @property
+    def left(self):
+        """The x coordinate of this view's left edge on the parent canvas."""
+        return self._left
+
+
+    @property
+    def top(self):
+        """The y coordinate of this view's top edge on the parent canvas."""
+        return self._top
+
+
+    def __str__(self):
+        """Return a multiline string representation of this view. Since the
+        parent canvas can change the view's cells at any time, this isn't
+        cached. (The parent canvas does cache its rows.)"""
+        return _renderBand(self._storage.snapshot(), 'text')
+
+
+    def _markRowDirty(self, y):
+        self._parent._markRowDirty(y + self._top)
+
+
+    def _markRowsDirty(self, top=0, bottom=None):
+        if bottom is None:
+            bottom = self._height
+        self._parent._markRowsDirty(top + self._top, bottom + self._top)
+
+
+    def vflip(self):
+        self._checkWritable()
+        self._storage.reverseRows()
+        self._markRowsDirty()
+    vflip.__doc__ = Canvas.vflip.__doc__
+
+
+    def _moveRowCache(self, yOffset, wrap):
+        self._markRowsDirty() # Views don't have their own row cache.
+
+
+class CanvasBatch(object):
+    """
+    A context manager for setting many cells of a Canvas object quickly,
+    returned by `Canvas.batch()`.
+
+    Setting a cell through the batch (`cells[x, y] = char` or
+    `cells.set(x, y, char, fg, bg)`) skips the checks that the canvas's
+    `__setitem__()` does: `x` and `y` must be ints on the canvas (negative
+    indexes aren't supported) and `char` must be a single character or
+    None. The rows changed through the batch are marked dirty once, when
+    the `with` block ends, so `str()` of the canvas doesn't show them until
+    then. The canvas's own methods can still be used in the block.
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._storage = canvas._storage
+        self._top = canvas.height # The range of changed rows, empty so far.
+        self._bottom = 0
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.flush()
+
+
+    def flush(self):
+        """Marks the rows changed so far as dirty. This is done automatically
+        at the end of the `with` block."""
+        if self._top < self._bottom:
+            self.canvas._markRowsDirty(self._top, self._bottom)
+            self._top, self._bottom = self.canvas.height, 0
+
+
+    def __getitem__(self, key):
+        return self._storage.getChar(key[0], key[1])
+
+
+    def __setitem__(self, key, char):
+        x, y = key
+        self._storage.setChar(x, y, char)
+        if y < self._top:
+            self._top = y
+        if y >= self._bottom:
+            self._bottom = y + 1
+
+
+    def set(self, x, y, char, fg=None, bg=None):
+        """Sets the cell at `x`, `y` to `char`. If `fg` or `bg` are given, the
+        cell's colors are also changed, like `Canvas.paint()`."""
+        storage = self._storage
+        if fg is None and bg is None:
+            storage.setChar(x, y, char)
+        else:
+            attr = storage.getAttr(x, y)
+            if fg is not None:
+                attr = (attr & 0xF0) | packAttr(fg, None)
+            if bg is not None:
+                attr = (attr & 0x0F) | packAttr(None, bg)
+            storage.setCell(x, y, char, attr)
+        if y < self._top:
+            self._top = y
+        if y >= self._bottom:
+            self._bottom = y + 1
+
+
+class SharedCanvas(Canvas):
+    """
+    A Canvas object whose cells are kept in a `multiprocessing.shared_memory`
+    block, so several processes can draw on the same canvas at once (for
+    example, each drawing a different region) and hand it to the process
+    that renders it without copying any cells.
+
+    Create the canvas in one process with `SharedCanvas(width, height)`, and
+    attach to it from other processes with `SharedCanvas.attach(name)`.
+    SharedCanvas objects can also be pickled, such as when passed to
+    `multiprocessing` or `concurrent.futures` workers, which attaches them
+    instead of copying the cells.
+
+    Every process should call `close()` when done with the canvas, and the
+    process that created it should then call `unlink()` to free the memory.
+
+    The cells can be changed by other processes at any time, so a
+    SharedCanvas doesn't cache its string. Changes to the same cells from
+    different processes at the same time are not synchronized.
+    """
+    def __init__(self, width=None, height=None, loads=None, fg=None, bg=None, name=None):
+        if name is not None:
+            try:
+                storage = SharedMemoryStorage(name=name)
+            except (ValueError, OSError) as exc:
+                raise PyTextCanvasException('could not attach to shared canvas %r: %s' % (name, exc))
+            width, height = storage.width, storage.height
+            Canvas.__init__(self, width, height, fg=fg, bg=bg, storage=storage)
+        else:
+            # Let Canvas validate the size first, then put the cells in shared memory.
+            Canvas.__init__(self, width, height, loads=loads, fg=fg, bg=bg,
+                            storage=lambda width, height: SharedMemoryStorage(width, height))
+
+
+    @classmethod
+    def attach(cls, name):
+        """Returns a SharedCanvas object for the existing shared canvas called
+        `name`, which may have been created by another process."""
+        return cls(name=name)
+
+
+    @property
+    def name(self):
+        """The name of this canvas's shared memory block, which is passed to
+        `attach()` in other processes.
+
+        This is a read-only attribute."""
+        return self._storage.name
+
+
+    def close(self):
+        """Detaches this process from the shared canvas. This object can't be
+        used afterwards."""
+        self._storage.close()
+
+
+    def unlink(self):
+        """Frees the shared canvas's memory once every process has called
+        `close()`. Only the process that created the canvas should call this."""
+        self._storage.unlink()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+    def __reduce__(self):
+        # Pickling a shared canvas sends its name, not its cells.
+        return (self.__class__.attach, (self.name,))
+
+
+class TerminalRenderer(object):
+    """
+    Draws a canvas to an ANSI terminal, sending only the cells that changed
+    since the last frame this renderer drew. Changed cells are written as
+    runs, each starting with an ANSI cursor-positioning sequence, and color
+    codes are only sent when the color changes.
+
+    The canvas is drawn with its top left corner at the `left` and `top`
+    terminal coordinates (where 0, 0 is the top left of the terminal). The
+    output is written to `stream`, which is `sys.stdout` by default.
+
+    The renderer assumes nothing else writes over the area it draws to. If
+    something does, call `invalidate()` so the next frame is drawn in full.
+
+    >>> import io
+    >>> stream = io.StringIO()
+    >>> renderer = TerminalRenderer(stream)
+    >>> canvas = Canvas(10, 4)
+    >>> renderer.present(canvas) # The first frame draws every cell.
+    40
+    >>> canvas[3, 2] = 'x'
+    >>> renderer.present(canvas)
+    1
+    >>> renderer.present(canvas) # Nothing has changed.
+    0
+    """
+
+    # Changed runs in a row that are separated by this many unchanged cells
+    # or fewer are merged, since re-sending a few cells is cheaper than a new
+    # cursor-positioning sequence.
+    MERGE_GAP = 4
+
+    def __init__(self, stream=None, left=0, top=0):
+        self.stream = stream
+        self.left = left
+        self.top = top
+        self.invalidate()
+
+
+    def invalidate(self):
+        """Forgets the last frame, so that the next call to `present()` draws
+        every cell of the canvas."""
+        self._lastSize = None
+        self._lastChars = None # The displayed characters of each row of the last frame.
+        self._lastAttrs = None # The attribute bytes of each row of the last frame.
+
+
+    def present(self, canvas):
+        """Draws the cells of `canvas` that changed since the last frame.
+        Returns the number of changed cells.
+
+        If the canvas is smaller than the last frame, the area the last frame
+        covered outside of the canvas is cleared with spaces. These cleared
+        cells aren't counted in the return value."""
+        width, height = canvas.size
+        output = []
+        if self._lastSize != (width, height):
+            if self._lastSize is not None:
+                self._clearUncovered(output, width, height)
+            self._lastSize = (width, height)
+            self._lastChars = [None] * height
+            self._lastAttrs = [None] * height
+
+        storage = canvas._storage.snapshot()
+        lastChars, lastAttrs = self._lastChars, self._lastAttrs
+        # Every frame ends with the colors reset, so frames start with them reset.
+        fgCode, bgCode = Fore.RESET, Back.RESET
+        numChanged = 0
+
+        for y in range(height):
+            chars = storage.getRowChars(y).replace(NONE_CHAR, ' ')
+            attrs = storage.getRowAttrs(y)
+            if chars == lastChars[y] and attrs == lastAttrs[y]:
+                continue # Fast path for unchanged rows.
+
+            for start, end in self._changedRuns(chars, attrs, lastChars[y], lastAttrs[y]):
+                output.append(pytextcanvas.terminal.moveCursorSequence(self.left + start, self.top + y))
+                fgCode, bgCode = _appendColoredText(output, chars[start:end], attrs[start:end], fgCode, bgCode)
+                numChanged += end - start
+            lastChars[y] = chars
+            lastAttrs[y] = attrs
+
+        if output:
+            # Reset the colors and park the cursor below the canvas.
+            if fgCode != Fore.RESET or bgCode != Back.RESET:
+                output.append(Fore.RESET + Back.RESET)
+            output.append(pytextcanvas.terminal.moveCursorSequence(0, self.top + height))
+            _writeToStream(sys.stdout if self.stream is None else self.stream, ''.join(output))
+        return numChanged
+
+
+    def _clearUncovered(self, output, width, height):
+        """Appends the output that blanks the part of the last frame's area
+        that a `width` x `height` canvas doesn't cover."""
+        lastWidth, lastHeight = self._lastSize
+        if width < lastWidth:
+            # The columns to the right of the canvas.
+            for y in range(min(height, lastHeight)):
+                output.append(pytextcanvas.terminal.moveCursorSequence(self.left + width, self.top + y))
+                output.append(' ' * (lastWidth - width))
+        # The rows below the canvas.
+        for y in range(height, lastHeight):
+            output.append(pytextcanvas.terminal.moveCursorSequence(self.left, self.top + y))
+            output.append(' ' * lastWidth)
+
+
+    def _changedRuns(self, chars, attrs, lastChars, lastAttrs):
+        """Returns a list of (start, end) tuples of the runs of cells in a
+        row that differ from the last frame's row."""
+        if lastChars is None:
+            return [(0, len(chars))]
+
+        runs = []
+        runStart = runEnd = None
+        for x in range(len(chars)):
+            if chars[x] != lastChars[x] or attrs[x] != lastAttrs[x]:
+                if runStart is None:
+                    runStart = x
+                elif x - runEnd > self.MERGE_GAP:
+                    runs.append((runStart, runEnd))
+                    runStart = x
+                runEnd = x + 1
+        if runStart is not None:
+            runs.append((runStart, runEnd))
+        return runs
 
 
 if __name__ == '__main__':
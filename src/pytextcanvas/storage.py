@@ -0,0 +1,1503 @@
+"""
+Storage engines for the cells of a Canvas object.
+
+A storage engine holds the character plane and the color attribute plane of
+a canvas. The `Canvas` class does all of the argument checking
+and calls the storage engine with coordinates that are already known to be
+on the canvas, so the engines themselves don't do any validation.
+
+Storage engines are row-major: row-wide operations (which is what `__str__`
+and `print()` need) are the fast path, and single-cell access is the slow
+path.
+
+Characters are stored as single-character strings, with `NONE_CHAR` standing
+in for a transparent `None` cell. The foreground and background colors of a
+cell are packed into a single attribute byte: the low four bits hold the
+foreground and the high four bits hold the background. Each color is stored
+as its color constant plus one, with `NONE_COLOR` (zero) standing in for a
+`None` color, so an attribute byte of zero means "no colors set". The
+row-span methods (the ones with "Row" in their name) use these raw
+characters and attribute bytes, while the single-cell methods use the
+`None`/color-constant values that the `Canvas` class uses.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None # NumpyStorage is only available if NumPy is installed.
+
+
+# The character stored in a cell that is set to None (i.e. transparent).
+NONE_CHAR = '\x00'
+
+# The raw value stored for a color that is set to None.
+NONE_COLOR = 0
+
+# The attribute byte for a cell with both colors set to None.
+NONE_ATTR = 0
+
+# 'u' is deprecated in Python 3.13 in favor of the equivalent 'w' typecode.
+try:
+    array('w')
+    CHAR_TYPECODE = 'w'
+except ValueError:
+    CHAR_TYPECODE = 'u'
+
+
+def packAttr(fg, bg):
+    """Returns the attribute byte for the `fg` and `bg` colors, which are
+    None or one of the color constants.
+
+    >>> packAttr(None, None)
+    0
+    >>> packAttr(0, None)
+    1
+    >>> packAttr(None, 0)
+    16
+    """
+    return (NONE_COLOR if fg is None else fg + 1) | ((NONE_COLOR if bg is None else bg + 1) << 4)
+
+
+def unpackAttr(attr):
+    """Returns a tuple of the fg and bg colors (each None or one of the color
+    constants) in the attribute byte `attr`.
+
+    >>> unpackAttr(0)
+    (None, None)
+    >>> unpackAttr(packAttr(3, 5))
+    (3, 5)
+    """
+    fg = attr & 0x0F
+    bg = attr >> 4
+    return (None if fg == NONE_COLOR else fg - 1), (None if bg == NONE_COLOR else bg - 1)
+
+
+def _shiftSpan(span, dx, wrap, blank):
+    """Returns the row span `span` (a string, bytes, array, or bytearray)
+    with its contents moved `dx` places to the right (left, if negative).
+    With `wrap`, the contents moved off one end come back on the other end;
+    otherwise they are lost and `blank` (of the same type as `span`, with
+    a length of abs(dx)) fills in the exposed end."""
+    if dx == 0:
+        return span
+    if wrap:
+        return span[-dx:] + span[:-dx]
+    if dx > 0:
+        return blank + span[:-dx]
+    return span[-dx:] + blank
+
+
+class Storage(object):
+    """
+    The base class for storage engines. Subclasses must implement the
+    `getRowChars()`, `setRowChars()`, `getRowAttrs()`, and `setRowAttrs()`
+    methods. Every other method has a default implementation built on top of
+    those four, which subclasses can override with faster versions.
+    """
+    # True if the cells can be changed by something other than the Canvas
+    # object using this storage (such as another process), in which case the
+    # Canvas doesn't cache its string.
+    volatile = False
+    # True if the cells can't be changed, in which case the Canvas raises an
+    # exception before trying to change them.
+    readonly = False
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+    def getRowChars(self, y, left=0, right=None):
+        """Returns the raw characters of row `y` from `left` up to (but not
+        including) `right` as a string."""
+        raise NotImplementedError
+
+
+    def setRowChars(self, y, left, text):
+        """Sets the raw characters in `text` to row `y` starting at `left`."""
+        raise NotImplementedError
+
+
+    def getRowAttrs(self, y, left=0, right=None):
+        """Returns the attribute bytes of row `y` from `left` up to (but not
+        including) `right` as a bytes object."""
+        raise NotImplementedError
+
+
+    def setRowAttrs(self, y, left, data):
+        """Sets the attribute bytes in the bytes-like `data` to row `y`
+        starting at `left`."""
+        raise NotImplementedError
+
+
+    def getChar(self, x, y):
+        c = self.getRowChars(y, x, x + 1)
+        if c == NONE_CHAR:
+            return None
+        return c
+
+
+    def setChar(self, x, y, char):
+        if char is None:
+            char = NONE_CHAR
+        self.setRowChars(y, x, char)
+
+
+    def getAttr(self, x, y):
+        return self.getRowAttrs(y, x, x + 1)[0]
+
+
+    def setAttr(self, x, y, attr):
+        self.setRowAttrs(y, x, bytes((attr,)))
+
+
+    def getColors(self, x, y):
+        return unpackAttr(self.getAttr(x, y))
+
+
+    def setColors(self, x, y, fg, bg):
+        self.setAttr(x, y, packAttr(fg, bg))
+
+
+    def setCell(self, x, y, char, attr):
+        self.setChar(x, y, char)
+        self.setAttr(x, y, attr)
+
+
+    def paintAttr(self, x, y, fg, bg):
+        """Changes the foreground color of the cell to `fg` and the
+        background color to `bg`, leaving either one unchanged if it is None."""
+        attr = self.getAttr(x, y)
+        if fg is not None:
+            attr = (attr & 0xF0) | packAttr(fg, None)
+        if bg is not None:
+            attr = (attr & 0x0F) | packAttr(None, bg)
+        self.setAttr(x, y, attr)
+
+
+    def fillChars(self, left, top, right, bottom, rawChar):
+        """Sets every cell in the rectangular area to the raw character `rawChar`."""
+        text = rawChar * (right - left)
+        for y in range(top, bottom):
+            self.setRowChars(y, left, text)
+
+
+    def fillAttrs(self, left, top, right, bottom, attr):
+        """Sets every cell in the rectangular area to the attribute byte `attr`."""
+        data = bytes((attr,)) * (right - left)
+        for y in range(top, bottom):
+            self.setRowAttrs(y, left, data)
+
+
+    def reverseRows(self):
+        """Reverses the order of the rows, i.e. flips the storage vertically."""
+        for y in range(self.height // 2):
+            otherY = self.height - 1 - y
+            chars, otherChars = self.getRowChars(y), self.getRowChars(otherY)
+            attrs, otherAttrs = self.getRowAttrs(y), self.getRowAttrs(otherY)
+            self.setRowChars(y, 0, otherChars)
+            self.setRowChars(otherY, 0, chars)
+            self.setRowAttrs(y, 0, otherAttrs)
+            self.setRowAttrs(otherY, 0, attrs)
+
+
+    def reverseCols(self):
+        """Reverses the cells in every row, i.e. flips the storage horizontally."""
+        for y in range(self.height):
+            self.setRowChars(y, 0, self.getRowChars(y)[::-1])
+            self.setRowAttrs(y, 0, self.getRowAttrs(y)[::-1])
+
+
+    def replaceChars(self, rawOld, rawNew, attr=None, left=0, top=0, right=None, bottom=None):
+        """Replaces every raw character `rawOld` with `rawNew` in the
+        rectangular area (the entire storage by default), and sets the
+        attribute byte of those cells to `attr` if it isn't None. Returns a
+        list of the rows that changed."""
+        if right is None:
+            right = self.width
+        if bottom is None:
+            bottom = self.height
+        changedRows = []
+        for y in range(top, bottom):
+            chars = self.getRowChars(y, left, right)
+            if rawOld not in chars:
+                continue
+            changedRows.append(y)
+            self.setRowChars(y, left, chars.replace(rawOld, rawNew))
+            if attr is not None:
+                attrs = bytearray(self.getRowAttrs(y, left, right))
+                x = chars.find(rawOld)
+                while x != -1:
+                    attrs[x] = attr
+                    x = chars.find(rawOld, x + 1)
+                self.setRowAttrs(y, left, attrs)
+        return changedRows
+
+
+    def shiftCells(self, dx, dy, wrap, rawChar, attr):
+        """Moves every cell `dx` columns right and `dy` rows down (negative
+        values move left and up). With `wrap`, cells moved off one edge come
+        back on the opposite edge; otherwise they are lost and the exposed
+        cells are set to the raw character `rawChar` and attribute byte
+        `attr`. `dx` and `dy` must be smaller than the width and height."""
+        width, height = self.width, self.height
+        rows = [(self.getRowChars(y), self.getRowAttrs(y)) for y in range(height)]
+        blankChars, blankAttrs = rawChar * abs(dx), bytes((attr,)) * abs(dx)
+        for y in range(height):
+            sourceY = y - dy
+            if wrap:
+                sourceY %= height
+            elif not 0 <= sourceY < height:
+                # This row was exposed by the move.
+                self.setRowChars(y, 0, rawChar * width)
+                self.setRowAttrs(y, 0, bytes((attr,)) * width)
+                continue
+            chars, attrs = rows[sourceY]
+            self.setRowChars(y, 0, _shiftSpan(chars, dx, wrap, blankChars))
+            self.setRowAttrs(y, 0, _shiftSpan(attrs, dx, wrap, blankAttrs))
+
+
+    def translateChars(self, charTable, attrTable=None, left=0, top=0, right=None, bottom=None):
+        """Maps the raw characters in the rectangular area (the entire
+        storage by default) through `charTable`, a `str.translate()` table
+        whose values are all single raw characters. If `attrTable` isn't
+        None, the attribute bytes are also mapped through it, a 256-byte
+        `bytes.translate()` table. Returns a list of the rows that changed."""
+        if right is None:
+            right = self.width
+        if bottom is None:
+            bottom = self.height
+        changedRows = []
+        for y in range(top, bottom):
+            chars = self.getRowChars(y, left, right)
+            newChars = chars.translate(charTable)
+            changed = newChars != chars
+            if changed:
+                self.setRowChars(y, left, newChars)
+            if attrTable is not None:
+                attrs = self.getRowAttrs(y, left, right)
+                newAttrs = attrs.translate(attrTable)
+                if newAttrs != attrs:
+                    self.setRowAttrs(y, left, newAttrs)
+                    changed = True
+            if changed:
+                changedRows.append(y)
+        return changedRows
+
+
+    def charsEqual(self, other):
+        """Returns True if the storage object `other` (of the same size) has
+        the same characters as this one."""
+        for y in range(self.height):
+            if self.getRowChars(y) != other.getRowChars(y):
+                return False
+        return True
+
+
+    def snapshot(self):
+        """Returns a storage object with the cells as they are right now, for
+        reading the whole storage at once. If nothing else can change the
+        cells (i.e. the storage isn't volatile), this is the storage itself."""
+        if self.volatile:
+            return self.copyRegion(0, 0, self.width, self.height)
+        return self
+
+
+    def copyRegion(self, left, top, width, height):
+        """Returns a new storage object of the same type, with the contents
+        of the rectangular area."""
+        newStorage = self.__class__(width, height)
+        for y in range(height):
+            newStorage.setRowChars(y, 0, self.getRowChars(top + y, left, left + width))
+            newStorage.setRowAttrs(y, 0, self.getRowAttrs(top + y, left, left + width))
+        return newStorage
+
+
+class ArrayStorage(Storage):
+    """
+    The default storage engine. Each row of characters is an `array`, and
+    each row of attribute bytes is a `bytearray`. This takes one machine
+    character and one byte per cell, instead of three Python object pointers
+    per cell.
+
+    Rows are copy-on-write: full-width copies made with `copyRegion()` share
+    the row objects with the original, and a row is only duplicated when
+    one of the storage objects sharing it writes to it.
+    """
+    def __init__(self, width, height):
+        Storage.__init__(self, width, height)
+
+        blankChars = array(CHAR_TYPECODE, NONE_CHAR * width)
+        self._chars = [blankChars[:] for y in range(height)]
+        self._attrs = [bytearray(width) for y in range(height)]
+        self._owned = [True] * height # False if the row objects may be shared with another storage object.
+
+
+    def _ownRow(self, y):
+        """Gives this storage object its own copy of row `y`. Every method
+        that writes to a row must call this first if the row isn't owned."""
+        self._chars[y] = self._chars[y][:]
+        self._attrs[y] = self._attrs[y][:]
+        self._owned[y] = True
+
+
+    def getRowChars(self, y, left=0, right=None):
+        return self._chars[y][left:right].tounicode()
+
+
+    def setRowChars(self, y, left, text):
+        if not self._owned[y]:
+            self._ownRow(y)
+        self._chars[y][left:left + len(text)] = array(CHAR_TYPECODE, text)
+
+
+    def getRowAttrs(self, y, left=0, right=None):
+        return bytes(self._attrs[y][left:right])
+
+
+    def setRowAttrs(self, y, left, data):
+        if not self._owned[y]:
+            self._ownRow(y)
+        self._attrs[y][left:left + len(data)] = data
+
+
+    def getChar(self, x, y):
+        c = self._chars[y][x]
+        if c == NONE_CHAR:
+            return None
+        return c
+
+
+    def setChar(self, x, y, char):
+        if char is None:
+            char = NONE_CHAR
+        if not self._owned[y]:
+            self._ownRow(y)
+        self._chars[y][x] = char
+
+
+    def getAttr(self, x, y):
+        return self._attrs[y][x]
+
+
+    def setAttr(self, x, y, attr):
+        if not self._owned[y]:
+            self._ownRow(y)
+        self._attrs[y][x] = attr
+
+
+    def setCell(self, x, y, char, attr):
+        if char is None:
+            char = NONE_CHAR
+        if not self._owned[y]:
+            self._ownRow(y)
+        self._chars[y][x] = char
+        self._attrs[y][x] = attr
+
+
+    def fillChars(self, left, top, right, bottom, rawChar):
+        span = array(CHAR_TYPECODE, rawChar * (right - left))
+        owned = self._owned
+        for y in range(top, bottom):
+            if not owned[y]:
+                self._ownRow(y)
+            self._chars[y][left:right] = span
+
+
+    def fillAttrs(self, left, top, right, bottom, attr):
+        span = bytes((attr,)) * (right - left)
+        owned = self._owned
+        for y in range(top, bottom):
+            if not owned[y]:
+                self._ownRow(y)
+            self._attrs[y][left:right] = span
+
+
+    def reverseRows(self):
+        self._chars.reverse()
+        self._attrs.reverse()
+        self._owned.reverse()
+
+
+    def shiftCells(self, dx, dy, wrap, rawChar, attr):
+        if dy != 0:
+            # Moving cells up or down only moves the row objects around.
+            if wrap:
+                for rows in (self._chars, self._attrs, self._owned):
+                    rows[:] = rows[-dy:] + rows[:-dy]
+            else:
+                blankChars = array(CHAR_TYPECODE, rawChar * self.width)
+                newChars = [blankChars[:] for i in range(abs(dy))]
+                newAttrs = [bytearray((attr,)) * self.width for i in range(abs(dy))]
+                newOwned = [True] * abs(dy)
+                if dy > 0:
+                    self._chars = newChars + self._chars[:-dy]
+                    self._attrs = newAttrs + self._attrs[:-dy]
+                    self._owned = newOwned + self._owned[:-dy]
+                else:
+                    self._chars = self._chars[-dy:] + newChars
+                    self._attrs = self._attrs[-dy:] + newAttrs
+                    self._owned = self._owned[-dy:] + newOwned
+
+        if dx != 0:
+            # Every row is replaced with a new (and so, owned) row object.
+            blankChars = array(CHAR_TYPECODE, rawChar * abs(dx))
+            blankAttrs = bytearray((attr,)) * abs(dx)
+            for y in range(self.height):
+                self._chars[y] = _shiftSpan(self._chars[y], dx, wrap, blankChars)
+                self._attrs[y] = _shiftSpan(self._attrs[y], dx, wrap, blankAttrs)
+            self._owned = [True] * self.height
+
+
+    def reverseCols(self):
+        for y in range(self.height):
+            if self._owned[y]:
+                self._chars[y].reverse()
+                self._attrs[y].reverse()
+            else:
+                # Reversing a shared row in place would change the other
+                # storage objects too, so make reversed copies instead.
+                self._chars[y] = self._chars[y][::-1]
+                self._attrs[y] = self._attrs[y][::-1]
+                self._owned[y] = True
+
+
+    def copyRegion(self, left, top, width, height):
+        newStorage = self.__class__.__new__(self.__class__)
+        Storage.__init__(newStorage, width, height)
+        right, bottom = left + width, top + height
+
+        if left == 0 and width == self.width:
+            # Full-width copies share the row objects until either side writes to them.
+            newStorage._chars = self._chars[top:bottom]
+            newStorage._attrs = self._attrs[top:bottom]
+            newStorage._owned = [False] * height
+            self._owned[top:bottom] = [False] * height
+        else:
+            newStorage._chars = [row[left:right] for row in self._chars[top:bottom]]
+            newStorage._attrs = [row[left:right] for row in self._attrs[top:bottom]]
+            newStorage._owned = [True] * height
+        return newStorage
+
+
+class ViewStorage(Storage):
+    """
+    A storage engine for a rectangular area of another storage engine. It
+    holds no cells of its own: every call is translated to the `parent`
+    storage, so changes made through either one are seen by the other.
+    """
+    def __init__(self, parent, left, top, width, height):
+        Storage.__init__(self, width, height)
+        if isinstance(parent, ViewStorage):
+            # Views of views translate straight to the underlying storage.
+            left += parent.left
+            top += parent.top
+            parent = parent.parent
+        self.parent = parent
+        self.left = left
+        self.top = top
+
+
+    @property
+    def volatile(self):
+        return self.parent.volatile
+
+
+    @property
+    def readonly(self):
+        return self.parent.readonly
+
+
+    def getRowChars(self, y, left=0, right=None):
+        if right is None:
+            right = self.width
+        return self.parent.getRowChars(y + self.top, left + self.left, right + self.left)
+
+
+    def setRowChars(self, y, left, text):
+        self.parent.setRowChars(y + self.top, left + self.left, text)
+
+
+    def getRowAttrs(self, y, left=0, right=None):
+        if right is None:
+            right = self.width
+        return self.parent.getRowAttrs(y + self.top, left + self.left, right + self.left)
+
+
+    def setRowAttrs(self, y, left, data):
+        self.parent.setRowAttrs(y + self.top, left + self.left, data)
+
+
+    def getChar(self, x, y):
+        return self.parent.getChar(x + self.left, y + self.top)
+
+
+    def setChar(self, x, y, char):
+        self.parent.setChar(x + self.left, y + self.top, char)
+
+
+    def getAttr(self, x, y):
+        return self.parent.getAttr(x + self.left, y + self.top)
+
+
+    def setAttr(self, x, y, attr):
+        self.parent.setAttr(x + self.left, y + self.top, attr)
+
+
+    def setCell(self, x, y, char, attr):
+        self.parent.setCell(x + self.left, y + self.top, char, attr)
+
+
+    def paintAttr(self, x, y, fg, bg):
+        self.parent.paintAttr(x + self.left, y + self.top, fg, bg)
+
+
+    def fillChars(self, left, top, right, bottom, rawChar):
+        self.parent.fillChars(left + self.left, top + self.top, right + self.left, bottom + self.top, rawChar)
+
+
+    def fillAttrs(self, left, top, right, bottom, attr):
+        self.parent.fillAttrs(left + self.left, top + self.top, right + self.left, bottom + self.top, attr)
+
+
+    def replaceChars(self, rawOld, rawNew, attr=None, left=0, top=0, right=None, bottom=None):
+        if right is None:
+            right = self.width
+        if bottom is None:
+            bottom = self.height
+        changedRows = self.parent.replaceChars(rawOld, rawNew, attr, left + self.left, top + self.top, right + self.left, bottom + self.top)
+        return [y - self.top for y in changedRows]
+
+
+    def copyRegion(self, left, top, width, height):
+        # The copy is a real (materialized) storage object, not another view.
+        return self.parent.copyRegion(left + self.left, top + self.top, width, height)
+
+
+# The default number of rows that share one lock in a LockedStorage.
+LOCK_STRIPE_HEIGHT = 16
+
+
+class _RowsLock(object):
+    """A context manager that holds several of a LockedStorage's locks."""
+    def __init__(self, locks):
+        self.locks = locks
+
+
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+class LockedStorage(Storage):
+    """
+    A storage engine that makes another storage engine (`inner`) safe to use
+    from several threads at once. The rows are divided into stripes of
+    `stripeHeight` rows, and each stripe has its own lock, so threads that
+    write to different rows don't wait on each other. Calls that touch
+    several stripes lock them from top to bottom, so they can't deadlock.
+
+    `snapshot()` and `copyRegion()` hold the locks only while copying the
+    cells, which is cheap for the copy-on-write `ArrayStorage` and
+    `TiledStorage` engines. The copies are not locked.
+    """
+    volatile = True # Other threads can change the cells.
+
+    def __init__(self, inner, stripeHeight=None):
+        Storage.__init__(self, inner.width, inner.height)
+        if stripeHeight is None:
+            stripeHeight = LOCK_STRIPE_HEIGHT
+        if hasattr(inner, 'tileSize'):
+            # Rows that share tiles must share a lock, so round up to whole tiles.
+            stripeHeight = -(-stripeHeight // inner.tileSize) * inner.tileSize
+        self.inner = inner
+        self.stripeHeight = stripeHeight
+        self._locks = [threading.RLock() for i in range((inner.height + stripeHeight - 1) // stripeHeight)]
+
+
+    def lockRows(self, top=0, bottom=None):
+        """Returns a context manager that holds the locks for the rows from
+        `top` up to (but not including) `bottom`, for making several changes
+        that other threads can't see half done. The locks are reentrant, so
+        this storage can still be used while they are held."""
+        if bottom is None:
+            bottom = self.height
+        if bottom <= top:
+            return _RowsLock([])
+        return _RowsLock(self._locks[top // self.stripeHeight:(bottom - 1) // self.stripeHeight + 1])
+
+
+    def getRowChars(self, y, left=0, right=None):
+        with self._locks[y // self.stripeHeight]:
+            return self.inner.getRowChars(y, left, right)
+
+
+    def setRowChars(self, y, left, text):
+        with self._locks[y // self.stripeHeight]:
+            self.inner.setRowChars(y, left, text)
+
+
+    def getRowAttrs(self, y, left=0, right=None):
+        with self._locks[y // self.stripeHeight]:
+            return self.inner.getRowAttrs(y, left, right)
+
+
+    def setRowAttrs(self, y, left, data):
+        with self._locks[y // self.stripeHeight]:
+            self.inner.setRowAttrs(y, left, data)
+
+
+    def getChar(self, x, y):
+        with self._locks[y // self.stripeHeight]:
+            return self.inner.getChar(x, y)
+
+
+    def setChar(self, x, y, char):
+        with self._locks[y // self.stripeHeight]:
+            self.inner.setChar(x, y, char)
+
+
+    def getAttr(self, x, y):
+        with self._locks[y // self.stripeHeight]:
+            return self.inner.getAttr(x, y)
+
+
+    def setAttr(self, x, y, attr):
+        with self._locks[y // self.stripeHeight]:
+            self.inner.setAttr(x, y, attr)
+
+
+    def setCell(self, x, y, char, attr):
+        with self._locks[y // self.stripeHeight]:
+            self.inner.setCell(x, y, char, attr)
+
+
+    def paintAttr(self, x, y, fg, bg):
+        # The attribute byte is read and written back, so hold the lock for both.
+        with self._locks[y // self.stripeHeight]:
+            self.inner.paintAttr(x, y, fg, bg)
+
+
+    def fillChars(self, left, top, right, bottom, rawChar):
+        with self.lockRows(top, bottom):
+            self.inner.fillChars(left, top, right, bottom, rawChar)
+
+
+    def fillAttrs(self, left, top, right, bottom, attr):
+        with self.lockRows(top, bottom):
+            self.inner.fillAttrs(left, top, right, bottom, attr)
+
+
+    def reverseRows(self):
+        with self.lockRows():
+            self.inner.reverseRows()
+
+
+    def reverseCols(self):
+        with self.lockRows():
+            self.inner.reverseCols()
+
+
+    def shiftCells(self, dx, dy, wrap, rawChar, attr):
+        with self.lockRows():
+            self.inner.shiftCells(dx, dy, wrap, rawChar, attr)
+
+
+    def replaceChars(self, rawOld, rawNew, attr=None, left=0, top=0, right=None, bottom=None):
+        with self.lockRows(top, bottom):
+            return self.inner.replaceChars(rawOld, rawNew, attr, left, top, right, bottom)
+
+
+    def translateChars(self, charTable, attrTable=None, left=0, top=0, right=None, bottom=None):
+        with self.lockRows(top, bottom):
+            return self.inner.translateChars(charTable, attrTable, left, top, right, bottom)
+
+
+    def charsEqual(self, other):
+        # Compare against a snapshot of `other` instead of holding both
+        # storages' locks, which could deadlock with a comparison the other
+        # way around in another thread.
+        if isinstance(other, LockedStorage):
+            other = other.snapshot()
+        with self.lockRows():
+            return self.inner.charsEqual(other)
+
+
+    def copyRegion(self, left, top, width, height):
+        with self.lockRows(top, top + height):
+            return self.inner.copyRegion(left, top, width, height)
+
+
+class _Tile(object):
+    """A square block of cells in a `TiledStorage`. The cells are stored
+    row-major, like a small `ArrayStorage` in one array and one bytearray."""
+    __slots__ = ('chars', 'attrs')
+
+    def __init__(self, tileSize, chars=None, attrs=None):
+        if chars is None:
+            chars = array(CHAR_TYPECODE, NONE_CHAR * (tileSize * tileSize))
+            attrs = bytearray(tileSize * tileSize)
+        self.chars = chars
+        self.attrs = attrs
+
+
+    def copy(self):
+        return _Tile(None, self.chars[:], self.attrs[:])
+
+
+    def isBlank(self):
+        return self.chars.count(NONE_CHAR) == len(self.chars) and self.attrs.count(NONE_ATTR) == len(self.attrs)
+
+
+class TiledStorage(Storage):
+    """
+    A sparse storage engine for very large or mostly empty canvases. The
+    canvas is divided into square tiles of `tileSize` x `tileSize` cells, and
+    a tile is only allocated the first time a non-None character or color is
+    written to it. Every unallocated tile is read as all None cells, and
+    tiles that are cleared back to all None are freed.
+
+    Reading rows with no allocated tiles is fast, as is writing None cells to
+    unallocated tiles. Flips, shifts, replacements, and comparisons only look
+    at the allocated tiles. Copies made with `copyRegion()` from tile-aligned
+    positions share the tiles inside of the region until either side writes
+    to them.
+
+    To use a different tile size, pass a callable as the Canvas's `storage`
+    argument, such as `functools.partial(TiledStorage, tileSize=32)`.
+    """
+    TILE_SIZE = 64
+
+    def __init__(self, width, height, tileSize=None):
+        Storage.__init__(self, width, height)
+        self.tileSize = self.TILE_SIZE if tileSize is None else tileSize
+        self._tiles = {} # Keys are (tileX, tileY) tuples, values are _Tile objects.
+        self._shared = set() # Keys of tiles that may be shared with another storage object.
+        self._tileRowCounts = [0] * (-(-height // self.tileSize)) # The number of allocated tiles in each row of tiles.
+
+
+    @property
+    def tileCount(self):
+        """The number of allocated tiles."""
+        return len(self._tiles)
+
+
+    def _tileForWriting(self, tx, ty):
+        """Returns the tile at `tx`, `ty`, allocating it if it doesn't exist
+        and copying it if it is shared."""
+        key = (tx, ty)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = _Tile(self.tileSize)
+            self._tiles[key] = tile
+            self._tileRowCounts[ty] += 1
+        elif key in self._shared:
+            tile = tile.copy()
+            self._tiles[key] = tile
+            self._shared.discard(key)
+        return tile
+
+
+    def _freeTileIfBlank(self, tx, ty):
+        key = (tx, ty)
+        tile = self._tiles.get(key)
+        if tile is not None and tile.isBlank():
+            del self._tiles[key]
+            self._shared.discard(key)
+            self._tileRowCounts[ty] -= 1
+
+
+    def _spans(self, left, right):
+        """Yields a (tileX, start, end, tileLeft) tuple for each tile that the
+        cells from `left` up to `right` in a row fall in. `start` and `end`
+        are canvas x coordinates, and `tileLeft` is `start` within the tile."""
+        tileSize = self.tileSize
+        x = left
+        while x < right:
+            tx, tileLeft = divmod(x, tileSize)
+            end = min(right, x - tileLeft + tileSize)
+            yield tx, x, end, tileLeft
+            x = end
+
+
+    def getRowChars(self, y, left=0, right=None):
+        if right is None:
+            right = self.width
+        ty, tileY = divmod(y, self.tileSize)
+        if not self._tileRowCounts[ty]:
+            return NONE_CHAR * (right - left) # Fast path for rows with no allocated tiles.
+
+        pieces = []
+        for tx, start, end, tileLeft in self._spans(left, right):
+            tile = self._tiles.get((tx, ty))
+            if tile is None:
+                pieces.append(NONE_CHAR * (end - start))
+            else:
+                i = tileY * self.tileSize + tileLeft
+                pieces.append(tile.chars[i:i + end - start].tounicode())
+        return ''.join(pieces)
+
+
+    def setRowChars(self, y, left, text):
+        ty, tileY = divmod(y, self.tileSize)
+        for tx, start, end, tileLeft in self._spans(left, left + len(text)):
+            segment = text[start - left:end - left]
+            if (tx, ty) not in self._tiles and segment.count(NONE_CHAR) == len(segment):
+                continue # Writing None cells to an unallocated tile doesn't change it.
+            i = tileY * self.tileSize + tileLeft
+            self._tileForWriting(tx, ty).chars[i:i + len(segment)] = array(CHAR_TYPECODE, segment)
+
+
+    def getRowAttrs(self, y, left=0, right=None):
+        if right is None:
+            right = self.width
+        ty, tileY = divmod(y, self.tileSize)
+        if not self._tileRowCounts[ty]:
+            return bytes(right - left) # Fast path for rows with no allocated tiles.
+
+        pieces = []
+        for tx, start, end, tileLeft in self._spans(left, right):
+            tile = self._tiles.get((tx, ty))
+            if tile is None:
+                pieces.append(bytes(end - start))
+            else:
+                i = tileY * self.tileSize + tileLeft
+                pieces.append(bytes(tile.attrs[i:i + end - start]))
+        return b''.join(pieces)
+
+
+    def setRowAttrs(self, y, left, data):
+        ty, tileY = divmod(y, self.tileSize)
+        for tx, start, end, tileLeft in self._spans(left, left + len(data)):
+            segment = data[start - left:end - left]
+            if (tx, ty) not in self._tiles and segment.count(NONE_ATTR) == len(segment):
+                continue # Writing None colors to an unallocated tile doesn't change it.
+            i = tileY * self.tileSize + tileLeft
+            self._tileForWriting(tx, ty).attrs[i:i + len(segment)] = segment
+
+
+    def getChar(self, x, y):
+        tx, tileX = divmod(x, self.tileSize)
+        ty, tileY = divmod(y, self.tileSize)
+        tile = self._tiles.get((tx, ty))
+        if tile is None:
+            return None
+        c = tile.chars[tileY * self.tileSize + tileX]
+        if c == NONE_CHAR:
+            return None
+        return c
+
+
+    def getAttr(self, x, y):
+        tx, tileX = divmod(x, self.tileSize)
+        ty, tileY = divmod(y, self.tileSize)
+        tile = self._tiles.get((tx, ty))
+        if tile is None:
+            return NONE_ATTR
+        return tile.attrs[tileY * self.tileSize + tileX]
+
+
+    def setCell(self, x, y, char, attr):
+        tx, tileX = divmod(x, self.tileSize)
+        ty, tileY = divmod(y, self.tileSize)
+        if char is None:
+            char = NONE_CHAR
+            if attr == NONE_ATTR and (tx, ty) not in self._tiles:
+                return
+        i = tileY * self.tileSize + tileX
+        tile = self._tileForWriting(tx, ty)
+        tile.chars[i] = char
+        tile.attrs[i] = attr
+
+
+    def _fillTiles(self, left, top, right, bottom, isBlank, fillTileSpan):
+        """Calls `fillTileSpan(tile, start, end)` for the span of each tile row
+        in the rectangular area, where `start` and `end` are indexes into
+        the tile's cells. If `isBlank` is True, unallocated tiles are skipped
+        and completely filled tiles are freed if they end up blank."""
+        tileSize = self.tileSize
+        for ty in range(top // tileSize, (bottom - 1) // tileSize + 1):
+            tileTop = max(top - ty * tileSize, 0)
+            tileBottom = min(bottom - ty * tileSize, tileSize)
+            for tx, start, end, tileLeft in self._spans(left, right):
+                if isBlank and (tx, ty) not in self._tiles:
+                    continue
+                tile = self._tileForWriting(tx, ty)
+                for tileY in range(tileTop, tileBottom):
+                    i = tileY * tileSize + tileLeft
+                    fillTileSpan(tile, i, i + end - start)
+                if isBlank and tileTop == 0 and tileLeft == 0 and \
+                   tileBottom == min(tileSize, self.height - ty * tileSize) and \
+                   end == min(start + tileSize, self.width):
+                    # Every cell of the tile that is on the canvas was filled.
+                    self._freeTileIfBlank(tx, ty)
+
+
+    def fillChars(self, left, top, right, bottom, rawChar):
+        span = array(CHAR_TYPECODE, rawChar * (right - left))
+        def fillTileSpan(tile, start, end):
+            tile.chars[start:end] = span[:end - start]
+        self._fillTiles(left, top, right, bottom, rawChar == NONE_CHAR, fillTileSpan)
+
+
+    def fillAttrs(self, left, top, right, bottom, attr):
+        span = bytes((attr,)) * (right - left)
+        def fillTileSpan(tile, start, end):
+            tile.attrs[start:end] = span[:end - start]
+        self._fillTiles(left, top, right, bottom, attr == NONE_ATTR, fillTileSpan)
+
+
+    def _allocatedSpans(self, tiles, left, top, right, bottom):
+        """Yields a (tileX, tileY, tile, y, start, end, i) tuple for every row
+        of the tiles in `tiles` (a list of (key, tile) items) that falls in
+        the rectangular area. `start` and `end` are canvas x coordinates, and
+        `i` is the index of the cell at `start` in the tile."""
+        tileSize = self.tileSize
+        for (tx, ty), tile in tiles:
+            tileLeft, tileTop = tx * tileSize, ty * tileSize
+            start, end = max(left, tileLeft), min(right, tileLeft + tileSize)
+            if start >= end:
+                continue
+            for y in range(max(top, tileTop), min(bottom, tileTop + tileSize)):
+                yield tx, ty, tile, y, start, end, (y - tileTop) * tileSize + start - tileLeft
+
+
+    def _moveTiles(self, moveSpan):
+        """Rebuilds the tiles from the rows of the allocated tiles, where
+        `moveSpan(y, left, chars, attrs)` returns the (y, left, chars, attrs)
+        tuples to write each row to. Unallocated tiles are never read, so
+        this only takes time for the allocated tiles, and the old tiles
+        aren't changed, so copies that share them aren't affected."""
+        oldTiles = list(self._tiles.items())
+        self._tiles = {}
+        self._shared = set()
+        self._tileRowCounts = [0] * len(self._tileRowCounts)
+        for tx, ty, tile, y, start, end, i in self._allocatedSpans(oldTiles, 0, 0, self.width, self.height):
+            chars = tile.chars[i:i + end - start].tounicode()
+            attrs = bytes(tile.attrs[i:i + end - start])
+            if chars.count(NONE_CHAR) == len(chars) and attrs.count(NONE_ATTR) == len(attrs):
+                continue # Blank rows stay blank wherever they are moved to.
+            for newY, newLeft, newChars, newAttrs in moveSpan(y, start, chars, attrs):
+                self.setRowChars(newY, newLeft, newChars)
+                self.setRowAttrs(newY, newLeft, newAttrs)
+
+
+    def reverseRows(self):
+        height = self.height
+        self._moveTiles(lambda y, left, chars, attrs: [(height - 1 - y, left, chars, attrs)])
+
+
+    def reverseCols(self):
+        width = self.width
+        self._moveTiles(lambda y, left, chars, attrs: [(y, width - left - len(chars), chars[::-1], attrs[::-1])])
+
+
+    def shiftCells(self, dx, dy, wrap, rawChar, attr):
+        width, height = self.width, self.height
+
+        def moveSpan(y, left, chars, attrs):
+            y += dy
+            if wrap:
+                y %= height
+            elif not 0 <= y < height:
+                return []
+            x = left + dx
+            if wrap:
+                # Spans that go past the right edge are split in two.
+                x %= width
+                split = width - x
+                if split >= len(chars):
+                    return [(y, x, chars, attrs)]
+                return [(y, x, chars[:split], attrs[:split]), (y, 0, chars[split:], attrs[split:])]
+            clipLeft, clipRight = max(-x, 0), min(len(chars), width - x)
+            if clipLeft >= clipRight:
+                return []
+            return [(y, x + clipLeft, chars[clipLeft:clipRight], attrs[clipLeft:clipRight])]
+
+        self._moveTiles(moveSpan)
+        if wrap:
+            return
+
+        # Set the exposed cells. Filling with None cells doesn't allocate tiles.
+        exposed = []
+        if dy > 0:
+            exposed.append((0, 0, width, dy))
+        elif dy < 0:
+            exposed.append((0, height + dy, width, height))
+        if dx > 0:
+            exposed.append((0, 0, dx, height))
+        elif dx < 0:
+            exposed.append((width + dx, 0, width, height))
+        for left, top, right, bottom in exposed:
+            self.fillChars(left, top, right, bottom, rawChar)
+            self.fillAttrs(left, top, right, bottom, attr)
+
+
+    def _changeAllocatedTiles(self, left, top, right, bottom, changeSpan):
+        """Calls `changeSpan(chars, attrs)` for the row spans of the allocated
+        tiles in the rectangular area, which returns the new (chars, attrs)
+        of the span, or None if it doesn't change. Tiles left blank are freed.
+        Returns a sorted list of the rows that changed."""
+        if right is None:
+            right = self.width
+        if bottom is None:
+            bottom = self.height
+        changedRows = set()
+        changedTiles = set()
+        for tx, ty, tile, y, start, end, i in self._allocatedSpans(list(self._tiles.items()), left, top, right, bottom):
+            tile = self._tiles[tx, ty] # The tile may have been copied by an earlier row.
+            chars, attrs = tile.chars[i:i + end - start].tounicode(), bytes(tile.attrs[i:i + end - start])
+            changed = changeSpan(chars, attrs)
+            if changed is None:
+                continue
+            newChars, newAttrs = changed
+            tile = self._tileForWriting(tx, ty)
+            if newChars != chars:
+                tile.chars[i:i + end - start] = array(CHAR_TYPECODE, newChars)
+            if newAttrs != attrs:
+                tile.attrs[i:i + end - start] = newAttrs
+            changedRows.add(y)
+            changedTiles.add((tx, ty))
+        for tx, ty in changedTiles:
+            self._freeTileIfBlank(tx, ty)
+        return sorted(changedRows)
+
+
+    def replaceChars(self, rawOld, rawNew, attr=None, left=0, top=0, right=None, bottom=None):
+        if rawOld == NONE_CHAR:
+            # Unallocated tiles are full of None cells, so they can't be skipped.
+            return Storage.replaceChars(self, rawOld, rawNew, attr, left, top, right, bottom)
+
+        def changeSpan(chars, attrs):
+            if rawOld not in chars:
+                return None
+            if attr is not None:
+                attrs = bytearray(attrs)
+                x = chars.find(rawOld)
+                while x != -1:
+                    attrs[x] = attr
+                    x = chars.find(rawOld, x + 1)
+                attrs = bytes(attrs)
+            return chars.replace(rawOld, rawNew), attrs
+        return self._changeAllocatedTiles(left, top, right, bottom, changeSpan)
+
+
+    def translateChars(self, charTable, attrTable=None, left=0, top=0, right=None, bottom=None):
+        if NONE_CHAR.translate(charTable) != NONE_CHAR or (attrTable is not None and attrTable[NONE_ATTR] != NONE_ATTR):
+            # None cells change, so the unallocated tiles can't be skipped.
+            return Storage.translateChars(self, charTable, attrTable, left, top, right, bottom)
+
+        def changeSpan(chars, attrs):
+            newChars = chars.translate(charTable)
+            newAttrs = attrs if attrTable is None else attrs.translate(attrTable)
+            if newChars == chars and newAttrs == attrs:
+                return None
+            return newChars, newAttrs
+        return self._changeAllocatedTiles(left, top, right, bottom, changeSpan)
+
+
+    def charsEqual(self, other):
+        if not isinstance(other, TiledStorage) or other.tileSize != self.tileSize:
+            return Storage.charsEqual(self, other)
+
+        # Only the tiles allocated in either storage can have characters
+        # other than None.
+        keys = set(self._tiles) | set(other._tiles)
+        for tx, ty, tile, y, start, end, i in self._allocatedSpans([(key, None) for key in keys], 0, 0, self.width, self.height):
+            if self.getRowChars(y, start, end) != other.getRowChars(y, start, end):
+                return False
+        return True
+
+
+    def copyRegion(self, left, top, width, height):
+        newStorage = self.__class__(width, height, self.tileSize)
+        if left % self.tileSize or top % self.tileSize:
+            for y in range(height):
+                newStorage.setRowChars(y, 0, self.getRowChars(top + y, left, left + width))
+                newStorage.setRowAttrs(y, 0, self.getRowAttrs(top + y, left, left + width))
+            return newStorage
+
+        # The region starts on a tile boundary, so the tiles inside of it can
+        # be shared with the copy instead of copied.
+        tileSize = self.tileSize
+        leftTile, topTile = left // tileSize, top // tileSize
+        tilesWide = -(-width // tileSize)
+        tilesHigh = -(-height // tileSize)
+        # Only the tiles in the region are looked up, since a LockedStorage
+        # only locks the region's rows and other threads can add and remove
+        # tiles in other rows during the copy.
+        for newTy in range(tilesHigh):
+            if not self._tileRowCounts[topTile + newTy]:
+                continue
+            # The rows of this tile that are in the region, in the copy's coordinates.
+            tileTop = newTy * tileSize
+            tileBottom = min(tileTop + tileSize, height)
+            for newTx in range(tilesWide):
+                key = (leftTile + newTx, topTile + newTy)
+                tile = self._tiles.get(key)
+                if tile is None:
+                    continue
+                tileLeft = newTx * tileSize
+                tileRight = min(tileLeft + tileSize, width)
+                # A tile that sticks out past the region's right or bottom
+                # edge holds cells that aren't part of the copy, so only its
+                # overlapping part is copied. The cells past the edge of
+                # this canvas are always None, so those don't count.
+                if left + tileRight < min(left + tileLeft + tileSize, self.width) or top + tileBottom < min(top + tileTop + tileSize, self.height):
+                    for y in range(tileTop, tileBottom):
+                        newStorage.setRowChars(y, tileLeft, self.getRowChars(top + y, left + tileLeft, left + tileRight))
+                        newStorage.setRowAttrs(y, tileLeft, self.getRowAttrs(top + y, left + tileLeft, left + tileRight))
+                    continue
+                newStorage._tiles[newTx, newTy] = tile
+                newStorage._shared.add((newTx, newTy))
+                newStorage._tileRowCounts[newTy] += 1
+                self._shared.add(key)
+        return newStorage
+
+
+# The fixed binary layout used by BufferStorage: a header, then the character
+# plane as little-endian 32-bit code points (zero for None), then the
+# attribute plane as one byte per cell. Both planes are row-major.
+BUFFER_MAGIC = b'PTCV'
+BUFFER_VERSION = 1
+BUFFER_HEADER = struct.Struct('<4sHHII') # magic, version, reserved, width, height
+
+
+def bufferSize(width, height):
+    """Returns the number of bytes BufferStorage needs for a `width` x `height` canvas."""
+    return BUFFER_HEADER.size + (width * height * 5)
+
+
+def writeBufferHeader(buffer, width, height):
+    """Writes the BufferStorage header for a `width` x `height` canvas to the start of `buffer`."""
+    buffer[:BUFFER_HEADER.size] = BUFFER_HEADER.pack(BUFFER_MAGIC, BUFFER_VERSION, 0, width, height)
+
+
+def readBufferHeader(buffer):
+    """Returns the (width, height) tuple from the BufferStorage header at the
+    start of `buffer`. Raises ValueError if it isn't a valid header."""
+    if len(buffer) < BUFFER_HEADER.size:
+        raise ValueError('buffer is too small to hold a canvas')
+    magic, version, reserved, width, height = BUFFER_HEADER.unpack(bytes(buffer[:BUFFER_HEADER.size]))
+    if magic != BUFFER_MAGIC:
+        raise ValueError('buffer does not hold a canvas')
+    if version != BUFFER_VERSION:
+        raise ValueError('unsupported canvas buffer version %s' % (version))
+    if len(buffer) < bufferSize(width, height):
+        raise ValueError('buffer is too small for a %s x %s canvas' % (width, height))
+    return width, height
+
+
+class BufferStorage(Storage):
+    """
+    A storage engine that keeps the cells in a writable bytes-like `buffer`
+    (such as an `mmap` or shared memory) using a fixed binary layout, so the
+    cells can be shared with other processes or saved as-is. The buffer must
+    already have a valid header; see `writeBufferHeader()`.
+
+    Since other processes can change the buffer, this storage is volatile.
+    """
+    volatile = True
+
+    def __init__(self, buffer):
+        self._buffer = memoryview(buffer).cast('B')
+        width, height = readBufferHeader(self._buffer)
+        Storage.__init__(self, width, height)
+        self._charsOffset = BUFFER_HEADER.size
+        self._attrsOffset = BUFFER_HEADER.size + (width * height * 4)
+
+
+    def getRowChars(self, y, left=0, right=None):
+        if right is None:
+            right = self.width
+        i = self._charsOffset + ((y * self.width) + left) * 4
+        return bytes(self._buffer[i:i + (right - left) * 4]).decode('utf-32-le')
+
+
+    def setRowChars(self, y, left, text):
+        data = text.encode('utf-32-le')
+        i = self._charsOffset + ((y * self.width) + left) * 4
+        self._buffer[i:i + len(data)] = data
+
+
+    def getRowAttrs(self, y, left=0, right=None):
+        if right is None:
+            right = self.width
+        i = self._attrsOffset + (y * self.width) + left
+        return bytes(self._buffer[i:i + right - left])
+
+
+    def setRowAttrs(self, y, left, data):
+        i = self._attrsOffset + (y * self.width) + left
+        self._buffer[i:i + len(data)] = data
+
+
+    def getAttr(self, x, y):
+        return self._buffer[self._attrsOffset + (y * self.width) + x]
+
+
+    def setAttr(self, x, y, attr):
+        self._buffer[self._attrsOffset + (y * self.width) + x] = attr
+
+
+    def snapshot(self):
+        """Returns this storage itself, so that the canvas is read straight
+        from the buffer a row at a time instead of copied into memory first
+        (the buffer can be larger than RAM). A copy wouldn't be consistent
+        anyway, since other processes write to the buffer without locking."""
+        return self
+
+
+    def copyRegion(self, left, top, width, height):
+        # Copies are ordinary in-memory storage, not more shared buffers.
+        newStorage = ArrayStorage(width, height)
+        for y in range(height):
+            newStorage.setRowChars(y, 0, self.getRowChars(top + y, left, left + width))
+            newStorage.setRowAttrs(y, 0, self.getRowAttrs(top + y, left, left + width))
+        return newStorage
+
+
+    def release(self):
+        """Releases this storage's view of the buffer. The storage can't be used afterwards."""
+        self._buffer.release()
+
+
+class MmapStorage(BufferStorage):
+    """
+    A storage engine backed by a memory-mapped file in the BufferStorage
+    layout. The OS pages the cells in and out of memory as needed, so the
+    canvas can be larger than RAM, and reopening the file is instant.
+
+    If the file at `path` doesn't exist, it is created for a `width` x
+    `height` canvas. If it does exist, `width` and `height` can be left out,
+    but must match the file if given. With `readonly=True`, the file is
+    mapped read-only (and can be shared with other processes this way);
+    changing the canvas then raises PyTextCanvasException.
+    """
+    def __init__(self, path, width=None, height=None, readonly=False):
+        if not os.path.exists(path):
+            if readonly:
+                raise ValueError('%s does not exist' % (path))
+            if width is None or height is None:
+                raise ValueError('width and height are required to create %s' % (path))
+            for name, value in (('width', width), ('height', height)):
+                if not isinstance(value, int) or value < 1:
+                    raise ValueError('%s must be an int of 1 or greater, not %r' % (name, value))
+            with open(path, 'wb') as fileObj:
+                header = bytearray(BUFFER_HEADER.size)
+                writeBufferHeader(header, width, height)
+                fileObj.write(header)
+                fileObj.truncate(bufferSize(width, height)) # The OS fills the planes in with zeros.
+
+        self.readonly = readonly
+        self._file = open(path, 'rb' if readonly else 'r+b')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+            BufferStorage.__init__(self, self._mmap)
+        except Exception:
+            self.close()
+            raise
+        if (width is not None and width != self.width) or (height is not None and height != self.height):
+            self.close()
+            raise ValueError('%s holds a %s x %s canvas, not %s x %s' % (path, self.width, self.height, width, height))
+        self.path = path
+
+
+    def flush(self):
+        """Writes any changes to the file on disk."""
+        if not self.readonly:
+            self._mmap.flush()
+
+
+    def close(self):
+        """Flushes and unmaps the file. The storage can't be used afterwards."""
+        if hasattr(self, '_buffer'):
+            self._buffer.release()
+        if hasattr(self, '_mmap') and not self._mmap.closed:
+            if not self.readonly:
+                self._mmap.flush()
+            self._mmap.close()
+        self._file.close()
+
+
+class SharedMemoryStorage(BufferStorage):
+    """
+    A storage engine backed by a `multiprocessing.shared_memory` block in
+    the BufferStorage layout, so several processes can draw on the same
+    cells without copying them.
+
+    If `name` is None, a new block is created for a `width` x `height`
+    canvas of None cells. Otherwise, the existing block called `name` is
+    attached to and its size is read from the block's header.
+    """
+    def __init__(self, width=None, height=None, name=None):
+        from multiprocessing import shared_memory # Only available in Python 3.8 and later.
+
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=bufferSize(width, height))
+            writeBufferHeader(self._shm.buf, width, height) # New blocks are already filled with zeros.
+        else:
+            # Attaching processes shouldn't destroy the block when they exit.
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                # Python 3.12 and earlier always register the block with the
+                # resource tracker, which unlinks it when this process exits.
+                self._shm = shared_memory.SharedMemory(name=name)
+                if os.name == 'posix': # The resource tracker is only used on POSIX.
+                    from multiprocessing import resource_tracker
+                    resource_tracker.unregister(self._shm._name, 'shared_memory')
+        try:
+            BufferStorage.__init__(self, self._shm.buf)
+        except ValueError:
+            self._shm.close()
+            raise
+        self.name = self._shm.name
+
+
+    def close(self):
+        """Detaches this process from the shared memory block. The storage
+        can't be used afterwards, but the block still exists for the other
+        processes."""
+        self._buffer.release()
+        self._shm.close()
+
+
+    def unlink(self):
+        """Destroys the shared memory block once every process has closed it.
+        This should be called once, by the process that created the block."""
+        self._shm.unlink()
+
+
+class NumpyStorage(Storage):
+    """
+    A storage engine that keeps the cells in NumPy arrays, so that bulk
+    operations (fills, replacements, flips, and comparisons) are vectorized.
+    This engine is only available if NumPy is installed.
+
+    The `chars` array holds the Unicode code point of each cell's character
+    (zero for None), and the `fg` and `bg` arrays hold each cell's colors
+    encoded the same way as the halves of an attribute byte (the color
+    constant plus one, or `NONE_COLOR` for None). All three are `height` x
+    `width` arrays indexed by [y, x].
+    """
+    def __init__(self, width, height):
+        if numpy is None:
+            raise ImportError('NumpyStorage requires NumPy to be installed')
+        Storage.__init__(self, width, height)
+        self.chars = numpy.zeros((height, width), dtype='<u4') # Little-endian, to match UTF-32-LE.
+        self.fg = numpy.zeros((height, width), dtype=numpy.uint8)
+        self.bg = numpy.zeros((height, width), dtype=numpy.uint8)
+
+
+    def getRowChars(self, y, left=0, right=None):
+        return self.chars[y, left:right].tobytes().decode('utf-32-le')
+
+
+    def setRowChars(self, y, left, text):
+        self.chars[y, left:left + len(text)] = numpy.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+
+
+    def getRowAttrs(self, y, left=0, right=None):
+        return (self.fg[y, left:right] | (self.bg[y, left:right] << 4)).tobytes()
+
+
+    def setRowAttrs(self, y, left, data):
+        attrs = numpy.frombuffer(bytes(data), dtype=numpy.uint8)
+        self.fg[y, left:left + len(attrs)] = attrs & 0x0F
+        self.bg[y, left:left + len(attrs)] = attrs >> 4
+
+
+    def getChar(self, x, y):
+        codePoint = int(self.chars[y, x])
+        if codePoint == 0:
+            return None
+        return chr(codePoint)
+
+
+    def setChar(self, x, y, char):
+        self.chars[y, x] = 0 if char is None else ord(char)
+
+
+    def getAttr(self, x, y):
+        return int(self.fg[y, x]) | (int(self.bg[y, x]) << 4)
+
+
+    def setAttr(self, x, y, attr):
+        self.fg[y, x] = attr & 0x0F
+        self.bg[y, x] = attr >> 4
+
+
+    def setCell(self, x, y, char, attr):
+        self.chars[y, x] = 0 if char is None else ord(char)
+        self.fg[y, x] = attr & 0x0F
+        self.bg[y, x] = attr >> 4
+
+
+    def fillChars(self, left, top, right, bottom, rawChar):
+        self.chars[top:bottom, left:right] = ord(rawChar)
+
+
+    def fillAttrs(self, left, top, right, bottom, attr):
+        self.fg[top:bottom, left:right] = attr & 0x0F
+        self.bg[top:bottom, left:right] = attr >> 4
+
+
+    def reverseRows(self):
+        for plane in (self.chars, self.fg, self.bg):
+            plane[:] = plane[::-1]
+
+
+    def reverseCols(self):
+        for plane in (self.chars, self.fg, self.bg):
+            plane[:] = plane[:, ::-1]
+
+
+    def shiftCells(self, dx, dy, wrap, rawChar, attr):
+        for plane, blank in ((self.chars, ord(rawChar)), (self.fg, attr & 0x0F), (self.bg, attr >> 4)):
+            plane[:] = numpy.roll(plane, (dy, dx), axis=(0, 1))
+            if not wrap:
+                if dy > 0:
+                    plane[:dy] = blank
+                elif dy < 0:
+                    plane[dy:] = blank
+                if dx > 0:
+                    plane[:, :dx] = blank
+                elif dx < 0:
+                    plane[:, dx:] = blank
+
+
+    def replaceChars(self, rawOld, rawNew, attr=None, left=0, top=0, right=None, bottom=None):
+        chars = self.chars[top:bottom, left:right]
+        mask = chars == ord(rawOld)
+        chars[mask] = ord(rawNew)
+        if attr is not None:
+            self.fg[top:bottom, left:right][mask] = attr & 0x0F
+            self.bg[top:bottom, left:right][mask] = attr >> 4
+        return (numpy.flatnonzero(mask.any(axis=1)) + top).tolist()
+
+
+    def charsEqual(self, other):
+        if isinstance(other, NumpyStorage):
+            return bool(numpy.array_equal(self.chars, other.chars))
+        return Storage.charsEqual(self, other)
+
+
+    def copyRegion(self, left, top, width, height):
+        newStorage = NumpyStorage(width, height)
+        newStorage.chars[:] = self.chars[top:top + height, left:left + width]
+        newStorage.fg[:] = self.fg[top:top + height, left:left + width]
+        newStorage.bg[:] = self.bg[top:top + height, left:left + width]
+        return newStorage
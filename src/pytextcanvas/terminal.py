@@ -1,48 +1,223 @@
 import os
+import signal
 import sys
 
-def getTerminalSize():
+# The cached terminal size. This is only used while the SIGWINCH handler is
+# installed to keep it up to date.
+_cachedTerminalSize = None
+_previousSigwinchHandler = None
+_sigwinchHandlerInstalled = False
+
+
+def _queryTerminalSize():
+    """Returns the size of the terminal as a tuple of two ints (width, height)
+    by asking the OS, or None if none of the standard streams are a terminal."""
+    for stream in (sys.__stdout__, sys.__stdin__, sys.__stderr__):
+        try:
+            size = os.get_terminal_size(stream.fileno())
+        except (AttributeError, ValueError, OSError):
+            continue # This stream is closed, replaced, or not a terminal.
+        return size.columns, size.lines
+    return None
+
+
+def _handleSigwinch(signum, frame):
+    """Refreshes the cached terminal size when the terminal is resized."""
+    global _cachedTerminalSize
+    _cachedTerminalSize = _queryTerminalSize()
+    if callable(_previousSigwinchHandler):
+        _previousSigwinchHandler(signum, frame)
+
+
+def _installSigwinchHandler():
+    """Installs the SIGWINCH handler that keeps the cached terminal size up to
+    date. Returns True if the handler is installed. This isn't possible on
+    Windows (which has no SIGWINCH) or outside of the main thread."""
+    global _previousSigwinchHandler, _sigwinchHandlerInstalled
+    if not _sigwinchHandlerInstalled and hasattr(signal, 'SIGWINCH'):
+        try:
+            _previousSigwinchHandler = signal.signal(signal.SIGWINCH, _handleSigwinch)
+            _sigwinchHandlerInstalled = True
+        except ValueError:
+            pass # signal.signal() can only be called from the main thread.
+    return _sigwinchHandlerInstalled
+
+
+def getTerminalSize(refresh=False):
     """
     Returns the size of the terminal as a tuple of two ints (width, height).
 
+    On POSIX platforms, the size is cached and refreshed by a SIGWINCH signal
+    handler whenever the terminal is resized, so this function can be called
+    every frame without making a system call. Pass `refresh=True` to ask the
+    OS for the size anyway (for example, if another SIGWINCH handler was
+    installed afterwards and replaced this module's handler). Where the
+    handler can't be installed, the OS is asked every call.
+
     Raises `PyTextCanvasException` when called by a program that is not run from a terminal window.
+    """
+    global _cachedTerminalSize
+    if refresh or _cachedTerminalSize is None or not _sigwinchHandlerInstalled:
+        _cachedTerminalSize = _queryTerminalSize()
+        if _cachedTerminalSize is not None:
+            _installSigwinchHandler()
 
-    NOTE - Currently this feature only works on Windows.
+    if _cachedTerminalSize is None:
+        from pytextcanvas import PyTextCanvasException
+        raise PyTextCanvasException('Unable to determine terminal size. This happens when in a non-terminal environment, such as IDLE.')
+    return _cachedTerminalSize
+
+
+def setTerminalSize():
+    pass # TODO
+
+# ANSI escape sequences. (On Windows, colorama translates the clear screen and
+# cursor positioning sequences for consoles that don't support them natively.)
+CLEAR_SCREEN = '\x1b[2J'
+CURSOR_HOME = '\x1b[H'
+HIDE_CURSOR = '\x1b[?25l'
+SHOW_CURSOR = '\x1b[?25h'
+ENTER_ALT_SCREEN = '\x1b[?1049h'
+EXIT_ALT_SCREEN = '\x1b[?1049l'
+BEGIN_SYNCHRONIZED_UPDATE = '\x1b[?2026h'
+END_SYNCHRONIZED_UPDATE = '\x1b[?2026l'
+
+
+def moveCursorSequence(x, y):
     """
-    import ctypes # getTerminalSize() will most likely rarely be used, so don't bother importing ctypes all the time. TODO - Is this line of thinking valid? Does it really make a difference?
-    if sys.platform == 'win32':
-        # From http://code.activestate.com/recipes/440694-determine-size-of-console-window-on-windows/
-        h = ctypes.windll.kernel32.GetStdHandle(-12)
-        csbi = ctypes.create_string_buffer(22)
-        res = ctypes.windll.kernel32.GetConsoleScreenBufferInfo(h, csbi)
+    Returns the ANSI escape sequence that moves the cursor to the `x`, `y`
+    position, where 0, 0 is the top left corner of the terminal.
 
-        if res:
-            import struct
-            (bufx, bufy, curx, cury, wattr,
-             left, top, right, bottom, maxx, maxy) = struct.unpack("hhhhHhhhhhh", csbi.raw)
-            return right - left + 1, bottom - top + 1
-        else:
-            raise PyTextCanvasException('Unable to determine terminal size. This happens when in a non-terminal environment, such as IDLE.') #sizex, sizey = 80, 25 # can't determine actual size - return default values
+    >>> moveCursorSequence(0, 0) == '\x1b[1;1H'
+    True
+    """
+    return '\x1b[%d;%dH' % (y + 1, x + 1)
 
-    # TODO - finish for non windows platforms.
-    # Linux:
-    # sizex, sizey = os.popen('stty size', 'r').read().split()
-    # return int(sizex), int(sizey)
 
-    #else:
-    #    raise PyTextCanvasException('Cannot determine the platform')
+def _write(text, stream=None):
+    """Writes `text` to `stream` (or `sys.stdout`) and flushes it."""
+    if stream is None:
+        stream = sys.stdout
+    stream.write(text)
+    stream.flush()
 
 
-def setTerminalSize():
-    pass # TODO
+def clearScreen(stream=None):
+    """
+    Clears the terminal and moves the cursor to the top left corner by
+    writing ANSI escape sequences to `stream` (`sys.stdout` by default). This
+    doesn't start a `cls` or `clear` process, so it is fast enough to call
+    every frame.
+    """
+    _write(CLEAR_SCREEN + CURSOR_HOME, stream)
+
+
+def hideCursor(stream=None):
+    """Hides the terminal's cursor."""
+    _write(HIDE_CURSOR, stream)
 
-def clearScreen():
+
+def showCursor(stream=None):
+    """Shows the terminal's cursor."""
+    _write(SHOW_CURSOR, stream)
+
+
+class TerminalSession(object):
     """
-    Clears the terminal by calling `cls` or `clear`, depending on what platform
-    this Python script is running from.
+    A context manager for full screen terminal programs. Entering the session
+    switches to the terminal's alternate screen buffer (so the original
+    contents of the terminal are restored afterwards), hides the cursor, and
+    clears the screen. Exiting the session undoes these, even if an exception
+    was raised.
+
+    Everything is written directly to `stream`, which is `sys.stdout` by
+    default.
+
+    >>> import io
+    >>> stream = io.StringIO()
+    >>> with TerminalSession(stream) as session:
+    ...     with session.update():
+    ...         session.write('Hello')
+    >>> stream.getvalue() == (ENTER_ALT_SCREEN + HIDE_CURSOR + CLEAR_SCREEN + CURSOR_HOME +
+    ...                       BEGIN_SYNCHRONIZED_UPDATE + 'Hello' + END_SYNCHRONIZED_UPDATE +
+    ...                       SHOW_CURSOR + EXIT_ALT_SCREEN)
+    True
     """
-    if sys.platform == 'win32':
-        os.system('cls')
-    else:
-        os.system('clear')
+    def __init__(self, stream=None, altScreen=True, hideCursor=True):
+        self.stream = stream
+        self.altScreen = altScreen
+        self.hideCursor = hideCursor
+        self._buffering = False # True while inside of update().
+        self._buffer = []
+
+
+    def __enter__(self):
+        output = []
+        if self.altScreen:
+            output.append(ENTER_ALT_SCREEN)
+        if self.hideCursor:
+            output.append(HIDE_CURSOR)
+        output.append(CLEAR_SCREEN + CURSOR_HOME)
+        _write(''.join(output), self.stream)
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        output = []
+        if self.hideCursor:
+            output.append(SHOW_CURSOR)
+        if self.altScreen:
+            output.append(EXIT_ALT_SCREEN)
+        _write(''.join(output), self.stream)
+        return False
+
+
+    def write(self, text):
+        """Writes `text` to the session's stream. Inside of `update()`, the
+        text is held until the update ends."""
+        if self._buffering:
+            self._buffer.append(text)
+        else:
+            _write(text, self.stream)
+
+
+    def clear(self):
+        """Clears the screen and moves the cursor to the top left corner."""
+        self.write(CLEAR_SCREEN + CURSOR_HOME)
+
+
+    def moveCursor(self, x, y):
+        """Moves the cursor to the `x`, `y` position."""
+        self.write(moveCursorSequence(x, y))
+
+
+    def update(self):
+        """
+        Returns a context manager for drawing one frame. Everything written
+        with `write()` inside of it is sent as one write, wrapped in the
+        synchronized update markers, so terminals that support them display
+        the frame all at once instead of showing it partially drawn.
+        (Terminals that don't support the markers ignore them.)
+        """
+        return _SynchronizedUpdate(self)
+
+
+class _SynchronizedUpdate(object):
+    def __init__(self, session):
+        self.session = session
+
+
+    def __enter__(self):
+        self.session._buffering = True
+        self.session._buffer = [BEGIN_SYNCHRONIZED_UPDATE]
+        return self.session
+
+
+    def __exit__(self, excType, excValue, traceback):
+        session = self.session
+        session._buffer.append(END_SYNCHRONIZED_UPDATE)
+        session._buffering = False
+        _write(''.join(session._buffer), session.stream)
+        session._buffer = []
+        return False
 
@@ -85,8 +85,8 @@ class Turtle(object):
             raise PyTextCanvasException('penChar must be set to a single character string')
         self._penChar = value
         if self.isDown and self.canvas.isOnCanvas(self.x, self.y):
-            self.canvas._strDirty = True
-            self.canvas._chars[int(self._x)][int(self._y)] = self._penChar
+            self.canvas._markRowDirty(int(self._y))
+            self.canvas._storage.setChar(int(self._x), int(self._y), self._penChar)
 
 
     def __repr__(self):
@@ -280,8 +280,8 @@ class Turtle(object):
     def penDown(self):
         self._isDown = True
         if self.canvas.isOnCanvas(self.x, self.y):
-            self.canvas._strDirty = True
-            self.canvas._chars[int(self.x)][int(self.y)] = self._penChar
+            self.canvas._markRowDirty(int(self.y))
+            self.canvas._storage.setChar(int(self.x), int(self.y), self._penChar)
 
     pd = down = penDown
 
@@ -10,22 +10,21 @@ FRAMES_TO_TEST = 100
 
 canvas = pytc.Canvas(80, 25)
 
-pytc.clearScreen()
+with pytc.TerminalSession() as session:
+    startTime = time.time()
+    for i in range(FRAMES_TO_TEST // 2):
+        canvas.fg = pytc.RED
+        canvas.bg = pytc.BLUE
+        canvas.fill('*')
+        canvas.print()
+        session.clear()
 
-startTime = time.time()
-for i in range(FRAMES_TO_TEST // 2):
-    canvas.fg = pytc.RED
-    canvas.bg = pytc.BLUE
-    canvas.fill('*')
-    canvas.print()
-    pytc.clearScreen()
+        canvas.fg = pytc.BLUE
+        canvas.bg = pytc.RED
+        canvas.fill('+')
+        canvas.print()
+        session.clear()
 
-    canvas.fg = pytc.BLUE
-    canvas.bg = pytc.RED
-    canvas.fill('+')
-    canvas.print()
-    pytc.clearScreen()
-
-runtime = time.time() - startTime
+    runtime = time.time() - startTime
 print(sys.platform, sys.version)
 print('%s frames in %s seconds, %s fps' % (FRAMES_TO_TEST, runtime, round(FRAMES_TO_TEST / runtime, 2)))
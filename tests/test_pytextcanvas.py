@@ -1,5 +1,11 @@
 from __future__ import division, print_function
 
+import io
+import math
+import os
+import sys
+
+import pybresenham
 import pytest
 
 import pytextcanvas as pytc
@@ -159,10 +165,37 @@ def test_setitem_getitem_int_tuple_key():
 
 
 def test_setitem_slice():
-    pass # TODO
+    canvas = pytc.Canvas(6, 4)
+    canvas[(1, 1):(4, 3)] = 'x'
+    assert str(canvas) == '      \n xxx  \n xxx  \n      '
+
+    # Steps set every other cell.
+    canvas[(0, 0):(6, 4):2] = 'o'
+    assert str(canvas) == 'o o o \n xxx  \noxoxo \n      '
+    canvas[(1, 3):(6, 4):(3, 1)] = '-'
+    assert str(canvas) == 'o o o \n xxx  \noxoxo \n -  - '
+
+    del canvas[(0, 0):(6, 2)]
+    assert str(canvas) == '      \n      \noxoxo \n -  - '
+
+    # Steps must be positive, and nothing is changed if they aren't.
+    for step in (-1, 0, (1, -2), (0, 1), 1.5, (1, 1, 1)):
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas[(0, 0):(6, 4):step] = 'z'
+        with pytest.raises(pytc.PyTextCanvasException):
+            del canvas[(0, 0):(6, 4):step]
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas[(0, 0):(6, 4):step]
+    assert str(canvas) == '      \n      \noxoxo \n -  - '
 
 def test_getitem_slice():
-    pass # TODO returns a Canvas object
+    canvas = pytc.Canvas(6, 4, loads='abcdef\nghijkl\nmnopqr\nstuvwx')
+    canvas.paint(2, 2, fg=pytc.RED)
+    assert str(canvas[(1, 1):(4, 3)]) == 'hij\nnop'
+    subcanvas = canvas[(0, 0):(6, 4):2]
+    assert str(subcanvas) == 'ace\nmoq'
+    assert subcanvas.storage.getColors(1, 1) == (pytc.RED, None) # Colors are copied too.
+    assert str(canvas[(1, 0):(6, 4):(3, 1)]) == 'be\nhk\nnq\ntw'
 
 
 def test_setitem_getitem_keyerror():
@@ -259,11 +292,164 @@ def test_shift():
     canvas.shift(1, 1)
     assert str(canvas) == '    \n 123\n 567\n abc'
 
-    # LEFT OFF
+    canvas = pytc.Canvas(loads='1234\n5678\nabcd\nefgh')
+    canvas.shift(-2, -1, '.')
+    assert str(canvas) == '78..\ncd..\ngh..\n....'
+    canvas.shift(0, 10)
+    assert str(canvas) == '    \n    \n    \n    '
+
+    # Colors move along with the characters, and exposed cells get the given colors.
+    canvas = pytc.Canvas(loads='1234\n5678\nabcd\nefgh')
+    canvas.paint(0, 0, fg=pytc.RED)
+    canvas.shift(1, 2, '-', bg=pytc.BLUE)
+    assert canvas[1, 2] == '1'
+    assert canvas.storage.getColors(1, 2) == (pytc.RED, None)
+    assert canvas.storage.getColors(0, 2) == (None, pytc.BLUE)
+    assert canvas.storage.getColors(3, 0) == (None, pytc.BLUE)
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.shift(1.5, 0)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.shift(1, 0, 'xx')
+
+
+def test_scroll():
+    import functools
+    engines = [pytc.ArrayStorage, functools.partial(pytc.TiledStorage, tileSize=2), pytc.LockedStorage]
+    try:
+        import numpy
+        engines.append(pytc.NumpyStorage)
+    except ImportError:
+        pass
+
+    for engine in engines:
+        if engine is pytc.LockedStorage:
+            canvas = pytc.Canvas(loads='1234\n5678\nabcd', threadSafe=True)
+        else:
+            canvas = pytc.Canvas(loads='1234\n5678\nabcd', storage=engine)
+        canvas.paint(3, 2, fg=pytc.GREEN)
+        str(canvas)
+
+        canvas.scroll(1, 0)
+        assert str(canvas) == '4123\n8567\ndabc'
+        assert canvas.storage.getColors(0, 2) == (pytc.GREEN, None)
+        canvas.scroll(0, -1)
+        assert str(canvas) == '8567\ndabc\n4123'
+        canvas.scroll(-5, 7) # Offsets larger than the canvas wrap around too.
+        assert str(canvas) == '1234\n5678\nabcd'
+        assert canvas.storage.getColors(3, 2) == (pytc.GREEN, None)
+
+        canvas.scroll(0, 1, wrap=False, char='~')
+        assert str(canvas) == '~~~~\n1234\n5678'
+
+    # Scrolling a view only moves the cells in the view.
+    canvas = pytc.Canvas(loads='1234\n5678\nabcd')
+    str(canvas)
+    canvas.view(1, 0, 2, 3).scroll(0, 1)
+    assert str(canvas) == '1bc4\n5238\na67d'
+    canvas.view(1, 0, 3, 1).scroll(1, 0, wrap=False)
+    assert str(canvas) == '1 bc\n5238\na67d'
 
 def test_copy():
-    canvas = pytc.Canvas(4, 4)
-    # LEFT OFF - uses slice to get new sub-Canvas object
+    import copy
+
+    canvas = pytc.Canvas(4, 3, loads='abcd\nefgh\nijkl')
+    canvas.paint(0, 0, fg=pytc.RED)
+    str(canvas)
+
+    for snapshot in (canvas.copy(), copy.copy(canvas), canvas[:]):
+        assert snapshot == canvas
+        assert str(snapshot) == 'abcd\nefgh\nijkl'
+        assert snapshot._storage.getColors(0, 0) == (pytc.RED, None)
+
+    # Copies share their rows until one side writes to them.
+    snapshot = canvas.copy()
+    assert snapshot._storage._chars[1] is canvas._storage._chars[1]
+    canvas[1, 1] = 'X'
+    assert snapshot._storage._chars[0] is canvas._storage._chars[0]
+    assert snapshot._storage._chars[1] is not canvas._storage._chars[1]
+    assert str(canvas) == 'abcd\neXgh\nijkl'
+    assert str(snapshot) == 'abcd\nefgh\nijkl'
+
+    snapshot.write('Z', 0, 2)
+    snapshot.paint(3, 0, bg=pytc.BLUE)
+    snapshot.hflip()
+    assert str(canvas) == 'abcd\neXgh\nijkl'
+    assert str(snapshot) == 'dcba\nhgfe\nlkjZ'
+    assert canvas._storage.getColors(3, 0) == (None, None)
+
+    # Copies of part of the canvas.
+    part = canvas.copy(1, 1, 2, 2)
+    assert str(part) == 'Xg\njk'
+    part.fill('.')
+    assert str(canvas) == 'abcd\neXgh\nijkl'
+    assert str(canvas.copy(2, 1)) == 'gh\nkl'
+
+    # Copied areas must be inside of the canvas.
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.copy(3, 0, 2, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.copy(0, 2, 1, 2)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.copy(-1, 0, 1, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.copy(0, 0, 0, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.copy(0, 0, 1, -1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.copy(0, 0, 1.0, 1)
+
+
+def test_view():
+    canvas = pytc.Canvas(6, 4)
+    canvas.fill(',')
+    assert str(canvas) == ',,,,,,\n,,,,,,\n,,,,,,\n,,,,,,'
+
+    # Writing to the view writes to the canvas, even with its str() cached.
+    view = canvas.view(1, 1, 4, 2)
+    assert isinstance(view, pytc.CanvasView)
+    assert view.size == (4, 2)
+    assert (view.parent, view.left, view.top) == (canvas, 1, 1)
+    view[0, 0] = 'A'
+    view[-1, -1] = 'Z'
+    assert str(canvas) == ',,,,,,\n,A,,,,\n,,,,Z,\n,,,,,,'
+    assert str(view) == 'A,,,\n,,,Z'
+
+    # Writing to the canvas is seen by the view.
+    canvas[2, 1] = 'B'
+    assert view[1, 0] == 'B'
+    assert str(view) == 'AB,,\n,,,Z'
+
+    # The drawing methods use the view's coordinates.
+    view.fg = pytc.RED
+    view.rectangle('#', 0, 0, 4, 2)
+    assert str(canvas) == ',,,,,,\n,####,\n,####,\n,,,,,,'
+    assert canvas._storage.getColors(1, 1) == (pytc.RED, None)
+    view.write('hi', 1, 1)
+    view.vflip()
+    assert str(canvas) == ',,,,,,\n,#hi#,\n,####,\n,,,,,,'
+
+    # Views of views.
+    subview = view.view(1, 0, 2, 1)
+    subview.fill('x')
+    assert str(canvas) == ',,,,,,\n,#xx#,\n,####,\n,,,,,,'
+
+    # copy() returns a separate Canvas object.
+    copied = view.copy()
+    assert type(copied) is pytc.Canvas
+    assert str(copied) == '#xx#\n####'
+    copied[0, 0] = '!'
+    assert canvas[1, 1] == '#'
+
+    # Views must be inside of the canvas.
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.view(3, 0, 4, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.view(-1, 0, 1, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.view(0, 0, 0, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        view[4, 0] = 'x'
 
 
 def test_contains():
@@ -294,11 +480,89 @@ def test_len():
 
 
 def test_str_cache():
-    pass # TODO
+    canvas = pytc.Canvas(3, 3, loads='abc\ndef\nghi')
+    assert str(canvas) == 'abc\ndef\nghi'
+    assert canvas._rowCache == ['abc', 'def', 'ghi']
+
+    # Changing a cell only marks that cell's row as dirty.
+    canvas[1, 1] = 'X'
+    assert canvas._rowCache == ['abc', None, 'ghi']
+    assert str(canvas) == 'abc\ndXf\nghi'
+
+    canvas.write('xyz', 0, 2)
+    assert canvas._rowCache == ['abc', 'dXf', None]
+    assert str(canvas) == 'abc\ndXf\nxyz'
+
+    canvas.points('*', [(0, 0)])
+    assert str(canvas) == '*bc\ndXf\nxyz'
+
+    canvas.vflip()
+    assert str(canvas) == 'xyz\ndXf\n*bc'
+
+    canvas.loads('123')
+    assert str(canvas) == '123\ndXf\n*bc'
     # TODO - eventually, make it so that the strDirty bit is set only if an actual change is made.
     # TODO - set it so that the cache can be enabled or disabled
 
 
+def test_batch():
+    canvas = pytc.Canvas(5, 4)
+    canvas.fill('.')
+    str(canvas) # Fill the cache.
+
+    with canvas.batch() as cells:
+        cells[1, 1] = 'a'
+        cells.set(2, 2, 'b', fg=pytc.RED)
+        cells[3, 2] = None
+        assert cells[1, 1] == 'a'
+        assert str(canvas) == '.....\n.....\n.....\n.....' # Not marked dirty until the end.
+    assert str(canvas) == '.....\n.a...\n..b .\n.....'
+    assert canvas.storage.getColors(2, 2) == (pytc.RED, None)
+
+    # The rows are marked dirty even if the block raises an exception.
+    with pytest.raises(ZeroDivisionError):
+        with canvas.batch() as cells:
+            cells[0, 3] = 'c'
+            1 / 0
+    assert str(canvas) == '.....\n.a...\n..b .\nc....'
+
+    # Batches on views mark the parent's rows dirty.
+    with canvas.view(1, 1, 2, 2).batch() as cells:
+        cells[1, 1] = 'd'
+    assert str(canvas) == '.....\n.a...\n..d .\nc....'
+
+
+def test_setCells():
+    import array
+    canvas = pytc.Canvas(5, 3)
+    canvas.setCells([0, 4, -1, 5, 2], array.array('i', [0, 2, 0, 0, 3]), '#')
+    assert str(canvas) == '#    \n     \n    #'
+
+    canvas.setCells((1, 2), (1, 1), ['a', None], fg=pytc.RED, bg=[pytc.BLUE, None])
+    assert canvas[1, 1] == 'a' and canvas[2, 1] is None
+    assert canvas.storage.getColors(1, 1) == (pytc.RED, pytc.BLUE)
+    assert canvas.storage.getColors(2, 1) == (pytc.RED, None)
+    canvas.setCells([1], [1], 'b')
+    assert canvas.storage.getColors(1, 1) == (pytc.RED, pytc.BLUE) # Colors are left unchanged.
+
+    canvas.setCells([], [], 'x') # Nothing to set.
+
+    # Everything is checked before any cell is set.
+    before = str(canvas)
+    for args, kwargs in [(([0, 1], [0], 'x'), {}),
+                         (([0, 1], [0, 1], 'xyz'), {}),
+                         (([0, 1], [0, 1], ['x', 'yy']), {}),
+                         (([0, 1.5], [0, 1], 'x'), {}),
+                         (([0, 1], [0, 1], 'x'), {'fg': 99}),
+                         (([0, 1], [0, 1], 'x'), {'fg': 1.0}),
+                         (([0, 1], [0, 1], 'x'), {'bg': [pytc.RED, 1.0]}),
+                         (([0, 1], [0, 1], 'x'), {'bg': [1, True]}),
+                         (([0, 1], [0, 1], 'x'), {'bg': [pytc.RED]})]:
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.setCells(*args, **kwargs)
+    assert str(canvas) == before
+
+
 def test_slices_in_key():
     pass # TODO - tests _cehckForSlicesInKey()
 
@@ -419,6 +683,449 @@ def test_loads():
     canvas = pytc.Canvas(3, 3 , loads='123\n456\n')
     assert canvas == patternedCanvas
 
+def test_storage():
+    # Test the default storage engine.
+    canvas = pytc.Canvas(4, 3, loads='abcd\nefgh')
+    assert isinstance(canvas._storage, pytc.ArrayStorage)
+    assert canvas._storage.getRowChars(0) == 'abcd'
+    assert canvas._storage.getRowChars(1, 1, 3) == 'fg'
+    assert canvas._storage.getRowChars(2) == '\x00' * 4
+    assert canvas._storage.getChar(0, 2) is None
+
+    # Test passing a storage class or object to the ctor.
+    canvas = pytc.Canvas(4, 3, storage=pytc.ArrayStorage)
+    assert isinstance(canvas._storage, pytc.ArrayStorage)
+    storage = pytc.ArrayStorage(4, 3)
+    canvas = pytc.Canvas(4, 3, storage=storage)
+    assert canvas._storage is storage
+    with pytest.raises(pytc.PyTextCanvasException):
+        pytc.Canvas(5, 3, storage=storage)
+
+    # Test that colors are stored along with the characters.
+    canvas = pytc.Canvas(4, 3, fg=pytc.RED, bg=pytc.BLUE)
+    canvas.write('xy', 3, 0)
+    assert canvas._storage.getColors(3, 0) == (pytc.RED, pytc.BLUE)
+    assert canvas._storage.getColors(0, 1) == (pytc.RED, pytc.BLUE)
+    assert canvas._storage.getColors(1, 1) == (None, None)
+    assert str(canvas) == '   x\ny   \n    '
+
+
+def test_tiled_storage():
+    import functools
+    smallTiles = functools.partial(pytc.TiledStorage, tileSize=4)
+
+    # Canvases with tiled storage behave the same as the default storage.
+    canvases = [pytc.Canvas(10, 9), pytc.Canvas(10, 9, storage=smallTiles)]
+    for canvas in canvases:
+        assert canvas._storage.getRowChars(0) == '\x00' * 10
+        canvas.loads('abcdefghij\n\n\n\n\n0123456789')
+        canvas.fg = pytc.RED
+        canvas.write('Hello', 7, 2)
+        canvas.rectangle('#', 1, 6, 8, 3)
+        canvas[9, 8] = 'Z'
+        del canvas[0, 0]
+        canvas.paint(2, 4, bg=pytc.BLUE)
+        canvas.hflip()
+        canvas.vflip()
+        canvas[(2, 2):(6, 5)] = '.'
+    assert str(canvases[0]) == str(canvases[1])
+    assert list(canvases[0].rows()) == list(canvases[1].rows())
+    for y in range(9):
+        assert canvases[0]._storage.getRowAttrs(y) == canvases[1]._storage.getRowAttrs(y)
+    assert canvases[0] == canvases[1]
+    assert canvases[0].copy(3, 1, 5, 6) == canvases[1].copy(3, 1, 5, 6)
+    assert canvases[0].copy(4, 4, 5, 5) == canvases[1].copy(4, 4, 5, 5)
+
+    # Tiles are only allocated when written to.
+    canvas = pytc.Canvas(1000, 1000, storage=pytc.TiledStorage)
+    assert canvas._storage.tileCount == 0
+    canvas[0, 0] = 'x'
+    canvas[999, 999] = 'y'
+    canvas.points('z', [(500, 500), (501, 501)])
+    canvas[200, 200] = None
+    assert canvas._storage.tileCount == 3
+    rows = list(canvas.rows())
+    assert rows[0][0] == 'x' and rows[999][999] == 'y' and rows[500][500] == 'z'
+    assert rows[1] == (None,) * 1000
+
+    # Clearing tiles frees them.
+    canvas.clear()
+    assert canvas._storage.tileCount == 0
+    assert canvas == pytc.Canvas(1000, 1000)
+
+    # Copies share tiles until one side writes to them.
+    canvas[10, 10] = 'a'
+    snapshot = canvas.copy()
+    assert snapshot._storage._tiles[0, 0] is canvas._storage._tiles[0, 0]
+    canvas[10, 10] = 'b'
+    assert snapshot[10, 10] == 'a'
+    assert canvas[10, 10] == 'b'
+    assert canvas.copy(64, 0, 10, 10)._storage.tileCount == 0
+
+    # Tiles that stick out of the copied area are copied, not shared, so the
+    # copy doesn't hold cells from outside of it.
+    canvas[20, 20] = 'q'
+    part = canvas.copy(0, 0, 15, 15)
+    assert part[10, 10] == 'b'
+    assert part._storage._tiles[0, 0] is not canvas._storage._tiles[0, 0]
+    assert 'q' not in part._storage._tiles[0, 0].chars.tounicode()
+    part[10, 10] = 'c'
+    assert canvas[10, 10] == 'b'
+
+    # Tiles that only stick out past the edge of the canvas are still shared.
+    canvas = pytc.Canvas(100, 100, storage=pytc.TiledStorage)
+    canvas[70, 70] = 'a'
+    assert canvas.copy(64, 64, 36, 36)._storage._tiles[0, 0] is canvas._storage._tiles[1, 1]
+
+    # Flipping, shifting, replacing, and translating only touch the allocated tiles.
+    canvas = pytc.Canvas(10000, 10000, storage=pytc.TiledStorage)
+    canvas[5, 5] = 'x'
+    canvas[9000, 130] = 'y'
+    canvas.paint(4000, 7000, fg=pytc.RED)
+    canvas.vflip()
+    canvas.hflip()
+    assert canvas[9994, 9994] == 'x' and canvas[999, 9869] == 'y'
+    assert canvas.storage.getColors(5999, 2999) == (pytc.RED, None)
+    canvas.shift(-10, -20)
+    canvas.scroll(10, 20, wrap=False)
+    canvas.replace('x', 'z')
+    canvas.translate({'y': 'w'})
+    assert canvas[9994, 9994] == 'z' and canvas[999, 9869] == 'w'
+    assert canvas.storage.tileCount == 3
+    assert canvas == canvas.copy()
+    canvas.replace('z', None)
+    assert canvas.storage.tileCount == 2
+
+
+def test_numpy_storage():
+    numpy = pytest.importorskip('numpy')
+
+    # Canvases with NumPy storage behave the same as the default storage.
+    canvases = [pytc.Canvas(10, 9), pytc.Canvas(10, 9, storage=pytc.NumpyStorage)]
+    for canvas in canvases:
+        canvas.loads('abcdefghij\n\n\n\n\n0123456789')
+        canvas.fg = pytc.RED
+        canvas.write('Hello \u2588', 7, 2)
+        canvas.rectangle('#', 1, 6, 8, 3)
+        del canvas[0, 0]
+        canvas.paint(2, 4, bg=pytc.BLUE)
+        canvas.hflip()
+        canvas.vflip()
+        canvas[(2, 2):(6, 5)] = '.'
+        canvas.fg = pytc.GREEN
+        canvas.replace('#', '=')
+    assert str(canvases[0]) == str(canvases[1])
+    for y in range(9):
+        assert canvases[0]._storage.getRowAttrs(y) == canvases[1]._storage.getRowAttrs(y)
+    assert canvases[0] == canvases[1]
+    assert canvases[1] == canvases[1].copy()
+    assert canvases[0].copy(3, 1, 5, 6) == canvases[1].copy(3, 1, 5, 6)
+
+    # asarray() returns views of the planes.
+    canvas = canvases[1]
+    chars = canvas.asarray()
+    assert chars.shape == (9, 10) and chars[8, 9] == 0 # The deleted 0, 0 cell, after the flips.
+    chars[numpy.where(chars == ord('='))] = ord('-')
+    assert '=' not in str(canvas) and '-' in str(canvas)
+    y, x = numpy.argwhere(chars == ord('-'))[0]
+    assert canvas.asarray('fg')[y, x] == pytc.GREEN + 1 # Set by replace().
+    panel = canvas.view(1, 1, 3, 2)
+    panel.asarray()[:] = ord('v')
+    assert canvas[1, 1] == canvas[3, 2] == 'v'
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.asarray('attrs')
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvases[0].asarray()
+
+    # setCells() is vectorized for NumPy storage, and behaves the same.
+    canvases = [pytc.Canvas(5, 3), pytc.Canvas(5, 3, storage=pytc.NumpyStorage)]
+    for canvas in canvases:
+        canvas.setCells(numpy.array([0, 4, -1, 5, 2]), numpy.array([0, 2, 0, 0, 1]), 'ab#cd', fg=numpy.int64(pytc.RED))
+        canvas.setCells([1, 2], [1, 1], ['x', None], fg=[pytc.GREEN, None], bg=numpy.array([pytc.BLUE, pytc.CYAN]))
+        canvas.setCells([3], [0], 'y', bg=numpy.uint8(pytc.YELLOW))
+        for args, kwargs in [(([0, 1], [0], 'x'), {}),
+                             ((numpy.array([0.5]), [0], 'x'), {}),
+                             (([0, 1], [0, 1], ['x', 'yy']), {}),
+                             (([0, 1], [0, 1], 'x'), {'fg': numpy.int64(99)}),
+                             (([0, 1], [0, 1], 'x'), {'bg': numpy.array([1, 99])})]:
+            with pytest.raises(pytc.PyTextCanvasException):
+                canvas.setCells(*args, **kwargs)
+    assert str(canvases[0]) == str(canvases[1]) == 'a  y \n x   \n    b'
+    for y in range(3):
+        assert canvases[0].storage.getRowAttrs(y) == canvases[1].storage.getRowAttrs(y)
+    assert canvases[1].storage.getColors(2, 1) == (pytc.RED, pytc.CYAN)
+
+
+def test_open_mmap(tmp_path, monkeypatch):
+    path = str(tmp_path / 'canvas.bin')
+
+    # A new file starts out as a canvas of None cells.
+    canvas = pytc.Canvas.openMmap(path, 10, 4)
+    assert canvas.size == (10, 4)
+    assert canvas[0, 0] is None
+    assert str(canvas) == '\n'.join([' ' * 10] * 4)
+
+    canvas.write('Hello')
+    canvas.paint(2, 1, pytc.RED, pytc.BLUE)
+    canvas[9, 3] = '\u2588'
+    assert canvas.copy()[0, 0] == 'H'
+    canvas.storage.close()
+
+    # Reopening the file gets the same cells back, without giving the size.
+    canvas = pytc.Canvas.openMmap(path)
+    assert canvas.size == (10, 4)
+    assert str(canvas).splitlines()[0] == 'Hello     '
+    assert canvas[9, 3] == '\u2588'
+    assert canvas.storage.getColors(2, 1) == (pytc.RED, pytc.BLUE)
+    assert canvas.storage.getColors(0, 0) == (None, None)
+
+    # Changes made by another canvas on the same file show up right away.
+    reader = pytc.Canvas.openMmap(path, readonly=True)
+    str(reader)
+    canvas[0, 0] = 'J'
+    assert str(reader).startswith('Jello')
+    # Read-only canvases raise before anything is changed.
+    for change in (lambda: reader.__setitem__((0, 0), 'x'), lambda: reader.write('x'), lambda: reader.fill('x'),
+                   lambda: reader.paint(0, 0, fg=pytc.RED), lambda: reader.line('x', 0, 0, 3, 3), reader.vflip,
+                   lambda: reader.replace('J', 'x'), lambda: reader.setCells([0], [0], 'x'), reader.batch):
+        with pytest.raises(pytc.PyTextCanvasException):
+            change()
+    assert str(reader).startswith('Jello')
+    assert reader._strCache is None # The volatile storage is never cached.
+    assert reader.storage.snapshot() is reader.storage # Rendered straight from the file, not copied.
+    reader.storage.close()
+    canvas.storage.close()
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        pytc.Canvas.openMmap(path, 20, 4) # wrong size
+    with pytest.raises(pytc.PyTextCanvasException):
+        pytc.Canvas.openMmap(str(tmp_path / 'missing.bin')) # no size to create with
+    badPath = tmp_path / 'bad.bin'
+    badPath.write_bytes(b'not a canvas file at all')
+    with pytest.raises(pytc.PyTextCanvasException):
+        pytc.Canvas.openMmap(str(badPath))
+
+    # Bad sizes are rejected before the file is created.
+    newPath = str(tmp_path / 'new.bin')
+    for width, height in ((0, 4), (10, -1), (2.5, 4), (10, '4')):
+        with pytest.raises(pytc.PyTextCanvasException):
+            pytc.Canvas.openMmap(newPath, width, height)
+        with pytest.raises(ValueError):
+            pytc.MmapStorage(newPath, width, height)
+    assert not os.path.exists(newPath)
+
+    # The file is closed if the canvas can't be made.
+    closed = []
+    class BrokenCanvas(pytc.Canvas):
+        def __init__(self, *args, **kwargs):
+            raise pytc.PyTextCanvasException('broken')
+    monkeypatch.setattr(pytc.MmapStorage, 'close', lambda storage: closed.append(storage))
+    with pytest.raises(pytc.PyTextCanvasException):
+        BrokenCanvas.openMmap(path)
+    assert len(closed) == 1 and closed[0].path == path
+
+
+def _writeToSharedCanvas(canvas, y):
+    # Runs in a worker process of test_SharedCanvas_processes().
+    canvas.write('worker %s' % (y), 0, y)
+    canvas.close()
+    return y
+
+
+def test_SharedCanvas_processes():
+    import concurrent.futures
+    import multiprocessing
+    from multiprocessing import resource_tracker
+
+    canvas = pytc.SharedCanvas(20, 4)
+    try:
+        # Workers in other processes write into the same cells.
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            assert sorted(executor.map(_writeToSharedCanvas, [canvas] * 4, range(4))) == [0, 1, 2, 3]
+        assert str(canvas).splitlines() == ['worker %s' % (y) + ' ' * 12 for y in range(4)]
+
+        # The block still exists after the workers have exited.
+        other = pytc.SharedCanvas.attach(canvas.name)
+        assert other[0, 0] == 'w'
+        other.close()
+
+        # Attaching doesn't leave the block registered with this process's
+        # resource tracker, which would unlink it when the process exits.
+        if sys.version_info < (3, 13) and os.name == 'posix':
+            registered = []
+            originalRegister, originalUnregister = resource_tracker.register, resource_tracker.unregister
+            resource_tracker.register = lambda name, rtype: registered.append(name)
+            resource_tracker.unregister = lambda name, rtype: registered.remove(name)
+            try:
+                pytc.SharedCanvas.attach(canvas.name).close()
+            finally:
+                resource_tracker.register, resource_tracker.unregister = originalRegister, originalUnregister
+            assert registered == []
+    finally:
+        canvas.close()
+        canvas.unlink()
+
+
+def test_SharedCanvas():
+    import pickle
+    canvas = pytc.SharedCanvas(10, 4)
+    try:
+        assert canvas.size == (10, 4)
+        assert canvas[0, 0] is None
+
+        # Other SharedCanvas objects attached to the same name share the cells.
+        other = pytc.SharedCanvas.attach(canvas.name)
+        assert other.size == (10, 4)
+        canvas.write('Hello')
+        assert str(other).startswith('Hello')
+        other.rectangle('#', 0, 1, 10, 3)
+        assert canvas[9, 3] == '#'
+        other.close()
+
+        # Pickling attaches to the same canvas instead of copying it.
+        unpickled = pickle.loads(pickle.dumps(canvas))
+        assert isinstance(unpickled, pytc.SharedCanvas)
+        unpickled[0, 0] = 'J'
+        assert canvas[0, 0] == 'J'
+        unpickled.close()
+
+        # Copies are ordinary canvases.
+        snapshot = canvas.copy()
+        assert type(snapshot) is pytc.Canvas
+        canvas[0, 0] = 'H'
+        assert snapshot[0, 0] == 'J'
+
+        loaded = pytc.SharedCanvas(loads='ab\ncd')
+        assert loaded.size == (2, 2) and str(loaded) == 'ab\ncd'
+        loaded.close()
+        loaded.unlink()
+    finally:
+        canvas.close()
+        canvas.unlink()
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        pytc.SharedCanvas.attach(canvas.name) # It has been unlinked.
+
+
+def test_thread_safe():
+    import threading
+    canvas = pytc.Canvas(20, 40, threadSafe=True)
+    assert isinstance(canvas.storage, pytc.LockedStorage)
+    assert canvas.storage.inner.__class__ is pytc.ArrayStorage
+
+    # Each thread fills a pair of rows in different lock stripes with the
+    # same character, so a consistent snapshot always has matching rows.
+    def draw(top):
+        for i in range(200):
+            char = chr(ord('a') + (i % 26))
+            with canvas.storage.lockRows(top, top + 21):
+                canvas.view(0, top, 20, 1).fill(char)
+                canvas.view(0, top + 20, 20, 1).fill(char)
+
+    threads = [threading.Thread(target=draw, args=(top,)) for top in range(0, 20, 5)]
+    for thread in threads:
+        thread.start()
+    for i in range(50):
+        rows = str(canvas).splitlines()
+        for top in range(0, 20, 5):
+            assert rows[top] == rows[top + 20]
+    for thread in threads:
+        thread.join()
+
+    rows = str(canvas).splitlines()
+    for top in range(0, 20, 5):
+        assert rows[top] == rows[top + 20] == 'r' * 20 # The last character drawn.
+
+    # Copies are consistent snapshots that aren't locked.
+    snapshot = canvas.copy()
+    assert not isinstance(snapshot.storage, pytc.LockedStorage)
+    assert snapshot == canvas
+
+    # Translating and comparing go through the locked storage too.
+    other = pytc.Canvas(20, 40, threadSafe=True)
+    for top in range(0, 20, 5):
+        other.fill('r', 0, top, 20, 1)
+        other.fill('r', 0, top + 20, 20, 1)
+    assert other == canvas and canvas == other
+    other.translate({'r': 's'})
+    assert other != canvas and str(other).splitlines()[0] == 's' * 20
+
+    # Painting reads the attribute byte and writes it back under the lock,
+    # so another thread painting the same cell in between doesn't lose its color.
+    interrupted = []
+    class InterruptedStorage(pytc.ArrayStorage):
+        def getAttr(self, x, y):
+            attr = pytc.ArrayStorage.getAttr(self, x, y)
+            if not interrupted:
+                interrupted.append(threading.Thread(target=painted.paint, args=(0, 0), kwargs={'bg': pytc.BLUE}))
+                interrupted[0].start()
+                interrupted[0].join(0.1) # Blocks on the lock, so this times out.
+            return attr
+    painted = pytc.Canvas(1, 1, storage=InterruptedStorage, threadSafe=True)
+    painted.paint(0, 0, fg=pytc.RED)
+    interrupted[0].join()
+    assert painted.storage.getColors(0, 0) == (pytc.RED, pytc.BLUE)
+
+    # Tiled storage is locked in whole tiles.
+    tiled = pytc.Canvas(10, 100, storage=pytc.TiledStorage, threadSafe=True)
+    assert tiled.storage.stripeHeight == pytc.TiledStorage.TILE_SIZE
+    tiled.view(2, 2, 3, 3).fill('x')
+    assert tiled[2, 2] == 'x' and tiled[5, 5] is None
+
+    # Copying a region while another thread allocates and frees tiles in
+    # other stripes.
+    tiled = pytc.Canvas(64, 640, storage=pytc.TiledStorage, threadSafe=True)
+    tiled[1, 1] = 'a'
+    stop = threading.Event()
+    def allocateAndFreeTiles():
+        while not stop.is_set():
+            for top in range(64, 640, 64):
+                tiled[5, top + 3] = 'x'
+            for top in range(64, 640, 64):
+                tiled.fill(None, 0, top, 64, 64)
+    switchInterval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6) # Switch threads often, so the race shows up quickly.
+    writer = threading.Thread(target=allocateAndFreeTiles)
+    writer.start()
+    try:
+        for i in range(10000):
+            assert tiled.copy(0, 0, 64, 8)[1, 1] == 'a'
+    finally:
+        stop.set()
+        writer.join()
+        sys.setswitchinterval(switchInterval)
+
+
+def test_paint():
+    canvas = pytc.Canvas(3, 2)
+    canvas.paint(0, 0, fg=pytc.RED)
+    assert canvas._storage.getColors(0, 0) == (pytc.RED, None)
+    canvas.paint(0, 0, bg=pytc.BLUE)
+    assert canvas._storage.getColors(0, 0) == (pytc.RED, pytc.BLUE)
+    canvas.paint(0, 0, fg=pytc.CLEAR)
+    assert canvas._storage.getColors(0, 0) == (pytc.CLEAR, pytc.BLUE)
+    assert canvas._storage.getColors(1, 0) == (None, None)
+
+    # The fg and bg colors are packed into one attribute byte per cell.
+    assert canvas._storage.getRowAttrs(0) == bytes((pytc.storage.packAttr(pytc.CLEAR, pytc.BLUE), 0, 0))
+    assert pytc.storage.unpackAttr(pytc.storage.packAttr(pytc.YELLOW, pytc.CLEAR)) == (pytc.YELLOW, pytc.CLEAR)
+
+    # Painting off of the canvas does nothing.
+    canvas.paint(10, 10, fg=pytc.RED)
+
+    # Colors outside the valid range would spill into the other half of the attribute byte.
+    for fg, bg in ((15, None), (None, 9), (-1, None), ('red', None), (1.0, None), (None, True)):
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.paint(0, 0, fg=fg, bg=bg)
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.fg = fg if fg is not None else bg
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.bg = fg if fg is not None else bg
+    assert canvas._storage.getColors(0, 0) == (pytc.CLEAR, pytc.BLUE)
+    assert (canvas.fg, canvas.bg) == (None, None)
+
+
 def isOnCanvas():
     canvas = pytc.Canvas()
     assert canvas.isOnCanvas(0, 0)
@@ -435,19 +1142,97 @@ def isOnCanvas():
 
 
 def test_rotate():
-    pass
+    canvas = pytc.Canvas(3, 2, loads='abc\ndef')
+    canvas.paint(2, 0, fg=pytc.RED)
+
+    rotated = canvas.rotate90()
+    assert rotated.size == (2, 3)
+    assert str(rotated) == 'da\neb\nfc'
+    assert rotated.storage.getColors(1, 2) == (pytc.RED, None)
+    assert str(canvas.rotate180()) == 'fed\ncba'
+    assert canvas.rotate180().storage.getColors(0, 1) == (pytc.RED, None)
+    assert str(canvas.rotate270()) == 'cf\nbe\nad'
+    assert canvas.rotate270().storage.getColors(0, 0) == (pytc.RED, None)
+    assert str(canvas) == 'abc\ndef' # The original canvas is unchanged.
+
+    # Four rotations in either direction gets the original back.
+    assert canvas.rotate90().rotate90().rotate90().rotate90() == canvas
+    assert canvas.rotate90().rotate270() == canvas
+    assert canvas.rotate90().rotate90() == canvas.rotate180()
+
+    # Direction-sensitive glyphs can be remapped.
+    arrows = pytc.Canvas(4, 1, loads='>/|┌')
+    assert str(arrows.rotate90(remapGlyphs=True)) == 'v\n\\\n-\n┐'
+    assert str(arrows.rotate90()) == '>\n/\n|\n┌'
+    assert arrows.rotate90(True).rotate270(True) == arrows
+    assert arrows.rotate180(True).rotate180(True) == arrows
+    assert str(arrows.rotate180(True)) == '┘|/<'
+
+
+def test_transpose():
+    canvas = pytc.Canvas(3, 2, loads='abc\nd-f')
+    canvas.paint(2, 0, bg=pytc.BLUE)
+    transposed = canvas.transpose()
+    assert str(transposed) == 'ad\nb-\ncf'
+    assert transposed.storage.getColors(0, 2) == (None, pytc.BLUE)
+    assert transposed.transpose() == canvas
+    assert str(canvas.transpose(remapGlyphs=True)) == 'ad\nb|\ncf'
 
 def test_scale():
-    pass
+    canvas = pytc.Canvas(2, 2, loads='ab\ncd')
+    canvas.paint(1, 0, fg=pytc.RED)
+    scaled = canvas.scale(2, 1.5)
+    assert scaled.size == (4, 3)
+    assert str(scaled) == 'aabb\nccdd\nccdd'
+    assert scaled.storage.getColors(3, 0) == (pytc.RED, None)
+    assert canvas.scale(0.5) == pytc.Canvas(1, 1, loads='d') # The cell nearest the center.
+    assert canvas.scale(0.01).size == (1, 1)
+
+    for args in ((0,), (-1, 1), ('2',)):
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.scale(*args)
+
+
+def test_resize():
+    canvas = pytc.Canvas(6, 4, loads='......\n.#....\n....|.\n......')
+    canvas.paint(1, 1, bg=pytc.BLUE)
+    assert str(canvas.resize(6, 4)) == str(canvas)
+    assert str(canvas.resize(3, 2)) == '#..\n...' # nearest
+    assert str(canvas.resize(3, 2, 'density')) == '...\n...'
+    assert str(canvas.resize(3, 2, 'priority', priority='|#')) == '#..\n..|'
+    assert canvas.resize(3, 2, 'priority', priority='|#').storage.getColors(0, 0) == (None, pytc.BLUE)
+    assert str(canvas.resize(12, 1, 'priority', priority='#|')) == '..##....||..' # Wider, but shorter.
+
+    # Blank and None cells only win blocks with nothing else in them.
+    sparse = pytc.Canvas(4, 2)
+    sparse[3, 1] = 'x'
+    sparse[0, 0] = ' '
+    resized = sparse.resize(2, 1, 'density')
+    assert resized[0, 0] == ' ' and resized[1, 0] == 'x'
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.resize(0, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.resize(2, 2, 'bicubic')
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.resize(2, 2, 'priority')
 
 def test_flip():
     pass
 
 def test_vflip():
-    pass
+    canvas = pytc.Canvas(3, 3, loads='abc\ndef\nghi')
+    canvas.paint(0, 0, fg=pytc.RED)
+    canvas.vflip()
+    assert str(canvas) == 'ghi\ndef\nabc'
+    assert canvas._storage.getColors(0, 2) == (pytc.RED, None)
 
 def test_hflip():
-    pass
+    canvas = pytc.Canvas(3, 3, loads='abc\ndef\nghi')
+    canvas.paint(0, 0, fg=pytc.RED)
+    canvas.hflip()
+    assert str(canvas) == 'cba\nfed\nihg'
+    assert canvas._storage.getColors(2, 0) == (pytc.RED, None)
 
 def test_box():
     pass
@@ -483,6 +1268,77 @@ def test_fill():
     with pytest.raises(pytc.PyTextCanvasException):
         canvas.fill('xx')
 
+    # Test filling an area, which is clipped to the canvas.
+    canvas.fill('.', 1, 1, 2, 2)
+    assert str(canvas) == 'xxxx\nx..x\nx..x\nxxxx'
+    canvas.fill('-', 2, -5)
+    assert str(canvas) == 'xx--\nx.--\nx.--\nxx--'
+    canvas.fill('#', 3, 3, 100, 100)
+    canvas.fill('#', 10, 10, 2, 2) # entirely off the canvas
+    assert str(canvas) == 'xx--\nx.--\nx.--\nxx-#'
+    canvas.fg = pytc.RED
+    canvas.fill('o', 0, 0, 1, 4)
+    assert canvas.storage.getColors(0, 3) == (pytc.RED, None)
+    assert canvas.storage.getColors(1, 3) == (None, None)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.fill('x', 0, 0, -1, 1)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.fill('x', 0.5, 0)
+
+
+def test_replace():
+    canvas = pytc.Canvas(4, 3, loads='abab\nbaba\nabab')
+    canvas.replace('a', 'x')
+    assert str(canvas) == 'xbxb\nbxbx\nxbxb'
+
+    canvas.replace('b', None, 1, 1)
+    assert str(canvas) == 'xbxb\nbx x\nx x '
+    assert canvas[1, 2] is None
+
+    canvas.fg = pytc.BLUE
+    canvas.replace('x', 'y', 2, 0, 5, 2)
+    assert str(canvas) == 'xbyb\nbx y\nx x '
+    assert canvas.storage.getColors(2, 0) == (pytc.BLUE, None)
+    assert canvas.storage.getColors(0, 0) == (None, None)
+
+    # Replacing in a view only changes the view's area.
+    canvas.view(0, 1, 2, 2).replace(None, '_')
+    assert str(canvas) == 'xbyb\nbx y\nx_x '
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.replace('xx', 'y')
+
+
+def test_translate():
+    canvas = pytc.Canvas(4, 3, loads='abcd\ndcba')
+    canvas.paint(0, 0, fg=pytc.RED, bg=pytc.BLUE)
+    canvas.paint(1, 1, bg=pytc.RED)
+    canvas.translate(str.maketrans('ab', 'xy'))
+    assert str(canvas) == 'xycd\ndcyx\n    '
+    assert canvas.storage.getColors(0, 0) == (pytc.RED, pytc.BLUE) # Colors are unchanged.
+
+    # Keys and values can be characters, ordinals, or None.
+    canvas.translate({None: '.', ord('c'): ord('C'), 'd': None})
+    assert str(canvas) == 'xyC \n Cyx\n....'
+    assert canvas[3, 0] is None
+
+    # The color table is applied to both fg and bg.
+    canvas.translate({}, {pytc.RED: pytc.GREEN, None: pytc.BLACK})
+    assert canvas.storage.getColors(0, 0) == (pytc.GREEN, pytc.BLUE)
+    assert canvas.storage.getColors(1, 1) == (pytc.BLACK, pytc.GREEN)
+    assert canvas.storage.getColors(3, 2) == (pytc.BLACK, pytc.BLACK)
+
+    # Translating an area.
+    canvas.translate({'.': '_'}, left=1, top=2, width=2)
+    assert str(canvas) == 'xyC \n Cyx\n.__.'
+
+    for table in ({'ab': 'x'}, {'a': 'xy'}, {'a': 1.5}, ['a']):
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.translate(table)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.translate({}, {pytc.RED: 42})
+
+
 def test_floodfill():
     pass
 
@@ -490,13 +1346,55 @@ def test_blit():
     pass
 
 def test_square():
-    pass
+    canvas = pytc.Canvas(5, 4)
+    canvas.square('#', 1, 1, 2, filled=True)
+    assert str(canvas) == '     \n ##  \n ##  \n     '
 
 def test_rect():
-    pass
+    canvas = pytc.Canvas(5, 4)
+    canvas.fg = pytc.RED
+    canvas.rectangle('#', 1, 0, 3, 2, filled=True)
+    assert str(canvas) == ' ### \n ### \n     \n     '
+    assert canvas.storage.getColors(3, 1) == (pytc.RED, None)
+    assert canvas.storage.getColors(4, 1) == (None, None)
+
+    # Filled rectangles are clipped to the canvas.
+    canvas = pytc.Canvas(5, 4)
+    canvas.rectangle('#', -2, 2, 4, 10, filled=True)
+    assert str(canvas) == '     \n     \n##   \n##   '
+    canvas.rectangle(None, 1, 3, 100, 1, filled=True)
+    assert str(canvas) == '     \n     \n##   \n#    '
+    canvas.rectangle('#', 10, 10, 3, 3, filled=True) # Entirely off the canvas.
+    assert str(canvas) == '     \n     \n##   \n#    '
+
+    # Rectangle outlines are clipped to the canvas.
+    for left, top, width, height in ((-2, -1, 4, 3), (3, 1, 10, 10), (-5, -5, 20, 20)):
+        canvas, expected = pytc.Canvas(5, 4), pytc.Canvas(5, 4)
+        canvas.rectangle('#', left, top, width, height)
+        expected.points('#', pybresenham.rectangle(left, top, width, height))
+        assert str(canvas) == str(expected)
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.rectangle('#', 0, 0, 0, 3, filled=True)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.rectangle('##', 0, 0, 2, 2, filled=True)
 
 def test_diamond():
-    pass
+    canvas = pytc.Canvas(7, 5)
+    canvas.diamond('#', 0, 0, 2, filled=True)
+    assert str(canvas) == '   #   \n  ###  \n ##### \n  ###  \n   #   '
+
+    # The spans match the cells pybresenham fills in.
+    expected = pytc.Canvas(7, 5)
+    expected.points('#', pybresenham.diamond(0, 0, 2, filled=True))
+    assert str(canvas) == str(expected)
+
+    # Outlines and diamonds that are partly off the canvas.
+    for left, top, filled in ((-3, -2, False), (-3, -2, True), (4, 3, False), (0, 0, False)):
+        canvas, expected = pytc.Canvas(7, 5), pytc.Canvas(7, 5)
+        canvas.diamond('#', left, top, 3, filled=filled)
+        expected.points('#', pybresenham.diamond(left, top, 3, filled=filled))
+        assert str(canvas) == str(expected)
 
 def test_hexagon():
     pass
@@ -507,20 +1405,184 @@ def test_arrow():
 def test_corner():
     pass # must be "horizontal" or "vertical"
 
+def test_points():
+    canvas = pytc.Canvas(4, 3)
+    canvas.points('x', [(0, 0), (3, 2), (4, 0), (-1, 1)])
+    assert str(canvas) == 'x   \n    \n   x'
+    canvas.points(None, iter([(0, 0)]))
+    assert canvas[0, 0] is None
+
+    for char in ('', 'xy', 5, ['x']):
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.points(char, [(1, 1)])
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.points('x', [1, 2])
+    assert str(canvas) == '    \n    \n   x'
+
+
 def test_line():
-    pass
+    canvas = pytc.Canvas(6, 3)
+    canvas.line('#', 0, 0, 5, 2)
+    assert str(canvas) == '##    \n  ##  \n    ##'
+
+    # Clipped lines draw the same cells as the unclipped pybresenham line.
+    for x1, y1, x2, y2 in ((-10, -3, 20, 8), (20, 8, -10, -3), (3, -50, 2, 40), (2, 40, 3, -50),
+                           (-5, 1, 9, 1), (9, 1, -5, 1), (4, 4, 4, 4), (2, 1, 2, 1), (-7, 9, 12, -6)):
+        canvas, expected = pytc.Canvas(6, 3), pytc.Canvas(6, 3)
+        canvas.line('#', x1, y1, x2, y2)
+        expected.points('#', pybresenham.line(x1, y1, x2, y2))
+        assert str(canvas) == str(expected)
+
+    # Only the part of the line on the canvas is rasterized.
+    canvas = pytc.Canvas(80, 25)
+    canvas.line('#', -100000, 0, 100000, 10)
+    assert sum(row.count('#') for row in str(canvas).splitlines()) == 80
+    canvas = pytc.Canvas(6, 3)
+    canvas.line('#', -100000, -100000, -5, 100000)
+    assert str(canvas) == '      \n      \n      '
+
+    with pytest.raises(NotImplementedError):
+        canvas.line('#', 0, 0, 5, 2, thickness=2)
 
 def test_lines():
-    pass
+    canvas = pytc.Canvas(6, 4)
+    canvas.lines('#', [(0, 0), (5, 0), (5, 3)])
+    assert str(canvas) == '######\n     #\n     #\n     #'
+
+    for points in ([(-4, -2), (9, 3), (2, 7), (0, 1)], [(3, -9), (12, 2), (-6, 2)]):
+        for closed in (False, True):
+            canvas, expected = pytc.Canvas(6, 4), pytc.Canvas(6, 4)
+            canvas.lines('#', points, closed=closed)
+            expected.points('#', pybresenham.lines(points, closed=closed))
+            assert str(canvas) == str(expected)
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.lines('#', [(0, 0)])
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.lines('#', [(0, 0), (1, 1)], closed=True)
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.lines('#', [(0, 0), (1, 'a')])
+
+def test_grid():
+    canvas = pytc.Canvas(7, 4)
+    canvas.grid('#', 0, 0, 2, 1, 2, 2)
+    assert str(canvas) == '#######\n#  #  #\n#  #  #\n#######'
+
+    # Grids are clipped to the canvas.
+    for args in ((-4, -3, 3, 3, 2, 1, 1), (-30, -30, 20, 20, 3, 2, 2), (5, 2, 4, 4, 1, 1, 1), (10, 10, 2, 2, 2, 2, 1)):
+        canvas, expected = pytc.Canvas(7, 4), pytc.Canvas(7, 4)
+        canvas.grid('#', *args)
+        expected.points('#', pybresenham.grid(*args))
+        assert str(canvas) == str(expected)
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.grid('#', 0, 0, 0, 1, 2, 2)
 
 def test_polygon():
-    pass
+    canvas = pytc.Canvas(11, 11)
+    canvas.polygon('#', 5, 5, 4, 4)
+    assert str(canvas) == ('           \n'
+                           '           \n'
+                           '           \n'
+                           '   #####   \n'
+                           '   #   #   \n'
+                           '   #   #   \n'
+                           '   #   #   \n'
+                           '   #####   \n'
+                           '           \n'
+                           '           \n'
+                           '           ')
+
+    canvas.polygon('#', 5, 5, 4, 4, filled=True)
+    assert str(canvas) == ('           \n'
+                           '           \n'
+                           '           \n'
+                           '   #####   \n'
+                           '   #####   \n'
+                           '   #####   \n'
+                           '   #####   \n'
+                           '   #####   \n'
+                           '           \n'
+                           '           \n'
+                           '           ')
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.polygon('#', 5, 5, 4, 2)
+
+def test_fillPolygon():
+    # Concave polygons.
+    canvas = pytc.Canvas(8, 6)
+    canvas.fill('.')
+    canvas.fillPolygon('#', [(0, 0), (6, 0), (6, 5), (4, 5), (4, 2), (2, 2), (2, 5), (0, 5)])
+    assert str(canvas) == '######..\n######..\n##..##..\n##..##..\n##..##..\n........'
+
+    # The fill rule decides whether the middle of a self-intersecting polygon is inside.
+    star = [(4, 0), (7, 8), (0, 3), (8, 3), (1, 8)]
+    canvas = pytc.Canvas(9, 9)
+    canvas.fillPolygon('#', star)
+    assert canvas[4, 5] is None
+    canvas.fillPolygon('#', star, rule='nonzero')
+    assert canvas[4, 5] == '#'
+    evenOdd, nonZero = pytc.Canvas(9, 9), pytc.Canvas(9, 9)
+    evenOdd.fillPolygon('#', star)
+    nonZero.fillPolygon('#', star, rule='nonzero')
+    assert all(nonZero[x, y] == '#' for x in range(9) for y in range(9) if evenOdd[x, y] == '#')
+
+    # Polygons are clipped to the canvas, and can have float vertices.
+    canvas = pytc.Canvas(5, 4)
+    canvas.fill('.')
+    canvas.fg = pytc.RED
+    canvas.fillPolygon('#', [(-3.5, -3), (20, -3), (20, 1.5), (-3.5, 1.5)])
+    assert str(canvas) == '#####\n#####\n.....\n.....'
+    assert canvas.storage.getColors(4, 1) == (pytc.RED, None)
+    canvas.fillPolygon('#', [(10, 10), (20, 10), (15, 20)]) # Entirely off the canvas.
+    assert str(canvas) == '#####\n#####\n.....\n.....'
+
+    # Polygons with thousands of vertices.
+    vertices = [(50 + 40 * math.cos(2 * math.pi * i / 5000), 50 + 40 * math.sin(2 * math.pi * i / 5000)) for i in range(5000)]
+    canvas = pytc.Canvas(100, 100)
+    canvas.fillPolygon('#', vertices)
+    assert canvas[50, 50] == canvas[50, 11] == canvas[89, 50] == '#'
+    assert canvas[50, 9] is None and canvas[91, 50] is None
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.fillPolygon('#', [(0, 0), (1, 1)])
+    before = str(canvas)
+    for vertices in ([(0, 0), (1, 1), (1, 'a')], [1, 2, 3], [(0, 0), (1, 1), (2,)], [(0, 0), (1, 1), (2, 2, 2)],
+                     [(0, 0), (1, 1), (2, None)], [(0, 0), (1, 1), 'ab'], 5):
+        with pytest.raises(pytc.PyTextCanvasException):
+            canvas.fillPolygon('#', vertices)
+    assert str(canvas) == before
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.fillPolygon('#', star, rule='winding')
 
 def test_ellipse():
     pass
 
 def test_circle():
-    pass
+    canvas = pytc.Canvas(9, 9)
+    canvas.circle('o', 4, 4, 3, filled=True)
+    outline = pytc.Canvas(9, 9)
+    outline.circle('o', 4, 4, 3)
+
+    # Every row of the filled circle spans its outline, with no gaps.
+    for y in range(9):
+        outlineRow = [x for x in range(9) if outline[x, y] == 'o']
+        filledRow = [x for x in range(9) if canvas[x, y] == 'o']
+        if outlineRow:
+            assert filledRow == list(range(outlineRow[0], outlineRow[-1] + 1))
+        else:
+            assert filledRow == []
+
+    # Filled circles are clipped to the canvas.
+    canvas = pytc.Canvas(4, 4)
+    canvas.circle('o', 0, 0, 2, filled=True)
+    assert str(canvas) == 'ooo \nooo \noo  \n    '
+
+    for args in (('5', 0, 2), (0, None, 2), (0, 0, '2')):
+        for filled in (False, True):
+            with pytest.raises(pytc.PyTextCanvasException):
+                canvas.circle('o', *args, filled=filled)
 
 def test_arc():
     pass
@@ -777,20 +1839,185 @@ def test__checkForIntOrFloat():
         pytc._checkForIntOrFloat('invalid')
 
 
-def test_getTerminalSize():
-    # This test can't reliably run, since the terminal size will be different
-    # depending on the terminal that runs these tests. Let's just make sure
-    # it runs without raising an exception.
-    pass
-    #pytc.getTerminalSize()
+def test_render_print():
+    reset = pytc.Fore.RESET + pytc.Back.RESET
+    canvas = pytc.Canvas(3, 2, loads='abc\nd')
+    assert canvas.render() == reset + 'abc\nd  \n' + reset
+
+    # Color codes are only added when the color changes.
+    canvas.paint(1, 0, fg=pytc.RED)
+    canvas.paint(2, 0, fg=pytc.RED, bg=pytc.BLUE)
+    assert canvas.render() == reset + 'a' + pytc.Fore.RED + 'b' + pytc.Back.BLUE + 'c\n' + pytc.Fore.RESET + pytc.Back.RESET + 'd  \n' + reset
+
+    # print() and render() can write to text and binary streams.
+    stream = io.StringIO()
+    canvas.print(file=stream)
+    assert stream.getvalue() == canvas.render()
+
+    stream = io.StringIO()
+    canvas.render(stream)
+    assert stream.getvalue() == canvas.render()
+
+    stream = io.BytesIO()
+    canvas.render(stream)
+    assert stream.getvalue() == canvas.render().encode('utf-8')
+
+
+def test_export():
+    import concurrent.futures
+    canvas = pytc.Canvas(7, 10)
+    for y in range(10):
+        canvas.write('<%s>' % (y), 0, y)
+        canvas.paint(y % 7, y, fg=y % 9, bg=(y + 3) % 9)
+    canvas.paint(6, 4, fg=pytc.RED) # A band can start with the colors the last one ended with.
+
+    assert canvas.export() == str(canvas)
+    assert canvas.export('ansi') == canvas.render()
+    assert canvas.export('html') == canvas.toHtml()
+    assert canvas.toHtml().startswith('<pre style="color: #000000; background-color: #ffffff"><span style="background-color: #ff0000">&lt;</span>0&gt;')
+
+    # Rendering in parallel bands gives the same result.
+    with concurrent.futures.ThreadPoolExecutor(3) as executor:
+        for format in ('text', 'ansi', 'html'):
+            for bandHeight in (1, 3, 4, 10, 20):
+                assert canvas.export(format, executor, bandHeight) == canvas.export(format)
+        assert canvas.render(executor=executor) == canvas.render()
+        stream = io.StringIO()
+        canvas.print(stream, executor=executor)
+        assert stream.getvalue() == canvas.render()
+    with concurrent.futures.ProcessPoolExecutor(2) as executor:
+        assert canvas.export('ansi', executor, 3) == canvas.export('ansi')
+
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.export('pdf')
+    with pytest.raises(pytc.PyTextCanvasException):
+        canvas.export('text', bandHeight=0)
+
+
+def test_TerminalRenderer():
+    stream = io.StringIO()
+    renderer = pytc.TerminalRenderer(stream, left=2, top=1)
+    canvas = pytc.Canvas(10, 3, loads='abc')
+
+    # The first frame draws every row in full.
+    assert renderer.present(canvas) == 30
+    output = stream.getvalue()
+    assert '\x1b[2;3Habc       ' in output
+    assert '\x1b[4;3H          ' in output
+
+    # Later frames only draw the changed runs.
+    stream.truncate(0)
+    stream.seek(0)
+    canvas[1, 2] = 'x'
+    canvas[8, 2] = 'y'
+    assert renderer.present(canvas) == 2
+    output = stream.getvalue()
+    assert '\x1b[4;4Hx' in output
+    assert '\x1b[4;11Hy' in output
+    assert 'abc' not in output
+
+    # Close runs are merged into one.
+    stream.truncate(0)
+    stream.seek(0)
+    canvas[0, 0] = 'A'
+    canvas[2, 0] = 'C'
+    assert renderer.present(canvas) == 3
+    assert '\x1b[2;3HAbC' in stream.getvalue()
+
+    # Color changes count as changes.
+    stream.truncate(0)
+    stream.seek(0)
+    canvas.paint(5, 1, fg=pytc.RED)
+    assert renderer.present(canvas) == 1
+    assert pytc.Fore.RED + ' ' in stream.getvalue()
+
+    # Unchanged frames write nothing.
+    stream.truncate(0)
+    stream.seek(0)
+    assert renderer.present(canvas) == 0
+    assert stream.getvalue() == ''
+
+    # invalidate() makes the next frame draw everything again.
+    renderer.invalidate()
+    assert renderer.present(canvas) == 30
+
+    # A smaller canvas clears the cells the last frame left outside of it.
+    stream.truncate(0)
+    stream.seek(0)
+    assert renderer.present(pytc.Canvas(8, 2)) == 16
+    output = stream.getvalue()
+    assert '\x1b[2;11H  ' in output # Columns 8 and 9 of row 0.
+    assert '\x1b[3;11H  ' in output
+    assert '\x1b[4;3H          ' in output # All of row 2.
+    assert output.index('\x1b[4;3H') < output.index('\x1b[2;3H') # Cleared before the new frame is drawn.
+
+    # A larger canvas doesn't clear anything.
+    stream.truncate(0)
+    stream.seek(0)
+    assert renderer.present(pytc.Canvas(9, 3)) == 27
+    assert '\x1b[2;12H' not in stream.getvalue()
+
+    # Canvas.present() keeps its own renderer.
+    canvas.present(stream)
+    assert canvas.present(stream) == 0
+
+
+def test_getTerminalSize(monkeypatch):
+    # The real terminal size will be different depending on the terminal that
+    # runs these tests, so fake the OS's answer.
+    sizes = [(100, 40)]
+    monkeypatch.setattr(pytc.terminal, '_queryTerminalSize', lambda: sizes[0])
+    monkeypatch.setattr(pytc.terminal, '_cachedTerminalSize', None)
+    monkeypatch.setattr(pytc.terminal, '_installSigwinchHandler', lambda: True)
+    monkeypatch.setattr(pytc.terminal, '_sigwinchHandlerInstalled', True)
+    assert pytc.getTerminalSize() == (100, 40)
+
+    # The size is cached until the terminal is resized.
+    sizes[0] = (120, 50)
+    assert pytc.getTerminalSize() == (100, 40)
+    monkeypatch.setattr(pytc.terminal, '_previousSigwinchHandler', None)
+    pytc.terminal._handleSigwinch(None, None)
+    assert pytc.getTerminalSize() == (120, 50)
+
+    sizes[0] = (80, 25)
+    assert pytc.getTerminalSize(refresh=True) == (80, 25)
+
+    # Not running in a terminal raises an exception.
+    sizes[0] = None
+    with pytest.raises(pytc.PyTextCanvasException):
+        pytc.getTerminalSize(refresh=True)
 
 
 def test_clearScreen():
-    # This test can't reliably run, since the terminal size will be different
-    # depending on the terminal that runs these tests. Let's just make sure
-    # it runs without raising an exception.
-    pass
-    #pytc.clearScreen()
+    stream = io.StringIO()
+    pytc.clearScreen(stream)
+    assert stream.getvalue() == pytc.terminal.CLEAR_SCREEN + pytc.terminal.CURSOR_HOME
+
+
+def test_TerminalSession():
+    stream = io.StringIO()
+    with pytc.TerminalSession(stream) as session:
+        assert stream.getvalue() == pytc.terminal.ENTER_ALT_SCREEN + pytc.terminal.HIDE_CURSOR + pytc.terminal.CLEAR_SCREEN + pytc.terminal.CURSOR_HOME
+        stream.truncate(0)
+        stream.seek(0)
+
+        # Writes inside of update() are held until the update ends.
+        with session.update():
+            session.moveCursor(2, 1)
+            session.write('Hi')
+            assert stream.getvalue() == ''
+        assert stream.getvalue() == pytc.terminal.BEGIN_SYNCHRONIZED_UPDATE + '\x1b[2;3HHi' + pytc.terminal.END_SYNCHRONIZED_UPDATE
+        stream.truncate(0)
+        stream.seek(0)
+
+    # The terminal is restored even if an exception is raised.
+    assert stream.getvalue() == pytc.terminal.SHOW_CURSOR + pytc.terminal.EXIT_ALT_SCREEN
+    stream = io.StringIO()
+    with pytest.raises(ZeroDivisionError):
+        with pytc.TerminalSession(stream, altScreen=False):
+            1 / 0
+    assert stream.getvalue().endswith(pytc.terminal.SHOW_CURSOR)
+    assert pytc.terminal.ENTER_ALT_SCREEN not in stream.getvalue()
 
 
 def test_cursor():